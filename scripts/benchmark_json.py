@@ -0,0 +1,73 @@
+"""
+JSON出力のベンチマーク
+
+表形式の大きな抽出結果について、標準ライブラリの json と orjson（インストールされている場合）の
+変換時間を、インデントあり（run の出力）と改行・空白なし（JSON Lines）で比較します。
+
+使い方:
+    uv run python scripts/benchmark_json.py [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import datetime
+import time
+from collections.abc import Callable
+from decimal import Decimal
+from typing import Any
+
+from xlsx_value_picker import json_encoder
+
+
+def build_output(row_count: int) -> dict[str, Any]:
+    """行数を指定して表形式の抽出結果を作成する"""
+    start = datetime.datetime(2024, 1, 1)
+    return {
+        "table": [
+            {
+                "商品ID": i,
+                "商品名": f"商品{i}",
+                "単価": i * 1.25,
+                "金額": Decimal(i) / 100,
+                "登録日": start + datetime.timedelta(minutes=i),
+                "備考": None if i % 3 else "備考",
+            }
+            for i in range(row_count)
+        ]
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """関数を繰り返し実行し、最短の処理時間（秒）を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="出力データの行数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    if not json_encoder.has_orjson():
+        print("orjson がインストールされていないため、標準ライブラリだけを計測します")
+    backends = [False, True] if json_encoder.has_orjson() else [False]
+
+    data = build_output(args.rows)
+    size = len(json_encoder.dumps(data).encode("utf-8"))
+    print(f"出力データ: {args.rows} 行 ({size / 1024 / 1024:.1f} MiB)")
+    for compact in (False, True):
+        for use_orjson in backends:
+            elapsed = measure(
+                lambda mode=use_orjson, compact=compact: json_encoder.dumps(data, compact=compact, use_orjson=mode),
+                args.repeat,
+            )
+            backend = "orjson" if use_orjson else "json"
+            print(f"  {'compact' if compact else 'indent=2'} ({backend}): {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+MCPサーバーのモデル設定ファイルの読み込みのベンチマーク
+
+多数のモデル設定ファイルを glob パターンで参照するMCP設定について、
+1プロセスでの読み込み・複数プロセスでの並列の読み込み・1ファイルだけ変更した後の読み込み直しの時間を比較します。
+
+使い方:
+    uv run python scripts/benchmark_model_loading.py [--models 600] [--rules 50] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from xlsx_value_picker.config_loader import ConfigLoader, MCPConfig, get_model_file_cache
+
+
+def write_models(model_dir: Path, model_count: int, rule_count: int) -> list[Path]:
+    """モデル設定ファイルを作成する"""
+    fields = {f"field{i}": f"Sheet1!A{i + 1}" for i in range(rule_count)}
+    rules = [
+        {
+            "name": f"ルール{i}",
+            "expression": {
+                "all_of": [
+                    {"required": f"field{i}"},
+                    {"compare": {"left_field": f"field{i}", "operator": ">=", "right": i}},
+                ]
+            },
+            "error_message": "{field} の値が不正です",
+        }
+        for i in range(rule_count)
+    ]
+    content = yaml.dump({"fields": fields, "rules": rules}, allow_unicode=True)
+    paths = []
+    for i in range(model_count):
+        path = model_dir / f"model{i:04}.yaml"
+        path.write_text(content, encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def load(mcp_config_path: Path) -> tuple[MCPConfig, float]:
+    """MCP設定を読み込んでモデルをキャッシュし、処理時間（秒）を返す"""
+    start = time.perf_counter()
+    mcp_config = ConfigLoader().load_mcp_config(str(mcp_config_path))
+    mcp_config.cache_models()
+    return mcp_config, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, default=600, help="モデル設定ファイルの数")
+    parser.add_argument("--rules", type=int, default=50, help="モデルごとのルール数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="並列に読み込むプロセス数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        model_dir = tmp_dir / "models"
+        model_dir.mkdir()
+        paths = write_models(model_dir, args.models, args.rules)
+        mcp_config_path = tmp_dir / "mcp.yaml"
+        mcp_config_path.write_text(
+            yaml.dump({"models": [{"config_path_pattern": "models/*.yaml"}], "config": {"tool_descriptions": {}}}),
+            encoding="utf-8",
+        )
+        print(f"モデル設定ファイル: {args.models} 件（ルール {args.rules} 件）")
+
+        cache = get_model_file_cache()
+        for label, workers in (("1プロセス", 1), (f"{args.workers}プロセス", args.workers)):
+            cache.clear()
+            cache.workers = workers
+            mcp_config, elapsed = load(mcp_config_path)
+            print(f"  初回の読み込み ({label}): {elapsed * 1000:.1f} ms ({len(mcp_config.loaded_models)} モデル)")
+
+        # 1ファイルだけ更新して、同じMCP設定のモデルを読み込み直す
+        stat = os.stat(paths[0])
+        os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        loads = cache.loads
+        start = time.perf_counter()
+        mcp_config.cache_models()
+        elapsed = time.perf_counter() - start
+        print(f"  1ファイル変更後の読み込み直し: {elapsed * 1000:.1f} ms（検証し直し: {cache.loads - loads} 件）")
+
+
+if __name__ == "__main__":
+    main()
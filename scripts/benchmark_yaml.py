@@ -0,0 +1,102 @@
+"""
+YAMLの読み込み・書き出しのベンチマーク
+
+大きな設定ファイルの読み込みと、表形式の大きな出力の書き出しについて、
+libyaml（C 実装）と Python 実装の処理時間を比較します。
+
+使い方:
+    uv run python scripts/benchmark_yaml.py [--rules 3000] [--rows 20000] [--repeat 3]
+"""
+
+import argparse
+import datetime
+import time
+from collections.abc import Callable
+from typing import Any
+
+import yaml
+
+from xlsx_value_picker import yaml_io
+
+
+def build_config(rule_count: int) -> str:
+    """ルール数を指定して設定ファイル（YAML文字列）を作成する"""
+    fields = {f"field{i}": f"Sheet1!A{i + 1}" for i in range(rule_count)}
+    rules = [
+        {
+            "name": f"ルール{i}",
+            "expression": {
+                "all_of": [
+                    {"required": f"field{i}"},
+                    {"compare": {"left_field": f"field{i}", "operator": ">=", "right": i}},
+                ]
+            },
+            "error_message": "{field} の値が不正です",
+        }
+        for i in range(rule_count)
+    ]
+    return yaml.dump({"fields": fields, "rules": rules, "output": {"format": "yaml"}}, allow_unicode=True)
+
+
+def build_output(row_count: int) -> dict[str, Any]:
+    """行数を指定して表形式の抽出結果を作成する"""
+    start = datetime.datetime(2024, 1, 1)
+    return {
+        "table": [
+            {
+                "商品ID": i,
+                "商品名": f"商品{i}",
+                "単価": i * 1.25,
+                "登録日": start + datetime.timedelta(minutes=i),
+                "備考": "複数行の\n備考" if i % 10 == 0 else None,
+            }
+            for i in range(row_count)
+        ]
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """関数を繰り返し実行し、最短の処理時間（秒）を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=3000, help="設定ファイルのルール数")
+    parser.add_argument("--rows", type=int, default=20000, help="出力データの行数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    if not yaml_io.has_libyaml():
+        print("PyYAML が libyaml なしでビルドされているため、Python 実装だけを計測します")
+    modes = [False, True] if yaml_io.has_libyaml() else [False]
+
+    config_text = build_config(args.rules)
+    output_data = build_output(args.rows)
+    assert yaml_io.dump(output_data, allow_unicode=True, sort_keys=False) == yaml.dump(
+        output_data, allow_unicode=True, sort_keys=False
+    )
+
+    print(f"設定ファイル: {args.rules} ルール ({len(config_text) / 1024:.0f} KiB)")
+    for use_libyaml in modes:
+        elapsed = measure(lambda mode=use_libyaml: yaml_io.safe_load(config_text, use_libyaml=mode), args.repeat)
+        print(f"  読み込み ({'libyaml' if use_libyaml else 'Python'}): {elapsed * 1000:.1f} ms")
+
+    print(f"出力データ: {args.rows} 行")
+    for use_libyaml in modes:
+        elapsed = measure(
+            lambda mode=use_libyaml: yaml_io.dump(output_data, use_libyaml=mode, sort_keys=False, allow_unicode=True),
+            args.repeat,
+        )
+        print(f"  書き出し ({'libyaml' if use_libyaml else 'Python'}): {elapsed * 1000:.1f} ms")
+    elapsed = measure(lambda: yaml_io._is_libyaml_safe(output_data), args.repeat)
+    print(f"  出力が同一になるかの判定: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
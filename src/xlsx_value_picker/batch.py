@@ -0,0 +1,229 @@
+"""
+複数のExcelファイルをまとめて処理するバッチ処理機能
+
+設定ファイルの読み込み・検証は1回だけ行い、各ファイルの処理をプロセスプールに分散します。
+結果は完了した順に1件ずつ返すため、呼び出し側は全ファイルの完了を待たずに出力できます。
+"""
+
+import glob
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+from .config_loader import ConfigModel
+from .excel_processor import ExcelValueExtractor, ReadMode, WorkbookSession
+from .exceptions import ExcelProcessingError
+from .validation import ValidationEngine
+from .validator.validation_common import ValidationResult
+
+# ファイルごとの処理結果
+# - ok: 値を取得できた（--ignore-errors でバリデーションエラーを無視した場合を含む）
+# - invalid: バリデーションエラーのため値を取得しなかった
+# - error: Excelファイルの読み込みなどでエラーが発生した
+type BatchStatus = Literal["ok", "invalid", "error"]
+
+# 表形式（CSV）で出力する場合に、設定ファイルのフィールドの前に追加する列
+BATCH_ROW_FIELDS = ("file", "status")
+
+
+@dataclass
+class BatchOptions:
+    """
+    バッチ処理の各ファイルに共通するオプション
+
+    Attributes:
+        read_mode: Excelファイルの読み込みモード
+        include_empty_cells: 空セルを出力に含めるかどうか
+        validate_only: バリデーションのみを実行するかどうか
+        ignore_errors: エラーが発生してもファイルの処理を継続するかどうか
+        full_diagnostics: 失敗したすべての条件のフィールドをバリデーションエラーに含めるかどうか
+    """
+
+    read_mode: ReadMode = "full"
+    include_empty_cells: bool = False
+    validate_only: bool = False
+    ignore_errors: bool = False
+    full_diagnostics: bool = False
+
+
+@dataclass
+class BatchFileResult:
+    """
+    1ファイル分の処理結果
+
+    Attributes:
+        file: 処理したExcelファイルのパス
+        status: 処理結果の状態
+        data: 取得した値（取得しなかった場合はNone）
+        validation_results: バリデーションエラーのリスト
+        error_message: エラーメッセージ（エラーが発生した場合）
+    """
+
+    file: str
+    status: BatchStatus
+    data: dict[str, Any] | None = None
+    validation_results: list[ValidationResult] = field(default_factory=list)
+    error_message: str | None = None
+
+    def to_record(self) -> dict[str, Any]:
+        """出力用の辞書に変換する"""
+        record: dict[str, Any] = {"file": self.file, "status": self.status}
+        if self.data is not None:
+            record["data"] = self.data
+        if self.validation_results:
+            record["validation_results"] = [
+                {
+                    "rule_name": result.rule_name,
+                    "error_message": result.error_message,
+                    "error_fields": result.error_fields,
+                    "error_locations": result.error_locations,
+                    "severity": result.severity,
+                }
+                for result in self.validation_results
+            ]
+        if self.error_message is not None:
+            record["error"] = self.error_message
+        return record
+
+    def to_row(self) -> dict[str, Any]:
+        """表形式の出力用に、取得した値とファイル・状態を1行分の辞書に変換する"""
+        return {**(self.data or {}), "file": self.file, "status": self.status}
+
+
+def collect_batch_files(sources: Iterable[str], pattern: str = "*.xlsx") -> list[str]:
+    """
+    ディレクトリ・globパターン・ファイルパスの指定から処理対象のファイル一覧を作成する
+
+    Args:
+        sources: ディレクトリ、globパターン、またはファイルパスのリスト
+        pattern: ディレクトリが指定された場合に対象とするファイル名のglobパターン
+
+    Returns:
+        list[str]: 処理対象のファイルパス（重複を除いた指定順）
+    """
+    files: dict[str, None] = {}
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            matches = sorted(str(p) for p in path.glob(pattern) if p.is_file())
+        elif path.is_file():
+            matches = [source]
+        else:
+            matches = sorted(p for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+        for match in matches:
+            files.setdefault(match, None)
+    return list(files)
+
+
+def process_file(
+    excel_file: str, config: ConfigModel, engine: ValidationEngine, options: BatchOptions
+) -> BatchFileResult:
+    """
+    1つのExcelファイルをrunコマンドと同じ手順（バリデーション→値の取得）で処理する
+
+    Args:
+        excel_file: Excelファイルのパス
+        config: 設定モデル
+        engine: バリデーションエンジン
+        options: バッチ処理のオプション
+
+    Returns:
+        BatchFileResult: 処理結果
+    """
+    with WorkbookSession(excel_file, read_mode=options.read_mode) as session:
+        validation_results: list[ValidationResult] = []
+        if config.rules:
+            try:
+                validation_results = engine.validate(session, config.extraction_plan)
+            except Exception as e:
+                if not options.ignore_errors:
+                    return BatchFileResult(
+                        excel_file, "error", error_message=f"バリデーション実行中にエラーが発生しました: {e}"
+                    )
+
+            if validation_results and (options.validate_only or not options.ignore_errors):
+                return BatchFileResult(excel_file, "invalid", validation_results=validation_results)
+
+        if options.validate_only:
+            return BatchFileResult(excel_file, "ok", validation_results=validation_results)
+
+        try:
+            with ExcelValueExtractor(session) as extractor:
+                data = extractor.extract_values(config, include_empty_cells=options.include_empty_cells)
+        except ExcelProcessingError as e:
+            if not options.ignore_errors:
+                return BatchFileResult(excel_file, "error", validation_results=validation_results, error_message=str(e))
+            data = {}
+
+        return BatchFileResult(excel_file, "ok", data=data, validation_results=validation_results)
+
+
+# ワーカープロセスごとに1回だけ構築する処理状態
+_worker_state: tuple[ConfigModel, ValidationEngine, BatchOptions] | None = None
+
+
+def _init_worker(config: ConfigModel, options: BatchOptions) -> None:
+    """ワーカープロセスの初期化（設定とバリデーションエンジンをプロセス内に保持する）"""
+    global _worker_state
+    _worker_state = (config, ValidationEngine(config.rules, options.full_diagnostics), options)
+
+
+def _process_file_in_worker(excel_file: str) -> BatchFileResult:
+    """ワーカープロセスで1ファイルを処理する"""
+    assert _worker_state is not None
+    config, engine, options = _worker_state
+    return _process_file_safely(excel_file, config, engine, options)
+
+
+def _process_file_safely(
+    excel_file: str, config: ConfigModel, engine: ValidationEngine, options: BatchOptions
+) -> BatchFileResult:
+    """予期せぬ例外もファイル単位のエラーとして扱う"""
+    try:
+        return process_file(excel_file, config, engine, options)
+    except Exception as e:
+        return BatchFileResult(excel_file, "error", error_message=f"予期しないエラーが発生しました: {e}")
+
+
+def run_batch(
+    files: Iterable[str],
+    config: ConfigModel,
+    options: BatchOptions | None = None,
+    workers: int | None = None,
+) -> Iterator[BatchFileResult]:
+    """
+    複数のExcelファイルを並列に処理し、完了した順に結果を返す
+
+    Args:
+        files: 処理対象のファイルパス
+        config: 設定モデル（読み込み・検証済み）
+        options: バッチ処理のオプション
+        workers: ワーカープロセス数（Noneの場合はCPUコア数、1の場合はプロセスを起動せずに処理）
+
+    Yields:
+        BatchFileResult: ファイルごとの処理結果（完了順）
+    """
+    options = options or BatchOptions()
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        engine = ValidationEngine(config.rules, options.full_diagnostics)
+        for excel_file in files:
+            yield _process_file_safely(excel_file, config, engine, options)
+        return
+
+    # 投入済みで未完了のタスク数を制限し、大量のファイルでもメモリ使用量を一定に保つ
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config, options)) as executor:
+        pending: set[Future[BatchFileResult]] = set()
+        for excel_file in files:
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+            pending.add(executor.submit(_process_file_in_worker, excel_file))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (future.result() for future in done)
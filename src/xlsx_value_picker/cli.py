@@ -1,12 +1,12 @@
 import json
 import logging
 import sys
-from typing import Any
+from typing import Any, TextIO
 
 import click
 
 from .config_loader import ConfigLoader, ConfigModel, OutputFormat
-from .excel_processor import ExcelValueExtractor
+from .excel_processor import ExcelValueExtractor, ReadMode, WorkbookSession
 from .exceptions import (
     ConfigLoadError,
     ConfigValidationError,
@@ -72,19 +72,39 @@ def cli() -> None:
 @cli.command(name="run")
 @click.argument("excel_file", type=click.Path(exists=True, file_okay=True, dir_okay=False))
 @click.option("-c", "--config", default="config.yaml", help="検証ルールや設定を記述した設定ファイル")
+@click.option(
+    "--config-cache-dir",
+    type=click.Path(file_okay=False),
+    help="検証済みの設定を保存するキャッシュディレクトリ（環境変数 XLSX_VALUE_PICKER_CONFIG_CACHE_DIR でも指定可能）",
+)
 @click.option("--ignore-errors", is_flag=True, help="検証エラーが発生しても処理を継続します")
 @click.option("-o", "--output", help="出力先ファイルを指定します（未指定の場合は標準出力）")
 @click.option("--log", help="検証エラーを記録するログファイルを指定します")
 @click.option("--include-empty-cells", is_flag=True, help="空セルも出力に含めます")
 @click.option("--validate-only", is_flag=True, help="バリデーションのみを実行します")
+@click.option(
+    "--full-diagnostics",
+    is_flag=True,
+    help="all_of の検証エラーに、最初に失敗した条件だけでなく失敗したすべての条件のフィールドを含めます",
+)
+@click.option(
+    "--read-mode",
+    type=click.Choice(["full", "streaming", "xml"]),
+    default="full",
+    help="Excelファイルの読み込みモード。streaming は参照されているシート・行だけを読み取り専用で読み、"
+    "xml は openpyxl を経由せずに参照されているセルだけをXMLから直接読みます",
+)
 def run(
     excel_file: str,
     config: str,
+    config_cache_dir: str | None,
     ignore_errors: bool,
     output: str | None,
     log: str | None,
     include_empty_cells: bool,
     validate_only: bool,
+    full_diagnostics: bool,
+    read_mode: ReadMode,
 ) -> None:
     """
     Excelファイルから値を取得し、バリデーションと出力を行います
@@ -96,12 +116,14 @@ def run(
     data: dict[str, Any] = {}
 
     config_loader: ConfigLoader | None = None
+    # バリデーションと値取得で同じワークブックを共有するためのセッション（読み込みは初回アクセス時）
+    session = WorkbookSession(excel_file, read_mode=read_mode)
 
     try:
         # 1. ConfigLoader の初期化 (スキーマ読み込み)
         try:
             # ConfigLoader の初期化 (引数なしに変更)
-            config_loader = ConfigLoader()
+            config_loader = ConfigLoader(cache_dir=config_cache_dir)
         # except ConfigLoadError as e: # スキーマ読み込み固有のエラーハンドリングは削除
         #     click.echo(f"スキーマファイルの読み込みに失敗しました: {e}", err=True)
         #     sys.exit(1)
@@ -150,8 +172,8 @@ def run(
         has_validation_rules = len(config_model.rules) > 0
         if has_validation_rules:
             try:
-                validation_engine = ValidationEngine(config_model.rules)
-                validation_results = validation_engine.validate(excel_file, config_model.fields)
+                validation_engine = ValidationEngine(config_model.rules, full_diagnostics)
+                validation_results = validation_engine.validate(session, config_model.extraction_plan)
             except Exception as e:  # ValidationEngine 内のエラーは汎用 Exception でキャッチ
                 _handle_error(e, ignore_errors, "バリデーション実行中にエラーが発生しました")
                 # ignore_errors=True の場合、validation_results は空のまま続行
@@ -194,7 +216,7 @@ def run(
 
         # 3. Excelファイルからの値取得
         try:
-            with ExcelValueExtractor(excel_file) as extractor:
+            with ExcelValueExtractor(session) as extractor:
                 data = extractor.extract_values(config_model, include_empty_cells=include_empty_cells)
         except ExcelProcessingError as e:
             _handle_error(e, ignore_errors, "Excelファイルからの値取得に失敗しました")
@@ -231,6 +253,99 @@ def run(
         click.echo(f"予期しないエラーが発生しました: {e}", err=True)
         # ignore_errors に関わらず、予期しないエラーは終了させるのが安全か検討
         sys.exit(1)
+    finally:
+        session.close()
+
+
+@cli.command(name="batch")
+@click.argument("sources", nargs=-1)
+@click.option("-c", "--config", default="config.yaml", help="検証ルールや設定を記述した設定ファイル")
+@click.option(
+    "--config-cache-dir",
+    type=click.Path(file_okay=False),
+    help="検証済みの設定を保存するキャッシュディレクトリ（環境変数 XLSX_VALUE_PICKER_CONFIG_CACHE_DIR でも指定可能）",
+)
+@click.option(
+    "--pattern", default="*.xlsx", show_default=True, help="ディレクトリを指定した場合に対象とするファイル名のパターン"
+)
+@click.option(
+    "--files-from",
+    type=click.File("r", encoding="utf-8"),
+    help="処理対象のファイルパスを1行ずつ記述したファイル（- を指定すると標準入力から読み込みます）",
+)
+@click.option("-j", "--workers", type=click.IntRange(min=1), help="並列に処理するプロセス数（デフォルト: CPUコア数）")
+@click.option("--ignore-errors", is_flag=True, help="ファイルごとの検証エラーを無視して値を出力します")
+@click.option("-o", "--output", help="出力先ファイルを指定します（未指定の場合は標準出力）")
+@click.option("--include-empty-cells", is_flag=True, help="空セルも出力に含めます")
+@click.option("--validate-only", is_flag=True, help="バリデーションのみを実行します")
+@click.option(
+    "--full-diagnostics",
+    is_flag=True,
+    help="all_of の検証エラーに、最初に失敗した条件だけでなく失敗したすべての条件のフィールドを含めます",
+)
+@click.option(
+    "--read-mode",
+    type=click.Choice(["full", "streaming", "xml"]),
+    default="full",
+    help="Excelファイルの読み込みモード（run コマンドと同じ）",
+)
+def batch(
+    sources: tuple[str, ...],
+    config: str,
+    config_cache_dir: str | None,
+    pattern: str,
+    files_from: TextIO | None,
+    workers: int | None,
+    ignore_errors: bool,
+    output: str | None,
+    include_empty_cells: bool,
+    validate_only: bool,
+    full_diagnostics: bool,
+    read_mode: ReadMode,
+) -> None:
+    """
+    複数のExcelファイルを並列に処理し、結果をJSON Lines形式で出力します
+
+    設定ファイルは1回だけ読み込み、各ファイルの結果を処理が完了した順に1行ずつ出力します。
+    設定ファイルの出力形式が csv の場合は、ファイル・状態・各フィールドの値をCSVの1行として出力します。
+
+    SOURCES: 処理対象のExcelファイル、ディレクトリ、またはglobパターン
+    """
+    # プロセスプールなどの読み込みは batch コマンドを実行する場合だけ行う
+    from .batch import BATCH_ROW_FIELDS, BatchOptions, collect_batch_files, run_batch
+
+    file_sources = list(sources)
+    if files_from is not None:
+        file_sources.extend(line.strip() for line in files_from if line.strip())
+    files = collect_batch_files(file_sources, pattern)
+    if not files:
+        click.echo("処理対象のファイルが見つかりません", err=True)
+        sys.exit(1)
+
+    try:
+        config_model = ConfigLoader(cache_dir=config_cache_dir).load_config(config)
+    except (ConfigLoadError, ConfigValidationError) as e:
+        click.echo(f"設定ファイルの読み込みに失敗しました: {e}", err=True)
+        sys.exit(1)
+
+    options = BatchOptions(
+        read_mode=read_mode,
+        include_empty_cells=include_empty_cells,
+        validate_only=validate_only,
+        ignore_errors=ignore_errors,
+        full_diagnostics=full_diagnostics,
+    )
+
+    failed_count = 0
+    with OutputFormatter(config_model).open_record_writer(output, extra_fields=BATCH_ROW_FIELDS) as writer:
+        for result in run_batch(files, config_model, options, workers=workers):
+            if result.status != "ok":
+                failed_count += 1
+            writer.write_record(result.to_row() if writer.tabular else result.to_record())
+
+    click.echo(f"{len(files)} 件のファイルを処理しました（エラー: {failed_count} 件）", err=True)
+    if failed_count and not ignore_errors:
+        sys.exit(1)
 
 
 # MCPサーバーサブコマンドを追加
@@ -242,7 +357,14 @@ def run(
     default="INFO",
     help="ログレベルを設定します (デフォルト: INFO)",
 )
-def server(config: str, log_level: str) -> None:
+@click.option(
+    "--reload-interval",
+    type=click.FloatRange(min=0),
+    default=2.0,
+    show_default=True,
+    help="モデル設定ファイルの変更を確認して再読み込みする間隔（秒、0 で無効）",
+)
+def server(config: str, log_level: str, reload_interval: float) -> None:
     """
     MCPサーバー機能を起動します
 
@@ -263,7 +385,7 @@ def server(config: str, log_level: str) -> None:
     try:
         from .mcp_server.server import main as server_main
 
-        server_main(config_path=config, log_level=numeric_log_level)
+        server_main(config_path=config, log_level=numeric_log_level, reload_interval=reload_interval)
     except ImportError as e:
         click.echo(f"MCPサーバーモジュールの読み込みに失敗しました: {e}", err=True)
         click.echo("必要な依存関係がインストールされていない可能性があります。", err=True)
@@ -0,0 +1,143 @@
+"""
+検証済み設定モデルのディスクキャッシュ
+
+設定ファイルのパースと pydantic によるモデル検証（ルール式の Union の解決を含む）は、
+ルール数が多いと Excel の処理そのものより時間がかかることがあります。
+このモジュールは検証済みの ConfigModel を pickle 形式で保存し、設定ファイルの内容が同じであれば
+再検証せずに読み込めるようにします。
+
+キーは設定ファイルの内容（バイト列）、拡張子、パッケージのバージョン、設定モデルを定義するモジュールの
+ソースコードのハッシュです（編集可能インストールではバージョンが変わらないままモデルの定義が変わるため）。
+キャッシュは信頼できるディレクトリにだけ置いてください（pickle を読み込むため）。
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config_loader import ConfigModel
+
+logger = logging.getLogger(__name__)
+
+# キャッシュディレクトリを指定する環境変数
+CONFIG_CACHE_DIR_ENV = "XLSX_VALUE_PICKER_CONFIG_CACHE_DIR"
+
+
+def _package_version() -> str:
+    """インストールされているパッケージのバージョンを取得する"""
+    try:
+        return version("xlsx-value-picker")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+# pickle に保存されるクラスを定義するモジュール（パッケージのディレクトリからの相対パス）
+_MODEL_SOURCES = (
+    "config_loader.py",
+    "extraction_plan.py",
+    "exceptions.py",
+    "validator/validation_common.py",
+    "validator/validation_expressions.py",
+)
+
+
+@functools.cache
+def _model_source_digest() -> str:
+    """設定モデルを定義するモジュールのソースコードのハッシュを取得する（読み込めない場合は空文字列）"""
+    digest = hashlib.sha256()
+    package_dir = Path(__file__).parent
+    try:
+        for name in _MODEL_SOURCES:
+            digest.update((package_dir / name).read_bytes())
+    except OSError:
+        return ""
+    return digest.hexdigest()
+
+
+class ConfigCache:
+    """
+    検証済みの ConfigModel をディレクトリに保存するキャッシュ
+
+    読み込み・書き込みの失敗はキャッシュミスとして扱い、例外は送出しません。
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        """
+        初期化
+
+        Args:
+            cache_dir: キャッシュファイルを保存するディレクトリ（存在しない場合は作成する）
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def key(self, content: bytes, suffix: str) -> str:
+        """
+        設定ファイルの内容からキャッシュキーを作成する
+
+        Args:
+            content: 設定ファイルの内容
+            suffix: 設定ファイルの拡張子（同じ内容でも形式によって解釈が異なるため）
+
+        Returns:
+            str: キャッシュキー
+        """
+        digest = hashlib.sha256()
+        python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+        for part in (_package_version(), _model_source_digest(), python_version, suffix.lower()):
+            digest.update(part.encode("utf-8") + b"\0")
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pickle"
+
+    def load(self, key: str) -> "ConfigModel | None":
+        """
+        キャッシュから設定モデルを読み込む
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            ConfigModel | None: 設定モデル（キャッシュにない、または読み込めない場合はNone）
+        """
+        from .config_loader import ConfigModel
+
+        try:
+            with open(self._path(key), "rb") as f:
+                model = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug("設定キャッシュを読み込めませんでした: %s", e)
+            return None
+        return model if isinstance(model, ConfigModel) else None
+
+    def store(self, key: str, model: "ConfigModel") -> None:
+        """
+        設定モデルをキャッシュに保存する（一時ファイルに書き込んでから置き換える）
+
+        Args:
+            key: キャッシュキー
+            model: 検証済みの設定モデル
+        """
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logger.debug("設定キャッシュを保存できませんでした: %s", e)
@@ -2,24 +2,45 @@
 JSONスキーマに基づく設定データ読み込み機能
 """
 
+import codecs
+import glob
 import json
+import logging
 import os
+import re
+import threading
 from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Literal, Self, Union, cast
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Literal, Self, Union, cast
 
-import yaml
-from fastmcp import FastMCP
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 from pydantic import ValidationError as PydanticValidationError
 
+from . import yaml_io
+from .config_cache import CONFIG_CACHE_DIR_ENV, ConfigCache
+
 # カスタム例外をインポート
-from .exceptions import ConfigLoadError, ConfigValidationError, XlsxValuePickerError
+from .exceptions import ConfigLoadError, ConfigValidationError, ExcelProcessingError, XlsxValuePickerError
+from .extraction_plan import ExtractionPlan
 from .validator.validation_common import ValidationContext, ValidationResult
 from .validator.validation_expressions import ExpressionType
 
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+
+    from .mcp_server.pipeline import ModelPipeline
+
+logger = logging.getLogger(__name__)
+
 # ConfigValidationError は exceptions.py に移動済みのため削除
 
+# フィールド定義のセル参照形式 (例: "Sheet1!A1")
+_CELL_REFERENCE_PATTERN = re.compile(r"^[^!]+![A-Z]+[0-9]+$")
+
 
 class ConfigParser:
     @staticmethod
@@ -45,12 +66,19 @@ class ConfigParser:
         if not any(file_path.endswith(ext) for ext in supported_extensions):
             raise ConfigLoadError(f"サポートされていないファイル形式です: {file_path}")
 
+        # yaml は YAML形式の設定ファイルを読む場合だけインポートする（JSON形式の起動を軽くするため）
+        parse_errors: tuple[type[Exception], ...] = (json.JSONDecodeError,)
+        if file_path.endswith(tuple(yaml_extentions)):
+            import yaml
+
+            parse_errors += (yaml.YAMLError,)
+
         try:
             with open(file_path, encoding="utf-8") as f:
                 ext = os.path.splitext(file_path)[1].lower()
                 if ext in yaml_extentions:
-                    # yaml.safe_load は Any を返すため、cast と ignore を使用
-                    return cast(dict[str, Any], yaml.safe_load(f))
+                    # libyaml が使える場合は C 実装のローダーで読み込む
+                    return cast(dict[str, Any], yaml_io.safe_load(f.read()))
                 if ext in json_extentions:
                     # json.load は Any を返すため、cast と ignore を使用
                     return cast(dict[str, Any], json.load(f))
@@ -58,12 +86,12 @@ class ConfigParser:
                 # サポートされている拡張子のいずれかであるべきだが、念のため
                 raise ConfigLoadError(f"サポートされていないファイル形式です: {file_path}")
 
-        except (yaml.YAMLError, json.JSONDecodeError) as e:  # yaml.parser.ParserError は yaml.YAMLError に含まれる
-            print(f"DEBUG: Caught exception type: {type(e)}")  # デバッグ出力追加
-            print(f"DEBUG: Exception message: {e}")  # デバッグ出力追加
+        except parse_errors as e:  # yaml.parser.ParserError は yaml.YAMLError に含まれる
+            # 標準出力はMCPサーバーの通信に使われるため、print ではなくログに出力する
+            logger.debug(f"設定ファイルのパースに失敗しました: {file_path}: {type(e).__name__}: {e}")
             raise ConfigLoadError(f"設定ファイルのパースに失敗しました: {file_path}") from e
         except Exception as e:  # その他の予期せぬ読み込みエラー
-            print(e)
+            logger.debug(f"設定ファイルの読み込み中にエラーが発生しました: {file_path}: {type(e).__name__}: {e}")
             raise ConfigLoadError(f"設定ファイルの読み込み中に予期せぬエラーが発生しました: {file_path}") from e
 
 
@@ -113,12 +141,34 @@ class Rule(BaseModel):
         return result
 
 
+class CsvOptions(BaseModel):
+    """CSV出力の設定"""
+
+    # csv モジュールの方言（excel: カンマ区切り・CRLF、excel-tab: タブ区切り、unix: LF・全項目を引用符で囲む）
+    dialect: Literal["excel", "excel-tab", "unix"] = "excel"
+    # ファイルに書き込む場合の文字コード（Excel で開く場合は BOM 付きの utf-8-sig を指定する）
+    encoding: str = "utf-8"
+    # 値が None（空セルなど）の場合に出力する文字列
+    null_value: str = ""
+
+    @field_validator("encoding")
+    @classmethod
+    def validate_encoding(cls: type["CsvOptions"], v: str) -> str:
+        """Pythonで扱える文字コードであることを確認する"""
+        try:
+            codecs.lookup(v)
+        except LookupError as e:
+            raise ValueError(f"不明な文字コードです: {v}") from e
+        return v
+
+
 class OutputFormat(BaseModel):
     """出力形式設定"""
 
     format: str = "json"
     template_file: str | None = None
     template: str | None = None
+    csv: CsvOptions = Field(default_factory=CsvOptions)
 
     @model_validator(mode="after")
     def check_jinja2_template(self) -> Self:
@@ -129,10 +179,8 @@ class OutputFormat(BaseModel):
         if self.format == "jinja2" and self.template_file and self.template:
             raise ValueError("template_fileとtemplateを同時に指定することはできません")
 
-        if self.format not in ["json", "yaml", "jinja2", "csv"]:  # csv を追加 (仮)
-            # TODO: csv サポートを正式に追加する際に修正
+        if self.format not in ["json", "yaml", "jinja2", "csv"]:
             raise ValueError(f"サポートされていない出力形式です: {self.format}")
-            # pass # 一旦許容
 
         return self
 
@@ -144,40 +192,65 @@ class ConfigModel(BaseModel):
     rules: list[Rule] = []
     output: OutputFormat = Field(default_factory=OutputFormat)
 
+    # 読み込み時に作成する抽出計画（fields を解析したもの）
+    _extraction_plan: ExtractionPlan = PrivateAttr()
+
     @field_validator("fields")
     @classmethod
     def validate_fields(cls: type["ConfigModel"], v: dict[str, str]) -> dict[str, str]:
         """フィールド定義の検証"""
-        import re  # re をインポート
-
         if not v:
             raise ValueError("少なくとも1つのフィールド定義が必要です")
 
-        pattern = r"^[^!]+![A-Z]+[0-9]+$"
         for _, cell_addr in v.items():
-            if not re.match(pattern, cell_addr):
+            if not _CELL_REFERENCE_PATTERN.match(cell_addr):
                 raise ValueError(f"無効なセル参照形式です: {cell_addr}。正しい形式は 'Sheet1!A1' です。")
 
         return v
 
+    @model_validator(mode="after")
+    def build_extraction_plan(self) -> Self:
+        """フィールド定義を解析して抽出計画を作成する"""
+        try:
+            self._extraction_plan = ExtractionPlan.from_fields(self.fields)
+        except ExcelProcessingError as e:
+            raise ValueError(str(e)) from e
+        return self
+
+    @property
+    def extraction_plan(self) -> ExtractionPlan:
+        """
+        フィールド定義から作成した不変の抽出計画
+
+        設定の読み込み時に一度だけ作成され、複数のワークブックに対して使い回せます。
+        """
+        return self._extraction_plan
+
 
 class ConfigLoader:
     """設定ファイルローダー"""
 
     # DEFAULT_SCHEMA_PATH は不要なため削除
 
-    def __init__(self) -> None:
+    def __init__(self, cache_dir: str | Path | None = None) -> None:
         """
         初期化
-        (スキーマ検証を行わないため、引数は不要)
+        (スキーマ検証を行わないため、スキーマの指定は不要)
+
+        Args:
+            cache_dir: 検証済み設定モデルのキャッシュディレクトリ
+                       未指定の場合は環境変数 XLSX_VALUE_PICKER_CONFIG_CACHE_DIR を使い、
+                       どちらもなければキャッシュしない
         """
-        # スキーマバリデーターの初期化は不要
-        pass
+        cache_dir = cache_dir or os.environ.get(CONFIG_CACHE_DIR_ENV) or None
+        self.cache = ConfigCache(cache_dir) if cache_dir else None
 
     def load_config(self, config_path: str) -> ConfigModel:
         """
         設定ファイルを読み込み、モデルオブジェクトを返す
 
+        キャッシュが有効な場合、内容が同じ設定ファイルの検証済みモデルはキャッシュから読み込みます。
+
         Args:
             config_path: 設定ファイルのパス
 
@@ -188,6 +261,13 @@ class ConfigLoader:
             ConfigLoadError: 設定ファイルの読み込みやパースに失敗した場合
             ConfigValidationError: 設定ファイルのスキーマ検証やモデル検証に失敗した場合
         """
+        cache_key = self._cache_key(config_path)
+        if cache_key is not None:
+            assert self.cache is not None
+            cached = self.cache.load(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             # 設定ファイルのパース (ConfigLoadError が発生する可能性)
             config_data = ConfigParser.parse_file(config_path)
@@ -196,6 +276,10 @@ class ConfigLoader:
 
             # モデルオブジェクトの生成 (PydanticValidationError が発生する可能性)
             model = ConfigModel.model_validate(config_data)
+            # 読み込み中にファイルが変更されていなければキャッシュに保存する
+            if cache_key is not None and self._cache_key(config_path) == cache_key:
+                assert self.cache is not None
+                self.cache.store(cache_key, model)
             return model
 
         except ConfigLoadError as e:
@@ -214,6 +298,16 @@ class ConfigLoader:
                 f"設定ファイルの読み込み時に予期しないエラーが発生しました: {config_path}"
             ) from e
 
+    def _cache_key(self, config_path: str) -> str | None:
+        """設定ファイルのキャッシュキーを作成する（キャッシュが無効、またはファイルを読めない場合はNone）"""
+        if self.cache is None:
+            return None
+        try:
+            content = Path(config_path).read_bytes()
+        except OSError:
+            return None
+        return self.cache.key(content, Path(config_path).suffix)
+
     def load_mcp_config(self, config_path: str) -> "MCPConfig":
         """
         MCP設定ファイルを読み込み、MCPConfigモデルオブジェクトを返す
@@ -260,35 +354,71 @@ class MCPAvailableConfigModel(ConfigModel):
 
     model_name: str | None = None
     model_description: str | None = None
+    # getFileContent でExcelファイルのパスが指定されなかった場合に使うパス
+    excel_path: str | None = None
 
 
 type ToolNames = Literal["listModels", "getModelInfo", "getDiagnostics", "getFileContent"]
 
 
+@dataclass(frozen=True)
+class _LoadedModels:
+    """cache_models で準備したモデルとパイプラインの索引（読み込み直す場合はまとめて置き換える）"""
+
+    models: tuple[MCPAvailableConfigModel, ...] = ()
+    # モデル名 -> 起動時に準備したパイプライン
+    index: Mapping[str, "ModelPipeline"] = field(default_factory=lambda: MappingProxyType({}))
+
+
 class MCPConfig(BaseModel):
     models: list[Union["ModelConfigReference", "GlobModelConfigReference"]]
     config: "MCPConfigDetails"
     origin: Path | None = None
     # 以降内部用フィールド
-    loaded_models: list[MCPAvailableConfigModel] = Field(default=[], exclude=True)
+    # ワーカースレッドがモデル一覧と索引の組み合わせを読み込み直しの途中で参照しないよう、1つのオブジェクトで保持する
+    _loaded: _LoadedModels = PrivateAttr(default_factory=_LoadedModels)
+
+    @property
+    def loaded_models(self) -> list[MCPAvailableConfigModel]:
+        """cache_models で読み込んだモデル設定"""
+        return list(self._loaded.models)
+
+    @property
+    def model_index(self) -> Mapping[str, "ModelPipeline"]:
+        """モデル名からパイプラインを引く索引（読み取り専用）"""
+        return self._loaded.index
 
     def cache_models(self) -> None:
-        """モデル一覧をパースしてモデル設定をキャッシュする"""
+        """モデル一覧をパースしてモデル設定をキャッシュし、モデルごとのパイプラインを準備する"""
+        from .mcp_server.pipeline import build_model_index
+
+        # 参照するモデル設定ファイルをまとめて（多い場合は並列に）読み込んでおき、各参照はキャッシュから取得する
+        cache = get_model_file_cache()
+        paths = [path for definition in self.models for path in definition.config_paths(self)]
+        cache.load_models(paths)
+        # 削除された（パターンに一致しなくなった）ファイルのエントリは破棄する
+        cache.retain(paths)
         # モデル設定をロード
-        self.loaded_models: list[MCPAvailableConfigModel] = [
-            model for definition in self.models for model in definition.get_models(self)
-        ]
+        models = [model for definition in self.models for model in definition.get_models(self)]
+        # 変更されていないモデルは、以前に準備したパイプライン（コンパイル済みのルール）をそのまま使う
+        model_index = build_model_index(models, previous=self._loaded.index)
+
+        # 読み込み直す場合も、すべての準備が終わってから1回の代入で置き換える（失敗した場合は以前のモデルのまま）
+        self._loaded = _LoadedModels(tuple(models), MappingProxyType(model_index))
 
     def handle_list_models(self) -> str:
         """モデル情報を取得するためのハンドラー"""
         # モデル情報を取得
         simplified_models = [
-            f"Model Name: {model.model_name}. Description: {model.model_description}" for model in self.loaded_models
+            f"Model Name: {model.model_name}. Description: {model.model_description}" for model in self._loaded.models
         ]
         return "\n".join(simplified_models)
 
-    def configure(self) -> FastMCP[Any]:
+    def configure(self) -> "FastMCP[Any]":
         """設定内容に基づいてFastMCPサーバのインスタンスを構築して返す"""
+        # FastMCP は読み込みに時間がかかるため、サーバーを構築する場合だけインポートする
+        from fastmcp import FastMCP
+
         self.cache_models()
 
         # FastMCP サーバーを構築
@@ -314,9 +444,198 @@ supply summarized list of parsable Excel file informations with `getFileContent`
         return server
 
 
+def _resolve_path(path: str, base_dir: Path | None) -> str:
+    """相対パスを基準フォルダからのパスとして解決する（基準フォルダがない場合はそのまま返す）"""
+    if base_dir is None or Path(path).is_absolute():
+        return path
+    return str(base_dir / path)
+
+
+# 読み込むファイルがこの数以上の場合は、モデル設定ファイルを複数のプロセスで並列に読み込む
+PARALLEL_LOAD_THRESHOLD = 16
+
+
+def _load_model_file(path: str) -> MCPAvailableConfigModel:
+    """
+    モデル設定ファイルを読み込んで検証する（ワーカープロセスからも呼び出す）
+
+    Excelファイルのパスは、モデル設定ファイルの親フォルダからの相対パスとして解決します。
+
+    Raises:
+        ConfigLoadError: 設定ファイルの読み込みやパースに失敗した場合
+        ConfigValidationError: 設定ファイルのモデル検証に失敗した場合
+    """
+    config = ConfigParser.parse_file(path)
+    if isinstance(config.get("excel_path"), str):
+        config["excel_path"] = _resolve_path(config["excel_path"], Path(path).parent)
+    try:
+        return MCPAvailableConfigModel.model_validate(config)
+    except PydanticValidationError as e:
+        # pydantic の例外はプロセス間で受け渡せないため、ここでメッセージに変換する
+        error_details = "; ".join([f"{err['loc']}: {err['msg']}" for err in e.errors()])
+        raise ConfigValidationError(f"モデル設定ファイルのモデル検証に失敗しました: {path}: {error_details}") from None
+
+
+@dataclass
+class _ModelFileEntry:
+    signature: tuple[int, int]
+    model: MCPAvailableConfigModel
+    # MCP設定ファイルで名前などを上書きしたモデル（上書きする内容 -> モデル）
+    variants: dict[tuple[tuple[str, str], ...], MCPAvailableConfigModel] = field(default_factory=dict)
+
+
+class ModelFileCache:
+    """
+    モデル設定ファイルを検証済みのモデルとして保持するキャッシュ
+
+    キーはファイルの絶対パスで、各エントリはファイルの更新時刻（mtime_ns）とサイズを記録します。
+    設定を読み込み直す場合も、変更されたファイルだけを読み込んで検証し直します。
+    ファイルが変更されていなければ、上書きを含めて同じモデルオブジェクトを返します。
+    """
+
+    def __init__(self, workers: int | None = None):
+        """
+        初期化
+
+        Args:
+            workers: 並列に読み込む場合のワーカープロセス数（Noneの場合はCPUコア数）
+        """
+        self.workers = workers
+        self._entries: dict[str, _ModelFileEntry] = {}
+        self._lock = threading.Lock()
+        # ファイルを読み込んで検証した回数
+        self.loads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _signature(path: str) -> tuple[int, int]:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise ConfigLoadError(f"設定ファイルが見つかりません: {path}") from e
+        return stat.st_mtime_ns, stat.st_size
+
+    def load_models(self, paths: Iterable[str | Path]) -> list[MCPAvailableConfigModel]:
+        """
+        複数のモデル設定ファイルを読み込む（変更されていないファイルはキャッシュから返す）
+
+        読み込むファイルが PARALLEL_LOAD_THRESHOLD 以上の場合は、複数のプロセスで並列に読み込みます。
+
+        Args:
+            paths: モデル設定ファイルのパス
+
+        Returns:
+            list[MCPAvailableConfigModel]: モデル設定（パスと同じ順）
+
+        Raises:
+            ConfigLoadError: 設定ファイルの読み込みやパースに失敗した場合
+            ConfigValidationError: 設定ファイルのモデル検証に失敗した場合
+        """
+        abs_paths = [os.path.abspath(path) for path in paths]
+        signatures = {path: self._signature(path) for path in abs_paths}
+        with self._lock:
+            stale = [
+                path
+                for path, signature in signatures.items()
+                if path not in self._entries or self._entries[path].signature != signature
+            ]
+
+        for path, model in zip(stale, self._load_files(stale), strict=True):
+            with self._lock:
+                self._entries[path] = _ModelFileEntry(signatures[path], model)
+                self.loads += 1
+
+        with self._lock:
+            return [self._entries[path].model for path in abs_paths]
+
+    def _load_files(self, paths: list[str]) -> Iterable[MCPAvailableConfigModel]:
+        """ファイルを読み込んで検証する（ファイルが多い場合はワーカープロセスで並列に処理する）"""
+        workers = min(self.workers or os.cpu_count() or 1, len(paths))
+        if len(paths) < PARALLEL_LOAD_THRESHOLD or workers <= 1:
+            return [_load_model_file(path) for path in paths]
+
+        # 起動時間に影響しないよう、並列に読み込む場合だけインポートする
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # 他のスレッドが動いている場合（MCPサーバーでの再読み込みなど）に fork すると、他のスレッドが
+        # 保持していたロックが子プロセスに複製されてデッドロックすることがあるため、spawn で起動する
+        mp_context = multiprocessing.get_context("spawn") if threading.active_count() > 1 else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+            return list(executor.map(_load_model_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+    def get_model(self, path: str | Path, overrides: dict[str, str] | None = None) -> MCPAvailableConfigModel:
+        """
+        モデル設定ファイルを読み込み、必要であれば項目を上書きしたモデルを返す
+
+        Args:
+            path: モデル設定ファイルのパス
+            overrides: 上書きする項目（model_name, model_description, excel_path）
+
+        Returns:
+            MCPAvailableConfigModel: モデル設定
+        """
+        model = self.load_models([path])[0]
+        if not overrides:
+            return model
+        key = tuple(sorted(overrides.items()))
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+            if entry is None or entry.model is not model:
+                # 読み込んだ直後に別のスレッドがエントリを置き換えた場合は保持しない
+                return model.model_copy(update=overrides)
+            variant = entry.variants.get(key)
+            if variant is None:
+                variant = entry.variants[key] = model.model_copy(update=overrides)
+            return variant
+
+    def retain(self, paths: Iterable[str | Path]) -> None:
+        """
+        指定したファイル以外のエントリを削除する
+
+        Args:
+            paths: エントリを残すモデル設定ファイルのパス
+        """
+        keep = {os.path.abspath(path) for path in paths}
+        with self._lock:
+            for path in [path for path in self._entries if path not in keep]:
+                del self._entries[path]
+
+    def clear(self) -> None:
+        """すべてのエントリを削除する"""
+        with self._lock:
+            self._entries.clear()
+
+
+# プロセス全体で共有するモデル設定ファイルのキャッシュ
+_model_file_cache = ModelFileCache()
+
+
+def get_model_file_cache() -> ModelFileCache:
+    """
+    プロセス全体で共有するモデル設定ファイルのキャッシュを取得する
+
+    Returns:
+        ModelFileCache: モデル設定ファイルのキャッシュ
+    """
+    return _model_file_cache
+
+
+def _base_dir(context: MCPConfig) -> Path | None:
+    """MCP設定ファイルの親フォルダ（相対パスの基準）"""
+    return context.origin.parent if context.origin is not None else None
+
+
 class IModelReferences(ABC):
     """モデル設定を表すインターフェース"""
 
+    @abstractmethod
+    def config_paths(self, context: MCPConfig) -> list[Path]:
+        """参照するモデル設定ファイルのパスを取得する"""
+        raise NotImplementedError("config_paths メソッドは実装されていません")
+
     @abstractmethod
     def get_models(self, context: MCPConfig) -> list[MCPAvailableConfigModel]:
         """モデル設定を取得する"""
@@ -327,40 +646,81 @@ class ModelConfigReference(BaseModel, IModelReferences):
     config_path: str = Field(..., alias="config")
     model_name: str | None = None
     model_description: str | None = None
+    excel_path: str | None = None
 
-    def get_models(self, context: MCPConfig) -> list[MCPAvailableConfigModel]:
-        """モデル設定を取得する"""
-        path = Path(self.config_path)
+    def config_paths(self, context: MCPConfig) -> list[Path]:
+        """参照するモデル設定ファイルのパスを取得する"""
         # パス表記が絶対パスでない場合はMCP設定ファイルの親フォルダからの相対パスとして解釈する
-        if not path.is_absolute() and context.origin is not None:
-            path = context.origin.parent / path
-        # 設定ファイルを読み込む
-        config = ConfigParser.parse_file(str(path))
+        return [Path(_resolve_path(self.config_path, _base_dir(context)))]
 
+    def get_models(self, context: MCPConfig) -> list[MCPAvailableConfigModel]:
+        """モデル設定を取得する"""
         # モデル名と説明をMCP設定ファイルの内容で上書き
+        overrides: dict[str, str] = {}
         if self.model_name:
-            config["model_name"] = self.model_name
+            overrides["model_name"] = self.model_name
         if self.model_description:
-            config["model_description"] = self.model_description
+            overrides["model_description"] = self.model_description
+        # Excelファイルのパスは、それを記述した設定ファイルの親フォルダからの相対パスとして解釈する
+        if self.excel_path:
+            overrides["excel_path"] = _resolve_path(self.excel_path, _base_dir(context))
 
-        return [MCPAvailableConfigModel.model_validate(config)]
+        (path,) = self.config_paths(context)
+        return [get_model_file_cache().get_model(path, overrides)]
 
 
 class GlobModelConfigReference(BaseModel, IModelReferences):
+    """
+    glob パターンに一致するすべてのモデル設定ファイルを参照する
+
+    相対パスのパターンはMCP設定ファイルの親フォルダから展開し、"**" で下位のフォルダも検索します。
+    モデル名が設定されていないモデル設定ファイルは、ファイル名（拡張子を除く）をモデル名とします。
+    別のフォルダに同じ名前のファイルがある場合は、パターンの起点のフォルダ（ワイルドカードを含まない部分）からの
+    相対パス（拡張子を除く）をモデル名とします。
+    """
+
     config_path_pattern: str
 
+    def config_paths(self, context: MCPConfig) -> list[Path]:
+        """パターンに一致するモデル設定ファイルのパスを取得する（パスの順）"""
+        base_dir = _base_dir(context)
+        if base_dir is None or Path(self.config_path_pattern).is_absolute():
+            matches = glob.glob(self.config_path_pattern, recursive=True)
+        else:
+            matches = [
+                str(base_dir / match)
+                for match in glob.glob(self.config_path_pattern, root_dir=base_dir, recursive=True)
+            ]
+        return sorted(Path(match) for match in matches if os.path.isfile(match))
+
+    def _root_dir(self, context: MCPConfig) -> Path:
+        """パターンの起点のフォルダ（ワイルドカードを含まない先頭部分）を取得する"""
+        parts = []
+        for part in Path(self.config_path_pattern).parts[:-1]:
+            if any(char in part for char in "*?["):
+                break
+            parts.append(part)
+        root = Path(*parts)
+        base_dir = _base_dir(context)
+        return root if base_dir is None or root.is_absolute() else base_dir / root
+
     def get_models(self, context: MCPConfig) -> list[MCPAvailableConfigModel]:
         """モデル設定を取得する"""
-        # glob パターンを展開してモデル設定を取得
-        # import glob
-
-        # models = []
-        # for path in glob.glob(self.config_path_pattern):
-        #     model_ref = ModelConfigReference(config_path=path)
-        #     models.extend(model_ref.get_models())
-
-        # return models
-        raise NotImplementedError("メソッドは実装されていません")
+        cache = get_model_file_cache()
+        paths = self.config_paths(context)
+        loaded = cache.load_models(paths)
+        # モデル名のないファイルのうち、同じ名前のファイルが別のフォルダにあるものは相対パスで区別する
+        stems = Counter(path.stem for path, model in zip(paths, loaded, strict=True) if model.model_name is None)
+        root_dir = self._root_dir(context) if any(count > 1 for count in stems.values()) else None
+        models = []
+        for path, model in zip(paths, loaded, strict=True):
+            if model.model_name is None:
+                name = path.stem
+                if root_dir is not None and stems[name] > 1:
+                    name = path.relative_to(root_dir).with_suffix("").as_posix()
+                model = cache.get_model(path, {"model_name": name})
+            models.append(model)
+        return models
 
 
 class MCPConfigDetails(BaseModel):
@@ -2,36 +2,376 @@
 設定に基づくExcelファイル処理機能
 """
 
+import hashlib
+import os
+import posixpath
+import threading
+import zipfile
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import openpyxl
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, WINDOWS_EPOCH, from_excel, from_ISO8601
 from openpyxl.utils.exceptions import InvalidFileException
+from openpyxl.xml.functions import fromstring, iterparse
 
 from .config_loader import ConfigModel
 from .exceptions import ExcelProcessingError
+from .extraction_plan import CellReference, ExtractionPlan, parse_cell_address, split_cell_reference
 
+# ワークブックの読み込みモード
+# - full: ワークブック全体をメモリ上に構築する（デフォルト）
+# - streaming: 読み取り専用モードで開き、参照されているシート・行だけを先頭から順に読む
+# - xml: openpyxlを使わずzip内のXMLを直接読み、参照されているセルだけを取り出す
+type ReadMode = Literal["full", "streaming", "xml"]
 
-class ExcelValueExtractor:
-    """設定に基づいてExcelファイルから値を抽出するクラス"""
+# 値を取得するセルの指定（フィールド名とセル参照のマッピング、または解析済みの抽出計画）
+type CellTargets = Mapping[str, str] | ExtractionPlan
+
+
+def _as_plan(targets: CellTargets) -> ExtractionPlan:
+    """セルの指定を抽出計画に変換する（抽出計画はそのまま返す）"""
+    return targets if isinstance(targets, ExtractionPlan) else ExtractionPlan.from_fields(targets)
+
+
+# SpreadsheetML の名前空間
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_SHARED_STRINGS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+_SUPPORTED_EXTENSIONS = (".xlsx", ".xlsm", ".xltx", ".xltm")
+
+
+class XlsxCellReader:
+    """
+    openpyxlのオブジェクトモデルを経由せずに .xlsx から特定のセルだけを読み取るリーダー
+
+    zipアーカイブを直接開き、workbook.xml とそのリレーションからシートを解決した上で、
+    必要なシートのXMLだけを iterparse で先頭から読み、参照されている最大の行で打ち切ります。
+    共有文字列も対象セルが使うインデックスだけを取り出します。
+    セル値の変換（数値・真偽値・日付など）は openpyxl の data_only=True 読み込みと同じ規則に従います。
+    """
 
     def __init__(self, excel_path: str | Path):
+        """
+        初期化（zipアーカイブを開き、シート一覧を解決する）
+
+        Args:
+            excel_path: Excelファイルのパス
+
+        Raises:
+            ExcelProcessingError: ファイル形式が無効な場合
+        """
+        self.excel_path = Path(excel_path)
+        if self.excel_path.suffix.lower() not in _SUPPORTED_EXTENSIONS:
+            raise ExcelProcessingError(f"Excelファイル形式が無効です: {self.excel_path}")
+        try:
+            self._archive = zipfile.ZipFile(self.excel_path)
+        except zipfile.BadZipFile as e:
+            raise ExcelProcessingError(f"Excelファイル形式が無効です: {self.excel_path}") from e
+
+        try:
+            self._workbook_part = self._find_workbook_part()
+            workbook_rels = self._read_rels(self._workbook_part)
+            root = fromstring(self._archive.read(self._workbook_part))
+        except Exception:
+            self.close()
+            raise
+
+        # シート名 -> シートXMLのパス
+        self.sheet_parts: dict[str, str] = {}
+        sheets = root.find(f"{_MAIN_NS}sheets")
+        for sheet in sheets if sheets is not None else []:
+            rel_target = workbook_rels.get(sheet.get(f"{_DOC_REL_NS}id", ""))
+            if rel_target is not None:
+                self.sheet_parts[sheet.get("name", "")] = rel_target[1]
+
+        # 1904年基準の日付システムかどうか
+        workbook_pr = root.find(f"{_MAIN_NS}workbookPr")
+        date1904 = workbook_pr is not None and workbook_pr.get("date1904", "").lower() in ("1", "true")
+        self.epoch = CALENDAR_MAC_1904 if date1904 else WINDOWS_EPOCH
+
+        self._shared_strings_part = next(
+            (target for rel_type, target in workbook_rels.values() if rel_type == _SHARED_STRINGS_REL),
+            "xl/sharedStrings.xml",
+        )
+        self._date_styles: tuple[set[int], set[int]] | None = None
+
+    def _find_workbook_part(self) -> str:
+        """パッケージのリレーションから workbook.xml のパスを求める"""
+        for rel_type, target in self._read_rels("").values():
+            if rel_type == _OFFICE_DOCUMENT_REL:
+                return target
+        return "xl/workbook.xml"
+
+    def _read_rels(self, part: str) -> dict[str, tuple[str, str]]:
+        """
+        パーツに対応する .rels を読み、リレーションID -> (種類, アーカイブ内パス) を返す
+        """
+        folder, name = posixpath.split(part)
+        rels_path = posixpath.join(folder, "_rels", f"{name}.rels")
+        try:
+            root = fromstring(self._archive.read(rels_path))
+        except KeyError:
+            return {}
+        rels: dict[str, tuple[str, str]] = {}
+        for rel in root.iter(f"{_PKG_REL_NS}Relationship"):
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                path = target.lstrip("/")
+            else:
+                path = posixpath.normpath(posixpath.join(folder, target))
+            rels[rel.get("Id", "")] = (rel.get("Type", ""), path)
+        return rels
+
+    def _get_date_styles(self) -> tuple[set[int], set[int]]:
+        """
+        日付書式・時間間隔書式を持つセルスタイル（cellXfs）のインデックスを返す
+        """
+        if self._date_styles is not None:
+            return self._date_styles
+
+        date_styles: set[int] = set()
+        timedelta_styles: set[int] = set()
+        try:
+            root = fromstring(self._archive.read("xl/styles.xml"))
+        except KeyError:
+            self._date_styles = (date_styles, timedelta_styles)
+            return self._date_styles
+
+        custom_formats = {
+            int(num_fmt.get("numFmtId", "0")): num_fmt.get("formatCode", "")
+            for num_fmt in root.iter(f"{_MAIN_NS}numFmt")
+        }
+        cell_xfs = root.find(f"{_MAIN_NS}cellXfs")
+        for idx, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+            num_fmt_id = int(xf.get("numFmtId", "0"))
+            fmt = custom_formats[num_fmt_id] if num_fmt_id in custom_formats else builtin_format_code(num_fmt_id)
+            if is_date_format(fmt):
+                date_styles.add(idx)
+            if is_timedelta_format(fmt):
+                timedelta_styles.add(idx)
+        self._date_styles = (date_styles, timedelta_styles)
+        return self._date_styles
+
+    def _read_shared_strings(self, indices: set[int]) -> dict[int, str]:
+        """
+        共有文字列テーブルから指定されたインデックスの文字列だけを取り出す
+        """
+        strings: dict[int, str] = {}
+        if not indices:
+            return strings
+        last_index = max(indices)
+        try:
+            source = self._archive.open(self._shared_strings_part)
+        except KeyError:
+            return strings
+        with source:
+            index = 0
+            for _, node in iterparse(source):
+                if node.tag != f"{_MAIN_NS}si":
+                    continue
+                if index in indices:
+                    strings[index] = _text_content(node).replace("x005F_", "")
+                node.clear()
+                if index >= last_index:
+                    break
+                index += 1
+        return strings
+
+    def read_cells(self, targets: CellTargets) -> dict[str, Any]:
+        """
+        フィールドマッピングまたは抽出計画に基づいて複数のセルの値をまとめて取得する
+
+        Args:
+            targets: フィールド名とセル参照のマッピング、または抽出計画
+
+        Returns:
+            dict[str, Any]: フィールド名と値のマッピング（定義順）
+
+        Raises:
+            ExcelProcessingError: セル参照が不正な場合、またはシートが見つからない場合
+        """
+        plan = _as_plan(targets)
+        plan.validate_sheets(self.sheet_parts)
+
+        # 1. 必要なシートの生のセル要素 (型, 値, スタイル) を集める
+        raw_values: dict[str, tuple[str, str | None, int]] = {}
+        for sheet_name, cells in plan.sheets:
+            raw_values.update(self._read_sheet_cells(self.sheet_parts[sheet_name], cells))
+
+        # 2. 共有文字列は対象セルが使うものだけを読む
+        shared_indices = {int(value) for data_type, value, _ in raw_values.values() if data_type == "s" and value}
+        shared_strings = self._read_shared_strings(shared_indices)
+
+        result: dict[str, Any] = {}
+        for cell in plan.cells:
+            raw = raw_values.get(cell.field_name)
+            result[cell.field_name] = None if raw is None else self._convert_value(*raw, shared_strings)
+        return result
+
+    def _read_sheet_cells(self, part: str, cells: tuple[CellReference, ...]) -> dict[str, tuple[str, str | None, int]]:
+        """
+        シートXMLを先頭から読み、対象セルの (型, 生の値, スタイルID) を取り出す
+
+        参照されている最大の行を超えた時点で読み込みを打ち切ります。
+        """
+        wanted: dict[tuple[int, int], list[str]] = defaultdict(list)
+        for cell in cells:
+            wanted[(cell.row, cell.col)].append(cell.field_name)
+        max_row = cells[-1].row
+
+        found: dict[str, tuple[str, str | None, int]] = {}
+        try:
+            source = self._archive.open(part)
+        except KeyError as e:
+            raise ExcelProcessingError(f"シートのデータが見つかりません: {part}") from e
+
+        with source:
+            row_counter = 0
+            col_counter = 0
+            for event, node in iterparse(source, events=("start", "end")):
+                tag = node.tag
+                if event == "start":
+                    if tag == f"{_MAIN_NS}row":
+                        row_attr = node.get("r")
+                        row_counter = int(row_attr) if row_attr else row_counter + 1
+                        col_counter = 0
+                        if row_counter > max_row:
+                            break
+                    continue
+
+                if tag == f"{_MAIN_NS}c":
+                    coordinate = node.get("r")
+                    if coordinate:
+                        row, col_counter = parse_cell_address(coordinate)
+                    else:
+                        row = row_counter
+                        col_counter += 1
+                    field_names = wanted.get((row, col_counter))
+                    if field_names:
+                        data_type = node.get("t", "n")
+                        if data_type == "inlineStr":
+                            inline = node.find(f"{_MAIN_NS}is")
+                            value = None if inline is None else _text_content(inline)
+                        else:
+                            value = node.findtext(f"{_MAIN_NS}v", None) or None
+                        style_id = int(node.get("s") or 0)
+                        for field_name in field_names:
+                            found[field_name] = (data_type, value, style_id)
+                    node.clear()
+                elif tag == f"{_MAIN_NS}row":
+                    node.clear()
+                    if len(found) == len(cells):
+                        break
+        return found
+
+    def _convert_value(self, data_type: str, value: str | None, style_id: int, shared_strings: dict[int, str]) -> Any:
+        """生のセル値を openpyxl (data_only=True) と同じ規則でPythonの値に変換する"""
+        if value is None:
+            return None
+        if data_type == "n":
+            number = float(value) if "." in value or "E" in value or "e" in value else int(value)
+            date_styles, timedelta_styles = self._get_date_styles()
+            if style_id in date_styles:
+                try:
+                    return from_excel(number, self.epoch, timedelta=style_id in timedelta_styles)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return number
+        if data_type == "s":
+            return shared_strings.get(int(value))
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return from_ISO8601(value)  # type: ignore[no-untyped-call]
+        # "str"（数式の文字列結果）、"inlineStr"、"e"（エラー値）はそのまま文字列
+        return value
+
+    def close(self) -> None:
+        """zipアーカイブを閉じる"""
+        self._archive.close()
+
+
+def _text_content(node: Any) -> str:
+    """<si> / <is> 要素から書式を除いたテキストを取り出す（ふりがな <rPh> は除外）"""
+    snippets = []
+    plain = node.findtext(f"{_MAIN_NS}t")
+    if plain is not None:
+        snippets.append(plain)
+    for run in node.findall(f"{_MAIN_NS}r"):
+        text = run.findtext(f"{_MAIN_NS}t")
+        if text is not None:
+            snippets.append(text)
+    return "".join(snippets)
+
+
+class WorkbookSession:
+    """
+    読み込み済みのワークブックを保持するセッション
+
+    1回の処理の中でバリデーションと値の抽出の両方から同じワークブックを参照できるようにし、
+    同じファイルを何度もパースしないようにするためのクラスです。
+    """
+
+    def __init__(self, excel_path: str | Path, read_mode: ReadMode = "full"):
         """
         初期化
 
         Args:
             excel_path: Excelファイルのパス
+            read_mode: 読み込みモード（"full"、"streaming" または "xml"）
         """
         self.excel_path = Path(excel_path)
-        self.workbook: openpyxl.Workbook | None = None  # Initialize workbook to None
+        self.read_mode: ReadMode = read_mode
+        self.workbook: openpyxl.Workbook | None = None
+        self.xml_reader: XlsxCellReader | None = None
 
-    def __enter__(self) -> "ExcelValueExtractor":
-        """コンテキストマネージャの開始時にExcelファイルを開く"""
+    def __enter__(self) -> "WorkbookSession":
+        """
+        コンテキストマネージャの開始
+
+        ワークブックの読み込みは最初に値が必要になった時点まで遅延します。
+        """
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """コンテキストマネージャの終了時にワークブックを閉じる"""
+        self.close()
+
+    @property
+    def is_open(self) -> bool:
+        """ワークブックが読み込み済みかどうか"""
+        return self.workbook is not None or self.xml_reader is not None
+
+    def open(self) -> "WorkbookSession":
+        """
+        ワークブックを読み込む（読み込み済みの場合は何もしない）
+
+        Returns:
+            WorkbookSession: 自分自身
+
+        Raises:
+            ExcelProcessingError: ファイルが存在しない、または読み込めない場合
+        """
+        if self.is_open:
+            return self
         if not self.excel_path.exists():
             raise ExcelProcessingError(f"Excelファイルが見つかりません: {self.excel_path}")
+        if self.read_mode == "xml":
+            self.xml_reader = XlsxCellReader(self.excel_path)
+            return self
         try:
             # data_only=Trueは計算式の代わりに値を取得するために必要
-            self.workbook = openpyxl.load_workbook(self.excel_path, data_only=True)
+            # streamingモードでは read_only=True で開き、セルオブジェクトを全件構築しない
+            self.workbook = openpyxl.load_workbook(
+                self.excel_path, data_only=True, read_only=self.read_mode == "streaming"
+            )
             return self
         except InvalidFileException as e:
             raise ExcelProcessingError(f"Excelファイル形式が無効です: {self.excel_path}") from e
@@ -40,6 +380,367 @@ class ExcelValueExtractor:
                 f"Excelファイルの読み込み中に予期せぬエラーが発生しました: {self.excel_path}"
             ) from e
 
+    def _get_sheet(self, sheet_name: str) -> Any:
+        """
+        シート名からワークシートを取得する
+
+        Raises:
+            ExcelProcessingError: シートが見つからない場合
+        """
+        workbook = self.open().workbook
+        assert workbook is not None
+        try:
+            return workbook[sheet_name]
+        except KeyError as e:
+            raise ExcelProcessingError(f"シートが見つかりません: {sheet_name}") from e
+
+    def get_cell_value(self, cell_reference: str) -> Any:
+        """
+        セル参照から値を取得する
+
+        Args:
+            cell_reference: セル参照 (例: "Sheet1!A1")
+
+        Returns:
+            Any: セルの値
+
+        Raises:
+            ExcelProcessingError: セル参照の形式が不正な場合、シートが見つからない場合、
+                                  またはセル参照が無効な場合
+        """
+        if self.read_mode == "xml":
+            return self.read_cells({cell_reference: cell_reference})[cell_reference]
+
+        # シート名とセル位置を分離
+        sheet_name, cell_addr = split_cell_reference(cell_reference)
+
+        # シートの取得
+        sheet = self._get_sheet(sheet_name)
+
+        # セルの値を取得
+        try:
+            return sheet[cell_addr].value
+        except (ValueError, KeyError) as e:
+            raise ExcelProcessingError(f"無効なセル参照です: {cell_addr}") from e
+
+    def read_cells(self, targets: CellTargets) -> dict[str, Any]:
+        """
+        フィールドマッピングまたは抽出計画に基づいて複数のセルの値をまとめて取得する
+
+        参照されているシートの存在を最初に確認してから値を読み取ります。
+        streamingモードでは計画のシートごとの行番号順に、各シートを参照されている最大の行まで1回だけ読み進めます。
+        xmlモードでは XlsxCellReader で対象セルだけを直接読み取ります。
+
+        Args:
+            targets: フィールド名とセル参照のマッピング、または抽出計画
+
+        Returns:
+            dict[str, Any]: フィールド名と値のマッピング（定義順）
+
+        Raises:
+            ExcelProcessingError: セル参照が不正な場合、またはシートが見つからない場合
+        """
+        plan = _as_plan(targets)
+        if self.read_mode == "xml":
+            xml_reader = self.open().xml_reader
+            assert xml_reader is not None
+            return xml_reader.read_cells(plan)
+
+        workbook = self.open().workbook
+        assert workbook is not None
+        plan.validate_sheets(workbook.sheetnames)
+
+        values: dict[str, Any] = {}
+        if self.read_mode != "streaming":
+            for sheet_name, cells in plan.sheets:
+                sheet = workbook[sheet_name]
+                for cell in cells:
+                    values[cell.field_name] = sheet.cell(row=cell.row, column=cell.col).value
+            return {cell.field_name: values[cell.field_name] for cell in plan.cells}
+
+        for sheet_name, cells in plan.sheets:
+            sheet = workbook[sheet_name]
+            min_row, max_row = cells[0].row, cells[-1].row
+            min_col = min(cell.col for cell in cells)
+            max_col = max(cell.col for cell in cells)
+
+            # 読み取り専用シートは max_row を超えた時点で読み込みを打ち切る
+            rows = sheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True)
+            index = 0
+            for row_number, row_values in enumerate(rows, start=min_row):
+                while index < len(cells) and cells[index].row == row_number:
+                    values[cells[index].field_name] = row_values[cells[index].col - min_col]
+                    index += 1
+                if index >= len(cells):
+                    break
+            # 行が存在しない場合は空セルとして扱う
+            for cell in cells[index:]:
+                values[cell.field_name] = None
+
+        return {cell.field_name: values[cell.field_name] for cell in plan.cells}
+
+    def close(self) -> None:
+        """ワークブックを閉じる"""
+        if self.workbook:
+            self.workbook.close()
+            self.workbook = None
+        if self.xml_reader:
+            self.xml_reader.close()
+            self.xml_reader = None
+
+
+@dataclass(frozen=True)
+class WorkbookCacheStats:
+    """
+    ワークブックキャッシュの統計情報
+
+    Attributes:
+        hits: キャッシュから返した回数
+        misses: ファイルを読み込んだ回数（ファイルが更新されていた場合を含む）
+        evictions: 上限を超えたために破棄したエントリ数
+        entries: 現在のエントリ数
+        total_bytes: 現在のエントリのファイルサイズの合計
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    total_bytes: int
+
+
+@dataclass
+class _WorkbookCacheEntry:
+    signature: tuple[int, int, str | None]
+    size: int
+    session: WorkbookSession
+
+
+@dataclass
+class _PendingLoad:
+    """読み込み中のセッション（同じファイルを同時に要求した呼び出し元は読み込みの完了を待つ）"""
+
+    signature: tuple[int, int, str | None]
+    done: threading.Event = field(default_factory=threading.Event)
+    session: WorkbookSession | None = None
+    error: Exception | None = None
+
+
+class WorkbookCache:
+    """
+    読み込み済みのWorkbookSessionを保持するプロセス全体で共有可能なLRUキャッシュ
+
+    キーはファイルの絶対パスと読み込みモードで、各エントリはファイルの更新時刻（mtime_ns）とサイズ
+    （verify_content=True の場合はさらに内容のSHA-256）を記録します。ファイルが変更されていなければ
+    stat() だけでキャッシュ済みのセッションを返し、変更されていれば読み込み直してエントリを置き換えます。
+
+    容量はエントリ数と、各エントリのファイルサイズの合計（パース後のメモリ使用量の目安）で制限し、
+    どちらかを超えた場合は最も長く使われていないエントリから破棄します。
+    同じファイルを複数のスレッドから同時に要求した場合は最初の呼び出し元だけが読み込み、
+    ほかの呼び出し元はその完了を待って同じセッションを使います。
+    返されるセッションは共有されるため、呼び出し元で閉じないでください。
+    破棄したエントリのセッションも閉じないため、使用中の呼び出し元はそのまま使い続けられます。
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 256 * 1024 * 1024, verify_content: bool = False):
+        """
+        初期化
+
+        Args:
+            max_entries: 保持する最大エントリ数
+            max_bytes: 保持するエントリのファイルサイズの合計の上限（バイト）
+            verify_content: 更新時刻とサイズに加えてファイル内容のハッシュも比較するかどうか
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.verify_content = verify_content
+        self._entries: OrderedDict[tuple[str, ReadMode], _WorkbookCacheEntry] = OrderedDict()
+        self._loading: dict[tuple[str, ReadMode], _PendingLoad] = {}
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> WorkbookCacheStats:
+        """現在の統計情報"""
+        with self._lock:
+            return WorkbookCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                total_bytes=self._total_bytes,
+            )
+
+    def _signature(self, path: str) -> tuple[int, int, str | None]:
+        """ファイルの更新時刻・サイズ（・内容のハッシュ）を取得する"""
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise ExcelProcessingError(f"Excelファイルが見つかりません: {path}") from e
+        digest = None
+        if self.verify_content:
+            with open(path, "rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+        return stat.st_mtime_ns, stat.st_size, digest
+
+    def get_session(self, excel_path: str | Path, read_mode: ReadMode = "full") -> WorkbookSession:
+        """
+        読み込み済みのセッションを取得する（キャッシュにないか、ファイルが変更されていれば読み込む）
+
+        Args:
+            excel_path: Excelファイルのパス
+            read_mode: 読み込みモード
+
+        Returns:
+            WorkbookSession: 読み込み済みのセッション（共有されるため閉じないこと）
+
+        Raises:
+            ExcelProcessingError: ファイルが存在しない、または読み込めない場合
+        """
+        path = os.path.abspath(excel_path)
+        key = (path, read_mode)
+        signature = self._signature(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.session
+            pending = self._loading.get(key)
+            loading = pending is None or pending.signature != signature
+            if loading:
+                pending = self._loading[key] = _PendingLoad(signature)
+                self._misses += 1
+            else:
+                # 同じファイルを読み込み中の呼び出し元がいれば、その結果を使う（キャッシュヒットとして数える）
+                self._hits += 1
+
+        assert pending is not None
+        if loading:
+            return self._load(key, pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        assert pending.session is not None
+        return pending.session
+
+    def _load(self, key: tuple[str, ReadMode], pending: _PendingLoad) -> WorkbookSession:
+        """セッションを読み込んでエントリに追加し、完了を待っている呼び出し元に知らせる"""
+        path, read_mode = key
+        try:
+            # パースには時間がかかるため、ロックの外で読み込む
+            session = pending.session = WorkbookSession(path, read_mode=read_mode).open()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                # 読み込み中にファイルが変更されて別の読み込みが始まった場合は、その結果を優先する
+                if self._loading.get(key) is pending:
+                    del self._loading[key]
+                    if pending.session is not None:
+                        self._insert(key, pending.signature, pending.session)
+            pending.done.set()
+        return session
+
+    def _insert(
+        self, key: tuple[str, ReadMode], signature: tuple[int, int, str | None], session: WorkbookSession
+    ) -> None:
+        """エントリを追加し、上限を超えた分を破棄する（ロックを取得した状態で呼び出すこと）"""
+        size = signature[1]
+        self._discard(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = _WorkbookCacheEntry(signature, size, session)
+        self._total_bytes += size
+        while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+            self._evictions += 1
+
+    def _discard(self, key: tuple[str, ReadMode]) -> None:
+        """エントリを削除する（ロックを取得した状態で呼び出すこと）"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+            # 既に返したセッションを使用中の呼び出し元がいるため、ここでは閉じない
+            # （参照されなくなった時点でガベージコレクションにより解放される）
+
+    def invalidate(self, excel_path: str | Path) -> None:
+        """
+        指定したファイルのエントリを削除する
+
+        Args:
+            excel_path: Excelファイルのパス
+        """
+        path = os.path.abspath(excel_path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                self._discard(key)
+
+    def clear(self) -> None:
+        """すべてのエントリを削除し、統計情報をリセットする"""
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
+            self._hits = self._misses = self._evictions = 0
+
+
+# プロセス全体で共有するデフォルトのワークブックキャッシュ
+_default_workbook_cache = WorkbookCache()
+
+
+def get_workbook_cache() -> WorkbookCache:
+    """
+    プロセス全体で共有するデフォルトのワークブックキャッシュを取得する
+
+    Returns:
+        WorkbookCache: デフォルトのワークブックキャッシュ
+    """
+    return _default_workbook_cache
+
+
+class ExcelValueExtractor:
+    """設定に基づいてExcelファイルから値を抽出するクラス"""
+
+    def __init__(self, source: str | Path | WorkbookSession, read_mode: ReadMode = "full"):
+        """
+        初期化
+
+        Args:
+            source: Excelファイルのパス、または読み込み済みのWorkbookSession
+                    WorkbookSessionを渡した場合、そのセッションは呼び出し元が閉じる責任を持ちます。
+            read_mode: 読み込みモード（"full"、"streaming" または "xml"）
+                       WorkbookSessionを渡した場合はセッション側のモードが使われます。
+        """
+        if isinstance(source, WorkbookSession):
+            self.session = source
+            self._owns_session = False
+        else:
+            self.session = WorkbookSession(source, read_mode=read_mode)
+            self._owns_session = True
+
+    @property
+    def excel_path(self) -> Path:
+        """Excelファイルのパス"""
+        return self.session.excel_path
+
+    @property
+    def workbook(self) -> openpyxl.Workbook | None:
+        """読み込み済みのワークブック（未読み込みの場合はNone）"""
+        return self.session.workbook
+
+    def __enter__(self) -> "ExcelValueExtractor":
+        """コンテキストマネージャの開始時にExcelファイルを開く"""
+        self.session.open()
+        return self
+
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """コンテキストマネージャの終了時にワークブックを閉じる"""
         self.close()
@@ -58,15 +759,13 @@ class ExcelValueExtractor:
         Raises:
             ExcelProcessingError: ワークブックが開かれていない場合
         """
-        if self.workbook is None:
+        if not self.session.is_open:
             raise ExcelProcessingError(
                 "Excelワークブックが開かれていません。コンテキストマネージャを使用してください。"
             )
 
         result = {}
-        for field_name, cell_ref in config.fields.items():
-            value = self._get_cell_value(cell_ref)
-
+        for field_name, value in self.session.read_cells(config.extraction_plan).items():
             # 空セルのチェック
             if value is None and not include_empty_cells:
                 continue
@@ -89,42 +788,25 @@ class ExcelValueExtractor:
             ExcelProcessingError: セル参照の形式が不正な場合、シートが見つからない場合、
                                   またはセル参照が無効な場合
         """
-        if self.workbook is None:
+        if not self.session.is_open:
             raise ExcelProcessingError("Excelワークブックが開かれていません。")
 
-        # シート名とセル位置を分離
-        if "!" not in cell_reference:
-            raise ExcelProcessingError(f"無効なセル参照形式です: {cell_reference}")
-
-        sheet_name, cell_addr = cell_reference.split("!", 1)
-
-        # シートの取得
-        try:
-            sheet = self.workbook[sheet_name]
-        except KeyError as e:
-            raise ExcelProcessingError(f"シートが見つかりません: {sheet_name}") from e
-
-        # セルの値を取得
-        try:
-            return sheet[cell_addr].value
-        except (ValueError, KeyError) as e:
-            raise ExcelProcessingError(f"無効なセル参照です: {cell_addr}") from e
+        return self.session.get_cell_value(cell_reference)
 
     def close(self) -> None:
-        """ワークブックを閉じる"""
-        if self.workbook:
-            self.workbook.close()
-            self.workbook = None
+        """ワークブックを閉じる（共有セッションの場合は呼び出し元に任せる）"""
+        if self._owns_session:
+            self.session.close()
 
 
 # ValidationEngine用の関数
-def get_excel_values(excel_file: str, field_mapping: dict[str, str]) -> dict[str, Any]:
+def get_excel_values(excel_file: str | Path | WorkbookSession, field_mapping: CellTargets) -> dict[str, Any]:
     """
     Excelファイルからフィールドマッピングに基づいて値を取得する
 
     Args:
-        excel_file: Excelファイルのパス
-        field_mapping: フィールド名とセル位置のマッピング
+        excel_file: Excelファイルのパス、または読み込み済みのWorkbookSession
+        field_mapping: フィールド名とセル位置のマッピング、または抽出計画
 
     Returns:
         Dict[str, Any]: フィールド名と値のマッピング
@@ -134,11 +816,7 @@ def get_excel_values(excel_file: str, field_mapping: dict[str, str]) -> dict[str
     """
     try:
         with ExcelValueExtractor(excel_file) as extractor:
-            result = {}
-            for field_name, cell_ref in field_mapping.items():
-                value = extractor._get_cell_value(cell_ref)
-                result[field_name] = value
-            return result
+            return extractor.session.read_cells(field_mapping)
     except ExcelProcessingError as e:
         # ValidationEngine は標準の Exception を期待している可能性があるため、
         # ここでは再送出せずにエラーメッセージを返すか、より汎用的な例外にラップする
@@ -0,0 +1,150 @@
+"""
+セル参照の抽出計画
+
+設定ファイルの fields に書かれたセル参照 ("Sheet1!A1") を読み込み時に一度だけ解析し、
+(シート, 行, 列) の組としてシートごとにまとめた不変の計画を提供します。
+config_loader と excel_processor の双方から使われるため、循環インポートを避けて独立したモジュールにしています。
+"""
+
+from collections.abc import Collection, Iterable, Mapping
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+from openpyxl.utils.exceptions import CellCoordinatesException
+
+from .exceptions import ExcelProcessingError
+
+
+def split_cell_reference(cell_reference: str) -> tuple[str, str]:
+    """
+    セル参照をシート名とセル位置に分離する
+
+    Args:
+        cell_reference: セル参照 (例: "Sheet1!A1")
+
+    Returns:
+        tuple[str, str]: シート名とセル位置
+
+    Raises:
+        ExcelProcessingError: セル参照の形式が不正な場合
+    """
+    if "!" not in cell_reference:
+        raise ExcelProcessingError(f"無効なセル参照形式です: {cell_reference}")
+    sheet_name, cell_addr = cell_reference.split("!", 1)
+    return sheet_name, cell_addr
+
+
+def parse_cell_address(cell_addr: str) -> tuple[int, int]:
+    """
+    セル位置を行番号・列番号に変換する
+
+    Args:
+        cell_addr: セル位置 (例: "A1")
+
+    Returns:
+        tuple[int, int]: 行番号と列番号（いずれも1始まり）
+
+    Raises:
+        ExcelProcessingError: セル位置が無効な場合
+    """
+    try:
+        column_letter, row = coordinate_from_string(cell_addr)
+        return row, column_index_from_string(column_letter)
+    except (CellCoordinatesException, ValueError) as e:
+        raise ExcelProcessingError(f"無効なセル参照です: {cell_addr}") from e
+
+
+class CellReference(NamedTuple):
+    """解析済みのセル参照"""
+
+    field_name: str
+    reference: str
+    sheet: str
+    row: int
+    col: int
+
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    """
+    解析済みセル参照の不変な抽出計画
+
+    一度作成すれば複数のワークブックに対して使い回せます。
+
+    Attributes:
+        cells: フィールド定義順のセル参照
+        sheets: シート名と、そのシート内のセル参照（行・列順）の組
+    """
+
+    cells: tuple[CellReference, ...]
+    sheets: tuple[tuple[str, tuple[CellReference, ...]], ...]
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[str, str]) -> "ExtractionPlan":
+        """
+        フィールド名とセル参照のマッピングから抽出計画を作成する
+
+        Args:
+            fields: フィールド名とセル参照のマッピング
+
+        Returns:
+            ExtractionPlan: 抽出計画
+
+        Raises:
+            ExcelProcessingError: セル参照が不正な場合
+        """
+        cells = []
+        for field_name, cell_ref in fields.items():
+            sheet_name, cell_addr = split_cell_reference(cell_ref)
+            row, col = parse_cell_address(cell_addr)
+            cells.append(CellReference(field_name, cell_ref, sheet_name, row, col))
+        return cls._from_cells(cells)
+
+    @classmethod
+    def _from_cells(cls, cells: Iterable[CellReference]) -> "ExtractionPlan":
+        """解析済みのセル参照から抽出計画を作成する"""
+        ordered = tuple(cells)
+        by_sheet: dict[str, list[CellReference]] = {}
+        for cell in ordered:
+            by_sheet.setdefault(cell.sheet, []).append(cell)
+        sheets = tuple(
+            (sheet, tuple(sorted(sheet_cells, key=lambda c: (c.row, c.col)))) for sheet, sheet_cells in by_sheet.items()
+        )
+        return cls(cells=ordered, sheets=sheets)
+
+    def subset(self, field_names: Collection[str]) -> "ExtractionPlan":
+        """
+        指定したフィールドだけを含む抽出計画を作成する
+
+        Args:
+            field_names: 残すフィールド名（計画に含まれないフィールド名は無視する）
+
+        Returns:
+            ExtractionPlan: 指定したフィールドだけを定義順に含む抽出計画
+        """
+        return self._from_cells(cell for cell in self.cells if cell.field_name in field_names)
+
+    @property
+    def field_mapping(self) -> dict[str, str]:
+        """フィールド名とセル参照のマッピング"""
+        return {cell.field_name: cell.reference for cell in self.cells}
+
+    @property
+    def sheet_names(self) -> tuple[str, ...]:
+        """参照されているシート名"""
+        return tuple(sheet for sheet, _ in self.sheets)
+
+    def validate_sheets(self, available_sheets: Collection[str]) -> None:
+        """
+        参照されているシートがすべて存在することを確認する
+
+        Args:
+            available_sheets: ワークブックに存在するシート名
+
+        Raises:
+            ExcelProcessingError: 存在しないシートが参照されている場合
+        """
+        for sheet in self.sheet_names:
+            if sheet not in available_sheets:
+                raise ExcelProcessingError(f"シートが見つかりません: {sheet}")
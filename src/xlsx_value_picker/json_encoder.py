@@ -0,0 +1,117 @@
+"""
+JSONへの変換
+
+orjson がインストールされている場合はそれを使い、そうでない場合は標準ライブラリの json を使います。
+どちらの場合も、openpyxl が日付セルに返す datetime/date/time は ISO 8601 形式の文字列に、
+時間間隔の書式（[h]:mm など）のセルに返す timedelta は str() と同じ "1 day, 6:05:00" 形式の文字列に、
+Decimal は精度を保つため文字列に変換します。それ以外のJSONにない型は json.dumps と同じく TypeError を送出します
+（str_fallback=True の場合は str() の結果に変換します）。
+
+orjson はオプションの依存関係です（pip install "xlsx-value-picker[fast]"）。
+64ビットに収まらない整数など orjson で変換できない値を含む場合は標準ライブラリで変換します。
+"""
+
+import datetime
+import json
+from decimal import Decimal
+from types import ModuleType
+from typing import Any
+
+# JSONにない型の変換関数（型の完全一致で引く。サブクラスは isinstance で判定する）
+_SERIALIZERS: dict[type, Any] = {
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: datetime.time.isoformat,
+    # JSON Lines 出力（str_fallback）と同じ表記にする
+    datetime.timedelta: str,
+    Decimal: str,
+}
+
+_orjson: ModuleType | None = None
+_orjson_checked = False
+
+
+def _get_orjson() -> ModuleType | None:
+    """orjson をインポートする（インストールされていない場合はNone）"""
+    global _orjson, _orjson_checked
+    if not _orjson_checked:
+        try:
+            import orjson
+
+            _orjson = orjson
+        except ImportError:
+            _orjson = None
+        _orjson_checked = True
+    return _orjson
+
+
+def has_orjson() -> bool:
+    """
+    orjson を使用できるかどうかを返す
+
+    Returns:
+        bool: orjson がインストールされている場合はTrue
+    """
+    return _get_orjson() is not None
+
+
+def default(value: Any) -> Any:
+    """
+    JSONにない型の値を変換する（json.dumps や orjson.dumps の default 引数に渡す関数）
+
+    Args:
+        value: 変換する値
+
+    Returns:
+        Any: JSONで表現できる値
+
+    Raises:
+        TypeError: 変換できない型の場合
+    """
+    serializer = _SERIALIZERS.get(type(value))
+    if serializer is not None:
+        return serializer(value)
+    if isinstance(value, datetime.date | datetime.time):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _default_or_str(value: Any) -> Any:
+    """default で変換できない値は str() の結果に変換する"""
+    try:
+        return default(value)
+    except TypeError:
+        return str(value)
+
+
+def dumps(data: Any, *, compact: bool = False, use_orjson: bool | None = None, str_fallback: bool = False) -> str:
+    """
+    データをJSON文字列に変換する
+
+    Args:
+        data: 変換するデータ
+        compact: Trueの場合は改行・空白なし、Falseの場合は2スペースでインデントする
+        use_orjson: orjson を使うかどうか（Noneの場合はインストールされていれば使う）
+        str_fallback: 変換できない型の値を str() の結果に変換するかどうか
+
+    Returns:
+        str: JSON文字列（ASCII以外の文字はエスケープしない）
+
+    Raises:
+        TypeError: str_fallback=False で、変換できない型の値を含む場合
+    """
+    convert = _default_or_str if str_fallback else default
+    orjson = _get_orjson() if use_orjson is not False else None
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return str(orjson.dumps(data, default=convert, option=option).decode("utf-8"))
+        except orjson.JSONEncodeError:
+            pass
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=convert)
+    return json.dumps(data, ensure_ascii=False, indent=2, default=convert)
@@ -0,0 +1,103 @@
+"""
+同時に届いた同じリクエストをまとめて1回だけ処理する仕組み（single-flight）
+
+エージェントは計画中に同じツール呼び出しを並行して何度も発行することがあります。
+処理中のリクエストと同じキーのリクエストが届いた場合は、新たに処理せずに処理中の結果を待って共有します。
+キーはイベントループのスレッドだけで扱うため、ロックは使いません。
+"""
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """
+    リクエストをまとめた結果の統計情報
+
+    Attributes:
+        calls: 呼び出された回数
+        executed: 実際に処理した回数
+        coalesced: 処理中の結果を共有した回数
+        in_flight: 現在処理中のキーの数
+    """
+
+    calls: int
+    executed: int
+    coalesced: int
+    in_flight: int
+
+
+class SingleFlight:
+    """キーごとに処理中の処理を1つに限り、同じキーの呼び出しで結果を共有するクラス"""
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Future[Any]] = {}
+        self._calls = 0
+        self._executed = 0
+        self._coalesced = 0
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """現在の統計情報"""
+        return SingleFlightStats(
+            calls=self._calls, executed=self._executed, coalesced=self._coalesced, in_flight=len(self._in_flight)
+        )
+
+    async def run[T](self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        キーが同じ処理が実行中ならその結果を待ち、そうでなければ処理を実行する
+
+        処理が例外を送出した場合は、結果を待っていたすべての呼び出し元に同じ例外を送出します。
+        呼び出し元の1つがキャンセルされても、他の呼び出し元のために処理は継続します。
+
+        Args:
+            key: 同じリクエストかどうかを判定するキー
+            func: 処理を行うコルーチンを返す関数
+
+        Returns:
+            T: 処理の結果
+        """
+        self._calls += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._coalesced += 1
+            logger.debug(f"処理中の同じリクエストの結果を共有します: {key}")
+        else:
+            self._executed += 1
+            future = asyncio.ensure_future(func())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        """完了した処理をキーから外す"""
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # 結果を待つ呼び出し元がすべてキャンセルされた場合に、例外が取得されなかった警告を出さない
+        if not future.cancelled():
+            future.exception()
+
+
+def file_fingerprint(path: str) -> tuple[str, int, int]:
+    """
+    ファイルの内容が同じかどうかを判定するための値を取得する
+
+    Args:
+        path: ファイルのパス
+
+    Returns:
+        tuple[str, int, int]: 絶対パス・更新時刻（ナノ秒）・サイズ（ファイルを参照できない場合は -1, -1）
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return path, -1, -1
+    return path, stat.st_mtime_ns, stat.st_size
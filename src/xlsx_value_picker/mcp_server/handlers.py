@@ -2,11 +2,23 @@
 Model Context Protocol (MCP) のリクエストハンドラー実装
 """
 
+import asyncio
+import functools
 import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
 
 from xlsx_value_picker.config_loader import MCPAvailableConfigModel
+from xlsx_value_picker.excel_processor import get_workbook_cache
 from xlsx_value_picker.exceptions import ExcelProcessingError, XlsxValuePickerError
 
+from .coalescing import SingleFlight, file_fingerprint
+from .pipeline import ModelPipeline, find_pipeline
 from .protocol import (
     GetDiagnosticsRequest,
     GetDiagnosticsResponse,
@@ -20,30 +32,48 @@ from .protocol import (
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
+# Excelファイルの読み込みやバリデーションを実行するワーカースレッド数の上限
+MAX_WORKERS = min(8, os.cpu_count() or 1)
 
-def find_model_by_id(models: list[MCPAvailableConfigModel], model_id: str) -> MCPAvailableConfigModel | None:
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """ワーカースレッドのプールを取得する（初回呼び出し時に作成する）"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="xlsx-value-picker")
+    return _executor
+
+
+async def run_in_worker[T](func: Callable[..., T], *args: Any) -> T:
     """
-    モデルIDに基づいてモデル設定を検索する
+    ブロッキングする処理をワーカースレッドで実行する
+
+    openpyxl による読み込みやバリデーションをイベントループの外で実行し、並行するツール呼び出しが
+    互いを待たないようにします。同時に実行する数は MAX_WORKERS までに制限されます。
+    ワークブックキャッシュを共有するため、プロセスではなくスレッドで実行します。
 
     Args:
-        models: モデル設定のリスト
-        model_id: 検索するモデルID
+        func: 実行する関数
+        *args: 関数に渡す引数
 
     Returns:
-        MCPAvailableConfigModel: 見つかったモデル設定、見つからなければNone
+        T: 関数の戻り値
     """
-    for model in models:
-        if model.model_name == model_id:
-            return model
-    return None
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args))
 
 
-def handle_get_model_info(models: list[MCPAvailableConfigModel], request: GetModelInfoRequest) -> ModelInfo:
+def handle_get_model_info(pipelines: Mapping[str, ModelPipeline], request: GetModelInfoRequest) -> ModelInfo:
     """
     getModelInfoリクエストを処理し、指定されたモデルの詳細情報を返す
 
     Args:
-        models: 利用可能なモデル設定のリスト
+        pipelines: モデル名と起動時に準備したパイプラインのマッピング
         request: getModelInfoリクエスト
 
     Returns:
@@ -52,9 +82,8 @@ def handle_get_model_info(models: list[MCPAvailableConfigModel], request: GetMod
     Raises:
         ValueError: 指定されたモデルIDが見つからない場合
     """
-    model = find_model_by_id(models, request.model_id)
-    if model is None:
-        raise ValueError(f"指定されたモデルID '{request.model_id}' が見つかりません")
+    pipeline = find_pipeline(pipelines, request.model_id)
+    model = pipeline.model
 
     if model.model_name is None:
         model_id = request.model_id  # モデル名が設定されていない場合はリクエストIDを使用
@@ -66,49 +95,183 @@ def handle_get_model_info(models: list[MCPAvailableConfigModel], request: GetMod
         model_id=model_id,
         description=model.model_description,
         fields=model.fields,
-        excel_path=None,  # 現在の実装ではExcelパスを保持していない
+        excel_path=model.excel_path,
     )
 
 
+def resolve_excel_path(model: MCPAvailableConfigModel, excel_path: str | None) -> str:
+    """
+    処理対象のExcelファイルのパスを決定する
+
+    Args:
+        model: モデル設定
+        excel_path: リクエストで指定されたパス（Noneの場合はモデルに設定されたパスを使う）
+
+    Returns:
+        str: Excelファイルのパス
+
+    Raises:
+        ValueError: リクエストとモデルのどちらにもパスが指定されていない場合
+    """
+    path = excel_path or model.excel_path
+    if not path:
+        raise ValueError(f"モデル '{model.model_name}' の処理対象のExcelファイルのパスが指定されていません")
+    return path
+
+
+@dataclass(frozen=True)
+class DiagnosticsCacheStats:
+    """
+    バリデーション結果のキャッシュの統計情報
+
+    Attributes:
+        hits: キャッシュから返した回数
+        misses: バリデーションを実行した回数
+        entries: 現在のエントリ数
+    """
+
+    hits: int
+    misses: int
+    entries: int
+
+
+@dataclass
+class _DiagnosticsCacheEntry:
+    model: MCPAvailableConfigModel
+    fingerprint: tuple[str, int, int]
+    response: GetDiagnosticsResponse
+
+
+class DiagnosticsCache:
+    """
+    モデルとExcelファイルの組み合わせごとにバリデーション結果を保持するLRUキャッシュ
+
+    エントリはモデル名とファイルの絶対パスをキーとし、結果を計算したときのモデルとファイルの状態
+    （更新時刻とサイズ）を記録します。モデルが読み込み直された場合やファイルが変更された場合は結果を返しません。
+    ワークブックのセッションは保持しないため、ワークブックキャッシュが破棄したワークブックは解放されます。
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """
+        初期化
+
+        Args:
+            max_entries: 保持する最大エントリ数
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str | None, str], _DiagnosticsCacheEntry] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> DiagnosticsCacheStats:
+        """現在の統計情報"""
+        with self._lock:
+            return DiagnosticsCacheStats(hits=self._hits, misses=self._misses, entries=len(self._entries))
+
+    def get(self, model: MCPAvailableConfigModel, fingerprint: tuple[str, int, int]) -> GetDiagnosticsResponse | None:
+        """
+        キャッシュ済みの結果を取得する
+
+        Args:
+            model: モデル設定
+            fingerprint: Excelファイルの絶対パス・更新時刻・サイズ（file_fingerprint の結果）
+
+        Returns:
+            GetDiagnosticsResponse | None: キャッシュ済みの結果（ない場合はNone）
+        """
+        key = (model.model_name, fingerprint[0])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.model is model and entry.fingerprint == fingerprint:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.response
+            self._misses += 1
+            return None
+
+    def put(
+        self, model: MCPAvailableConfigModel, fingerprint: tuple[str, int, int], response: GetDiagnosticsResponse
+    ) -> None:
+        """
+        結果を保存する
+
+        Args:
+            model: モデル設定
+            fingerprint: 結果を計算する前に取得したExcelファイルの絶対パス・更新時刻・サイズ
+            response: バリデーション結果
+        """
+        key = (model.model_name, fingerprint[0])
+        with self._lock:
+            self._entries[key] = _DiagnosticsCacheEntry(model, fingerprint, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """すべてのエントリを削除し、統計情報をリセットする"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+
+# プロセス全体で共有するバリデーション結果のキャッシュ
+_diagnostics_cache = DiagnosticsCache()
+
+
+def get_diagnostics_cache() -> DiagnosticsCache:
+    """
+    プロセス全体で共有するバリデーション結果のキャッシュを取得する
+
+    Returns:
+        DiagnosticsCache: バリデーション結果のキャッシュ
+    """
+    return _diagnostics_cache
+
+
 def handle_get_diagnostics(
-    models: list[MCPAvailableConfigModel], request: GetDiagnosticsRequest
+    pipelines: Mapping[str, ModelPipeline], request: GetDiagnosticsRequest
 ) -> GetDiagnosticsResponse:
     """
     getDiagnosticsリクエストを処理し、バリデーション結果を返す
 
     Args:
-        models: 利用可能なモデル設定のリスト
+        pipelines: モデル名と起動時に準備したパイプラインのマッピング
         request: getDiagnosticsリクエスト
 
     Returns:
         GetDiagnosticsResponse: バリデーション結果
 
     Raises:
-        ValueError: 指定されたモデルIDが見つからない場合
+        ValueError: 指定されたモデルIDが見つからない場合、またはExcelファイルのパスが指定されていない場合
     """
-    model = find_model_by_id(models, request.model_id)
-    if model is None:
-        raise ValueError(f"指定されたモデルID '{request.model_id}' が見つかりません")
+    pipeline = find_pipeline(pipelines, request.model_id)
+    model = pipeline.model
+    excel_path = resolve_excel_path(model, request.excel_path)
 
-    # バリデーション実行
-    # Note: 実際のExcelパスは現在の実装では設定に含まれていないため、
-    # 別途Excelファイルのパスを渡す仕組みが必要
     validation_errors = []
     is_valid = True
 
     try:
-        # TODO: 現在の実装ではExcelパスを取得する方法がないため、
-        # この部分は将来的に実装を更新する必要がある
-        # excel_path = "path/to/excel/file.xlsx"  # 将来的には設定から取得する
-        # processor = ValidationProcessor(model, excel_path)
-        # results = processor.validate()
-        #
-        # is_valid = len(results) == 0
-        # for result in results:
-        #     validation_errors.append(
-        #         ValidationError(field=result.field, message=result.message)
-        #     )
-        pass
+        # 読み込み中にファイルが変更された場合に古い内容の結果を新しい状態で保存しないよう、読み込む前に取得する
+        fingerprint = file_fingerprint(excel_path)
+        cached = get_diagnostics_cache().get(model, fingerprint)
+        if cached is not None:
+            return cached
+
+        # getFileContent と同じワークブックキャッシュを使い、続けて呼ばれた場合にパースし直さない
+        session = get_workbook_cache().get_session(excel_path)
+
+        results = pipeline.validate(session)
+        is_valid = len(results) == 0
+        for result in results:
+            validation_errors.append(
+                ValidationError(field=", ".join(result.error_fields or []), message=result.error_message or "")
+            )
+        response = GetDiagnosticsResponse(is_valid=is_valid, errors=validation_errors)
+        get_diagnostics_cache().put(model, fingerprint, response)
+        return response
     except Exception as e:
         logger.error(f"バリデーション処理中にエラーが発生しました: {e}")
         is_valid = False
@@ -120,39 +283,35 @@ def handle_get_diagnostics(
 
 
 def handle_get_file_content(
-    models: list[MCPAvailableConfigModel], request: GetFileContentRequest
+    pipelines: Mapping[str, ModelPipeline], request: GetFileContentRequest
 ) -> GetFileContentResponse:
     """
     getFileContentリクエストを処理し、構造化テキストを返す
 
     Args:
-        models: 利用可能なモデル設定のリスト
+        pipelines: モデル名と起動時に準備したパイプラインのマッピング
         request: getFileContentリクエスト
 
     Returns:
         GetFileContentResponse: 構造化テキスト
 
     Raises:
-        ValueError: 指定されたモデルIDが見つからない場合
+        ValueError: 指定されたモデルIDが見つからない場合、またはExcelファイルのパスが指定されていない場合
         ExcelProcessingError: Excelファイルの処理中にエラーが発生した場合
     """
-    model = find_model_by_id(models, request.model_id)
-    if model is None:
-        raise ValueError(f"指定されたモデルID '{request.model_id}' が見つかりません")
+    pipeline = find_pipeline(pipelines, request.model_id)
+    model = pipeline.model
+    excel_path = resolve_excel_path(model, request.excel_path)
 
-    # 出力形式の設定
+    # 出力形式はリクエストごとに指定する（並行するリクエストが共有するモデルの設定は書き換えない）
     output_format = request.output_format or "json"
-    # モデルの出力形式を一時的に上書き
-    original_format = model.output.format
-    model.output.format = output_format
 
     try:
-        # TODO: 現在の実装ではExcelパスを取得する方法がないため、
-        # この部分は将来的に実装を更新する必要がある
-        # excel_path = "path/to/excel/file.xlsx"  # 将来的には設定から取得する
-        # processor = ExcelProcessor(excel_path, model)
-        # content = processor.process()
-        content = f'{{"message": "Excel content for model {request.model_id} would be here"}}'
+        # 同じファイルへの繰り返しの問い合わせでパースし直さないよう、共有のワークブックキャッシュを使う
+        # （キャッシュのセッションは共有されるため閉じない）
+        session = get_workbook_cache().get_session(excel_path)
+        data = pipeline.extract(session)
+        content = pipeline.formatter.format_output(data, output_format=output_format)
 
         return GetFileContentResponse(content=content, format=output_format)
     except ExcelProcessingError as e:
@@ -161,6 +320,63 @@ def handle_get_file_content(
     except Exception as e:
         logger.error(f"ファイルコンテンツの取得中に予期せぬエラーが発生しました: {e}")
         raise XlsxValuePickerError(f"ファイルコンテンツの取得中にエラーが発生しました: {e}") from e
-    finally:
-        # 元の出力形式に戻す
-        model.output.format = original_format
+
+
+# 同時に届いた同じツール呼び出しをまとめる（イベントループのスレッドだけで使う）
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    ツール呼び出しをまとめる SingleFlight を取得する（統計情報の確認用）
+
+    Returns:
+        SingleFlight: プロセス全体で共有する SingleFlight
+    """
+    return _single_flight
+
+
+async def serve_get_diagnostics(
+    pipelines: Mapping[str, ModelPipeline], request: GetDiagnosticsRequest
+) -> GetDiagnosticsResponse:
+    """
+    getDiagnosticsリクエストをワーカースレッドで処理する
+
+    モデル・ファイルの内容が同じリクエストが処理中の場合は、新たに処理せずにその結果を共有します。
+    getFileContentとは結果を共有しませんが、同じファイルのパースはワークブックキャッシュ
+    （WorkbookCache）が読み込み中のセッションを共有するため1回だけ行われます。
+
+    Args:
+        pipelines: モデル名と起動時に準備したパイプラインのマッピング
+        request: getDiagnosticsリクエスト
+
+    Returns:
+        GetDiagnosticsResponse: バリデーション結果
+    """
+    pipeline = find_pipeline(pipelines, request.model_id)
+    excel_path = resolve_excel_path(pipeline.model, request.excel_path)
+    key = ("getDiagnostics", pipeline, file_fingerprint(excel_path))
+    return await _single_flight.run(key, lambda: run_in_worker(handle_get_diagnostics, pipelines, request))
+
+
+async def serve_get_file_content(
+    pipelines: Mapping[str, ModelPipeline], request: GetFileContentRequest
+) -> GetFileContentResponse:
+    """
+    getFileContentリクエストをワーカースレッドで処理する
+
+    モデル・ファイルの内容・出力形式が同じリクエストが処理中の場合は、新たに処理せずにその結果を共有します。
+    出力形式が異なるリクエストやgetDiagnosticsとは結果を共有しませんが、同じファイルのパースは
+    ワークブックキャッシュ（WorkbookCache）が読み込み中のセッションを共有するため1回だけ行われます。
+
+    Args:
+        pipelines: モデル名と起動時に準備したパイプラインのマッピング
+        request: getFileContentリクエスト
+
+    Returns:
+        GetFileContentResponse: 構造化テキスト
+    """
+    pipeline = find_pipeline(pipelines, request.model_id)
+    excel_path = resolve_excel_path(pipeline.model, request.excel_path)
+    key = ("getFileContent", pipeline, file_fingerprint(excel_path), request.output_format or "json")
+    return await _single_flight.run(key, lambda: run_in_worker(handle_get_file_content, pipelines, request))
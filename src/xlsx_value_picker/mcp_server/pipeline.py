@@ -0,0 +1,117 @@
+"""
+MCPサーバーでモデルごとに起動時に準備しておく処理
+
+モデル設定の抽出計画・コンパイル済みのルール・出力フォーマッターをまとめて保持し、
+ツール呼び出しではExcelファイルごとの処理だけを行えるようにします。
+"""
+
+import logging
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from xlsx_value_picker.config_loader import MCPAvailableConfigModel
+from xlsx_value_picker.excel_processor import ExcelValueExtractor, WorkbookSession
+from xlsx_value_picker.output_formatter import OutputFormatter
+from xlsx_value_picker.validation import ValidationEngine
+from xlsx_value_picker.validator.validation_common import ValidationResult
+
+logger = logging.getLogger(__name__)
+
+
+class ModelPipeline:
+    """
+    1つのモデルについて、値の抽出・バリデーション・出力の準備を済ませたもの
+
+    複数のワーカースレッドから同時に使用できます。
+    """
+
+    def __init__(self, model: MCPAvailableConfigModel):
+        """
+        初期化（ルールのコンパイルと出力フォーマッターの作成を行う）
+
+        Args:
+            model: モデル設定
+        """
+        self.model = model
+        self.extraction_plan = model.extraction_plan
+        self.validation_engine = ValidationEngine(model.rules)
+        self.formatter = OutputFormatter(model)
+
+    @property
+    def model_name(self) -> str | None:
+        """モデル名"""
+        return self.model.model_name
+
+    def extract(self, session: WorkbookSession) -> dict[str, Any]:
+        """
+        Excelファイルから値を抽出する
+
+        Args:
+            session: ワークブックのセッション（共有のセッションの場合も閉じない）
+
+        Returns:
+            dict[str, Any]: フィールド名と値のマッピング（空セルを除く）
+        """
+        with ExcelValueExtractor(session) as extractor:
+            return extractor.extract_values(self.model)
+
+    def validate(self, session: WorkbookSession) -> list[ValidationResult]:
+        """
+        Excelファイルの値をバリデーションする
+
+        Args:
+            session: ワークブックのセッション
+
+        Returns:
+            list[ValidationResult]: バリデーション結果（エラーがなければ空リスト）
+        """
+        # エンジンは直前の結果を保持するため、コンパイル済みのルールを共有する別のエンジンで検証する
+        return self.validation_engine.spawn().validate(session, self.extraction_plan)
+
+
+def build_model_index(
+    models: Iterable[MCPAvailableConfigModel], previous: Mapping[str, ModelPipeline] | None = None
+) -> dict[str, ModelPipeline]:
+    """
+    モデル名からパイプラインを引く索引を作成する
+
+    モデル名のないモデルは索引に含めません。同じ名前のモデルが複数ある場合は最初のモデルを使い、警告をログに出力します。
+
+    Args:
+        models: モデル設定
+        previous: 以前の索引（同じモデルオブジェクトのパイプラインは作り直さずに使う）
+
+    Returns:
+        dict[str, ModelPipeline]: モデル名とパイプラインのマッピング
+    """
+    previous = previous or {}
+    index: dict[str, ModelPipeline] = {}
+    for model in models:
+        if model.model_name is None:
+            continue
+        if model.model_name in index:
+            logger.warning(f"モデル名 '{model.model_name}' が重複しているため、後に定義されたモデルは使用しません")
+            continue
+        pipeline = previous.get(model.model_name)
+        index[model.model_name] = pipeline if pipeline is not None and pipeline.model is model else ModelPipeline(model)
+    return index
+
+
+def find_pipeline(pipelines: Mapping[str, ModelPipeline], model_id: str) -> ModelPipeline:
+    """
+    モデルIDに対応するパイプラインを取得する
+
+    Args:
+        pipelines: モデル名とパイプラインのマッピング
+        model_id: モデルID
+
+    Returns:
+        ModelPipeline: パイプライン
+
+    Raises:
+        ValueError: 指定されたモデルIDが見つからない場合
+    """
+    pipeline = pipelines.get(model_id)
+    if pipeline is None:
+        raise ValueError(f"指定されたモデルID '{model_id}' が見つかりません")
+    return pipeline
@@ -49,6 +49,9 @@ class GetDiagnosticsRequest(BaseModel):
     """getDiagnosticsリクエストのパラメータ"""
 
     model_id: str = Field(..., description="診断を実行するモデルID")
+    excel_path: str | None = Field(
+        None, description="検証するExcelファイルのパス（省略した場合はモデルに設定されたパス）"
+    )
 
 
 class GetDiagnosticsResponse(BaseModel):
@@ -62,6 +65,9 @@ class GetFileContentRequest(BaseModel):
     """getFileContentリクエストのパラメータ"""
 
     model_id: str = Field(..., description="コンテンツを取得するモデルID")
+    excel_path: str | None = Field(
+        None, description="値を取得するExcelファイルのパス（省略した場合はモデルに設定されたパス）"
+    )
     output_format: str | None = Field("json", description="出力形式（json, yaml, markdown, csvなど）")
 
 
@@ -4,15 +4,24 @@ MCPサーバーの起動および管理を行うモジュール
 
 import logging
 import sys
+from typing import Any
 
 from xlsx_value_picker.config_loader import ConfigLoader, ConfigLoadError, ConfigValidationError
 
 from .handlers import (
-    handle_get_diagnostics,
-    handle_get_file_content,
+    get_single_flight,
     handle_get_model_info,
+    serve_get_diagnostics,
+    serve_get_file_content,
 )
-from .protocol import GetDiagnosticsRequest, GetFileContentRequest, GetModelInfoRequest
+from .protocol import (
+    GetDiagnosticsRequest,
+    GetDiagnosticsResponse,
+    GetFileContentRequest,
+    GetFileContentResponse,
+    GetModelInfoRequest,
+)
+from .watcher import ModelConfigWatcher
 
 # ロガー設定
 logger = logging.getLogger(__name__)
@@ -32,13 +41,14 @@ def setup_logging(level: int = logging.INFO) -> None:
     )
 
 
-def main(config_path: str = "mcp.yaml", log_level: int = logging.INFO) -> None:
+def main(config_path: str = "mcp.yaml", log_level: int = logging.INFO, reload_interval: float = 2.0) -> None:
     """
     MCPサーバーのメインエントリーポイント
 
     Args:
         config_path: MCP設定ファイルのパス（デフォルト: mcp.yaml）
         log_level: ロギングレベル（デフォルト: INFO）
+        reload_interval: モデル設定ファイルの変更を確認する間隔（秒、0以下の場合は確認しない）
     """
     # ロギングの設定
     setup_logging(log_level)
@@ -65,16 +75,24 @@ def main(config_path: str = "mcp.yaml", log_level: int = logging.INFO) -> None:
         server.add_tool(
             name="getModelInfo",
             fn=lambda request_dict: handle_get_model_info(
-                mcp_config.loaded_models, GetModelInfoRequest.model_validate(request_dict)
+                mcp_config.model_index, GetModelInfoRequest.model_validate(request_dict)
             ),
             description=mcp_config.config.tool_descriptions.get("getModelInfo", "特定のモデルの詳細情報を取得します"),
         )
 
+        # Excelファイルを読み込むツールはワーカースレッドで実行し、イベントループをブロックしない
+        # （同時に届いた同じリクエストは1回だけ処理する）
+        async def get_diagnostics(request_dict: dict[str, Any]) -> GetDiagnosticsResponse:
+            request = GetDiagnosticsRequest.model_validate(request_dict)
+            return await serve_get_diagnostics(mcp_config.model_index, request)
+
+        async def get_file_content(request_dict: dict[str, Any]) -> GetFileContentResponse:
+            request = GetFileContentRequest.model_validate(request_dict)
+            return await serve_get_file_content(mcp_config.model_index, request)
+
         server.add_tool(
             name="getDiagnostics",
-            fn=lambda request_dict: handle_get_diagnostics(
-                mcp_config.loaded_models, GetDiagnosticsRequest.model_validate(request_dict)
-            ),
+            fn=get_diagnostics,
             description=mcp_config.config.tool_descriptions.get(
                 "getDiagnostics", "モデルのバリデーション結果を取得します"
             ),
@@ -82,17 +100,27 @@ def main(config_path: str = "mcp.yaml", log_level: int = logging.INFO) -> None:
 
         server.add_tool(
             name="getFileContent",
-            fn=lambda request_dict: handle_get_file_content(
-                mcp_config.loaded_models, GetFileContentRequest.model_validate(request_dict)
-            ),
+            fn=get_file_content,
             description=mcp_config.config.tool_descriptions.get(
                 "getFileContent", "Excelファイルの内容を構造化テキストで取得します"
             ),
         )
 
+        # モデル設定ファイルの変更を監視し、再起動せずに反映する
+        watcher = ModelConfigWatcher(mcp_config, reload_interval) if reload_interval > 0 else None
+
         # サーバー起動
         logger.info("MCPサーバーが初期化されました。リクエスト待機中...")
-        server.run()  # デフォルトでstdioトランスポートで起動
+        if watcher is None:
+            server.run()  # デフォルトでstdioトランスポートで起動
+        else:
+            with watcher:
+                server.run()
+
+        stats = get_single_flight().stats
+        logger.info(
+            f"MCPサーバーを終了しました（ツール呼び出し: {stats.calls}回、処理中の結果を共有: {stats.coalesced}回）"
+        )
 
     except ConfigLoadError as e:
         logger.error(f"設定ファイルの読み込みエラー: {e}")
@@ -0,0 +1,112 @@
+"""
+MCPサーバーを再起動せずにモデル設定の変更を反映する仕組み
+
+MCP設定ファイルの models が参照するモデル設定ファイル（glob パターンの場合は一致するファイルの追加・削除を含む）の
+更新時刻とサイズを一定間隔で確認し、変更があれば読み込み直します。
+読み込み直す際は変更されたファイルだけを検証し直し（ModelFileCache）、変更されていないモデルのパイプラインや
+ワークブックキャッシュはそのまま使います。
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from xlsx_value_picker.config_loader import MCPConfig, get_model_file_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ModelConfigWatcher:
+    """モデル設定ファイルの変更を定期的に確認し、MCP設定のモデルを読み込み直すクラス"""
+
+    def __init__(self, mcp_config: MCPConfig, interval: float = 2.0):
+        """
+        初期化（現在のファイルの状態を記録する）
+
+        Args:
+            mcp_config: モデルをキャッシュ済みのMCP設定
+            interval: 変更を確認する間隔（秒）
+        """
+        self.mcp_config = mcp_config
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "ModelConfigWatcher":
+        """コンテキストマネージャの開始時に監視を開始する"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """コンテキストマネージャの終了時に監視を停止する"""
+        self.stop()
+
+    def _take_snapshot(self) -> dict[Path, tuple[int, int]]:
+        """参照するモデル設定ファイルの更新時刻とサイズを取得する（参照できないファイルは含めない）"""
+        snapshot = {}
+        for definition in self.mcp_config.models:
+            for path in definition.config_paths(self.mcp_config):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def check(self) -> bool:
+        """
+        モデル設定ファイルが変更されていれば読み込み直す
+
+        読み込みに失敗した場合は、エラーをログに出力して以前のモデルを使い続けます
+        （ファイルがさらに変更された時点で再び読み込みます）。
+
+        Returns:
+            bool: 変更があった場合はTrue
+        """
+        # 読み込み中に変更された場合に次の確認で検出できるよう、読み込む前の状態を記録する
+        snapshot = self._take_snapshot()
+        if snapshot == self._snapshot:
+            return False
+        self._snapshot = snapshot
+
+        cache = get_model_file_cache()
+        loads = cache.loads
+        start = time.perf_counter()
+        try:
+            self.mcp_config.cache_models()
+        except Exception as e:
+            logger.error(f"モデル設定の再読み込みに失敗しました（以前の設定を使い続けます）: {e}")
+            return True
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"モデル設定を再読み込みしました（再検証したファイル: {cache.loads - loads}件、"
+            f"モデル数: {len(self.mcp_config.loaded_models)}、所要時間: {elapsed * 1000:.1f}ms）"
+        )
+        return True
+
+    def start(self) -> None:
+        """バックグラウンドのスレッドで監視を開始する"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="xlsx-value-picker-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """監視を停止する"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                # 監視のスレッドは例外で終了させない
+                logger.exception("モデル設定の変更の確認中にエラーが発生しました")
@@ -2,14 +2,146 @@
 設定に基づく出力フォーマット機能
 """
 
-import json
+import csv
+import io
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping, Sequence
 from pathlib import Path
-from typing import Any
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self, TextIO
 
-import jinja2
-import yaml
+from . import json_encoder, yaml_io
+from .config_loader import ConfigModel, CsvOptions
 
-from .config_loader import ConfigModel
+if TYPE_CHECKING:
+    import jinja2
+
+
+class RecordWriter(ABC):
+    """
+    レコード（1ファイルや1行分の抽出結果）を1件ずつ出力先に書き込むライター
+
+    全体の文字列を組み立てずにレコードごとに書き込むため、レコード数によらずメモリ使用量は一定です。
+    with 文で使用すると、終了時に出力先をフラッシュし、自分で開いたファイルは閉じます。
+    """
+
+    # レコードを表の1行（フィールド名と値の組）として書き込むかどうか
+    tabular = False
+
+    def __init__(self, stream: TextIO, *, close_stream: bool = False, flush_each: bool = True):
+        """
+        初期化
+
+        Args:
+            stream: 書き込み先のテキストストリーム
+            close_stream: close() でストリームも閉じるかどうか
+            flush_each: レコードを書き込むたびにフラッシュするかどうか（読み手が逐次読めるようにする）
+        """
+        self.stream = stream
+        self.close_stream = close_stream
+        self.flush_each = flush_each
+        self.count = 0
+
+    @abstractmethod
+    def _write(self, record: Mapping[str, Any]) -> None:
+        """レコード1件をストリームに書き込む"""
+
+    def write_record(self, record: Mapping[str, Any]) -> None:
+        """
+        レコードを1件書き込む
+
+        Args:
+            record: 書き込むレコード
+        """
+        self._write(record)
+        self.count += 1
+        if self.flush_each:
+            self.stream.flush()
+
+    def write_records(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """
+        レコードを順に書き込む
+
+        Args:
+            records: 書き込むレコード（ジェネレーターも可）
+
+        Returns:
+            int: 書き込んだレコード数
+        """
+        written = 0
+        for record in records:
+            self.write_record(record)
+            written += 1
+        return written
+
+    def close(self) -> None:
+        """出力先をフラッシュし、自分で開いたストリームを閉じる"""
+        if self.stream.closed:
+            return
+        self.stream.flush()
+        if self.close_stream:
+            self.stream.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        self.close()
+
+
+class JsonLinesWriter(RecordWriter):
+    """
+    レコードを JSON Lines 形式（1行に1つの改行・空白なしのJSONオブジェクト）で書き込むライター
+    """
+
+    def _write(self, record: Mapping[str, Any]) -> None:
+        # JSONにない型の値は（Excelの時間間隔のセルなども含めて）文字列として書き込む
+        self.stream.write(json_encoder.dumps(record, compact=True, str_fallback=True) + "\n")
+
+
+class CsvWriter(RecordWriter):
+    """
+    レコードを CSV 形式で1行ずつ書き込むライター
+
+    ヘッダー行は初期化時に書き込むため、レコードの有無や順序によらず列は常に同じです。
+    レコードにない列や値が None の列には CsvOptions.null_value を書き込みます。
+    ファイルに書き込む場合は、改行コードが変換されないよう newline="" で開いたストリームを渡してください。
+    """
+
+    tabular = True
+
+    def __init__(
+        self,
+        stream: TextIO,
+        fieldnames: Sequence[str],
+        options: CsvOptions | None = None,
+        *,
+        close_stream: bool = False,
+        flush_each: bool = True,
+    ):
+        """
+        初期化
+
+        Args:
+            stream: 書き込み先のテキストストリーム
+            fieldnames: 列名（ヘッダー行）
+            options: CSV出力の設定（Noneの場合はデフォルト）
+            close_stream: close() でストリームも閉じるかどうか
+            flush_each: レコードを書き込むたびにフラッシュするかどうか
+        """
+        super().__init__(stream, close_stream=close_stream, flush_each=flush_each)
+        self.fieldnames = list(fieldnames)
+        self.options = options or CsvOptions()
+        self._writer = csv.writer(stream, dialect=self.options.dialect)
+        self._writer.writerow(self.fieldnames)
+
+    def _write(self, record: Mapping[str, Any]) -> None:
+        null_value = self.options.null_value
+        values = (record.get(name) for name in self.fieldnames)
+        self._writer.writerow([null_value if value is None else value for value in values])
 
 
 class OutputFormatter:
@@ -27,17 +159,19 @@ class OutputFormatter:
         self.config = config
         self.output_config = config.output
 
-    def format_output(self, data: dict[str, Any]) -> str:
+    def format_output(self, data: dict[str, Any], output_format: str | None = None) -> str:
         """
         データを設定に基づいて指定された形式に変換する
 
         Args:
             data: 出力するデータ
+            output_format: 出力形式（Noneの場合は設定の形式）
+                           呼び出しごとに形式を変える場合も設定を書き換えずにこの引数で指定します。
 
         Returns:
             str: フォーマットされた出力文字列
         """
-        output_format = self.output_config.format
+        output_format = output_format or self.output_config.format
 
         if output_format == "json":
             return self._format_json(data)
@@ -45,6 +179,8 @@ class OutputFormatter:
             return self._format_yaml(data)
         elif output_format == "jinja2":
             return self._format_jinja2(data)
+        elif output_format == "csv":
+            return self._format_csv(data)
         else:
             raise ValueError(f"サポートされていない出力形式です: {output_format}")
 
@@ -58,7 +194,7 @@ class OutputFormatter:
         Returns:
             str: JSON文字列
         """
-        return json.dumps(data, ensure_ascii=False, indent=2)
+        return json_encoder.dumps(data)
 
     def _format_yaml(self, data: dict[str, Any]) -> str:
         """
@@ -70,7 +206,21 @@ class OutputFormatter:
         Returns:
             str: YAML文字列
         """
-        return yaml.dump(data, sort_keys=False, allow_unicode=True)
+        return yaml_io.dump(data, sort_keys=False, allow_unicode=True)
+
+    def _format_csv(self, data: dict[str, Any]) -> str:
+        """
+        データをCSV形式（ヘッダー行と値の行）に変換する
+
+        Args:
+            data: 出力するデータ
+
+        Returns:
+            str: CSV文字列
+        """
+        buffer = io.StringIO()
+        CsvWriter(buffer, list(self.config.fields), self.output_config.csv).write_record(data)
+        return buffer.getvalue()
 
     def _format_jinja2(self, data: dict[str, Any]) -> str:
         """
@@ -85,6 +235,22 @@ class OutputFormatter:
         Raises:
             ValueError: テンプレートが指定されていない場合
         """
+        return self._get_jinja2_template().render(**data)
+
+    def _get_jinja2_template(self) -> "jinja2.Template":
+        """
+        設定のテンプレートをコンパイル済みのテンプレートとして取得する
+
+        Returns:
+            jinja2.Template: コンパイル済みのテンプレート
+
+        Raises:
+            ValueError: テンプレートが指定されていない場合
+            FileNotFoundError: テンプレートファイルが存在しない場合
+        """
+        # jinja2 を読み込むため、Jinja2形式で出力する場合だけインポートする
+        from .template_cache import get_template, read_template_file
+
         template_str = None
 
         # テンプレート文字列の取得
@@ -95,35 +261,68 @@ class OutputFormatter:
             if not template_path.exists():
                 raise FileNotFoundError(f"テンプレートファイルが見つかりません: {template_path}")
 
-            with open(template_path, encoding="utf-8") as f:
-                template_str = f.read()
+            template_str = read_template_file(template_path)
         else:
             raise ValueError("Jinja2出力形式の場合、templateまたはtemplate_fileが必要です")
 
-        # テンプレートの適用
-        env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader("."), autoescape=jinja2.select_autoescape(["html", "xml"])
-        )
-        template = env.from_string(template_str)
-
-        return template.render(**data)
+        # コンパイル済みのテンプレートはソースのハッシュごとに共有される
+        return get_template(template_str)
 
-    def write_output(self, data: dict[str, Any], output_path: str | Path | None = None) -> str:
+    def write_output(self, data: dict[str, Any], output_path: str | Path | None = None) -> str | None:
         """
         データを設定に基づいてフォーマットし、指定されたパスに書き込む
 
+        出力先を指定した場合、Jinja2形式はテンプレートの出力を全体の文字列にせずにチャンクごとにファイルへ書き込みます。
+        そのため、レンダリング中にエラーが発生した場合は途中までの内容がファイルに残ります。
+
         Args:
             data: 出力するデータ
             output_path: 出力先パス（Noneの場合は文字列を返す）
 
         Returns:
-            str: フォーマットされた出力文字列
+            str | None: フォーマットされた出力文字列（出力先を指定した場合はNone）
         """
-        formatted_output = self.format_output(data)
+        if not output_path:
+            return self.format_output(data)
 
-        # 出力先が指定されている場合は書き込む
-        if output_path:
-            with open(output_path, "w", encoding="utf-8") as f:
+        if self.output_config.format == "jinja2":
+            # テンプレートの取得でエラーになる場合は出力先を開かない
+            template = self._get_jinja2_template()
+            with self._open_output(output_path) as f:
+                f.writelines(template.generate(**data))
+        else:
+            formatted_output = self.format_output(data)
+            with self._open_output(output_path) as f:
                 f.write(formatted_output)
+        return None
+
+    def open_record_writer(
+        self, output_path: str | Path | None = None, *, extra_fields: Sequence[str] = (), flush_each: bool = True
+    ) -> RecordWriter:
+        """
+        レコードを1件ずつ書き込むライターを開く
+
+        出力形式が csv の場合は CSV 形式、それ以外の場合は JSON Lines 形式のライターを返します。
+
+        Args:
+            output_path: 出力先パス（Noneの場合は標準出力）
+            extra_fields: CSV形式の場合に、設定ファイルのフィールドの前に追加する列
+            flush_each: レコードを書き込むたびにフラッシュするかどうか
+
+        Returns:
+            RecordWriter: レコードのライター
+        """
+        stream = self._open_output(output_path) if output_path else sys.stdout
+        close_stream = bool(output_path)
+        if self.output_config.format == "csv":
+            fieldnames = [*extra_fields, *self.config.fields]
+            return CsvWriter(
+                stream, fieldnames, self.output_config.csv, close_stream=close_stream, flush_each=flush_each
+            )
+        return JsonLinesWriter(stream, close_stream=close_stream, flush_each=flush_each)
 
-        return formatted_output
+    def _open_output(self, output_path: str | Path) -> TextIO:
+        """出力形式に合わせた文字コード・改行コードで出力先ファイルを開く"""
+        if self.output_config.format == "csv":
+            return open(output_path, "w", encoding=self.output_config.csv.encoding, newline="")
+        return open(output_path, "w", encoding="utf-8")
@@ -0,0 +1,168 @@
+"""
+コンパイル済みJinja2テンプレートのキャッシュ
+
+Jinja2 のテンプレートのコンパイルは、レンダリングそのものより時間がかかります。
+このモジュールはプロセス全体で1つの Environment を共有し、テンプレートをソースのハッシュをキーとして
+キャッシュするため、同じテンプレートはバッチ処理やMCPサーバーの中で1回だけコンパイルされます。
+
+環境変数 XLSX_VALUE_PICKER_JINJA2_CACHE_DIR（または set_bytecode_cache_dir）でディレクトリを指定すると、
+コンパイル結果をディスクにも保存し、プロセスをまたいで再利用します。
+jinja2 のインポートが必要なため、このモジュールは Jinja2 形式で出力する場合だけインポートしてください。
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+import jinja2
+
+# バイトコードキャッシュのディレクトリを指定する環境変数
+JINJA2_CACHE_DIR_ENV = "XLSX_VALUE_PICKER_JINJA2_CACHE_DIR"
+
+# 保持するテンプレートの数の上限（Environment のキャッシュサイズと同じ）
+CACHE_SIZE = 400
+
+# ソース文字列から作成したテンプレートの名前の接頭辞（ファイル名と重ならないようにする）
+_SOURCE_NAME_PREFIX = "<template sha256:"
+
+_select_autoescape = jinja2.select_autoescape(["html", "xml"])
+
+
+class _SourceHashLoader(jinja2.BaseLoader):
+    """ソース文字列をハッシュから作成した名前で登録し、Environment から読み込めるようにするローダー"""
+
+    def __init__(self) -> None:
+        self._sources: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, source: str) -> str:
+        """
+        ソース文字列を登録する
+
+        Args:
+            source: テンプレートのソース文字列
+
+        Returns:
+            str: テンプレート名
+        """
+        name = f"{_SOURCE_NAME_PREFIX}{hashlib.sha256(source.encode('utf-8')).hexdigest()}>"
+        with self._lock:
+            self._sources[name] = source
+            self._sources.move_to_end(name)
+            while len(self._sources) > CACHE_SIZE:
+                self._sources.popitem(last=False)
+        return name
+
+    def get_source(self, environment: jinja2.Environment, template: str) -> tuple[str, str | None, Callable[[], bool]]:
+        with self._lock:
+            source = self._sources.get(template)
+        if source is None:
+            raise jinja2.TemplateNotFound(template)
+        # 名前はソースのハッシュなので、同じ名前のテンプレートは常に最新
+        return source, None, lambda: True
+
+
+def _autoescape(template_name: str | None) -> bool:
+    """ソース文字列のテンプレートは from_string と同じく自動エスケープし、ファイルは拡張子で判定する"""
+    if template_name is None or template_name.startswith(_SOURCE_NAME_PREFIX):
+        return True
+    return _select_autoescape(template_name)
+
+
+_source_loader = _SourceHashLoader()
+_environment: jinja2.Environment | None = None
+_environment_lock = threading.Lock()
+
+# テンプレートファイルのソース（絶対パス -> ((更新日時, サイズ), ソース)）
+_file_sources: OrderedDict[str, tuple[tuple[int, int], str]] = OrderedDict()
+_file_sources_lock = threading.Lock()
+
+
+def get_environment() -> jinja2.Environment:
+    """
+    共有の Jinja2 Environment を取得する（初回呼び出し時に作成する）
+
+    include や extends で参照するテンプレートは、従来どおりカレントディレクトリから読み込みます。
+
+    Returns:
+        jinja2.Environment: 共有の Environment
+    """
+    global _environment
+    if _environment is None:
+        with _environment_lock:
+            if _environment is None:
+                environment = jinja2.Environment(
+                    loader=jinja2.ChoiceLoader([_source_loader, jinja2.FileSystemLoader(".")]),
+                    autoescape=_autoescape,
+                    cache_size=CACHE_SIZE,
+                )
+                cache_dir = os.environ.get(JINJA2_CACHE_DIR_ENV)
+                if cache_dir:
+                    environment.bytecode_cache = _create_bytecode_cache(cache_dir)
+                _environment = environment
+    return _environment
+
+
+def set_bytecode_cache_dir(cache_dir: str | Path | None) -> None:
+    """
+    コンパイル結果をディスクに保存するディレクトリを設定する
+
+    Args:
+        cache_dir: キャッシュディレクトリ（存在しない場合は作成する。Noneの場合はディスクに保存しない）
+    """
+    get_environment().bytecode_cache = _create_bytecode_cache(cache_dir) if cache_dir else None
+
+
+def _create_bytecode_cache(cache_dir: str | Path) -> jinja2.FileSystemBytecodeCache:
+    os.makedirs(cache_dir, exist_ok=True)
+    return jinja2.FileSystemBytecodeCache(str(cache_dir))
+
+
+def get_template(source: str) -> jinja2.Template:
+    """
+    ソース文字列からコンパイル済みのテンプレートを取得する
+
+    同じソースのテンプレートは、キャッシュから外れるまで再コンパイルせずに同じオブジェクトを返します。
+
+    Args:
+        source: テンプレートのソース文字列
+
+    Returns:
+        jinja2.Template: コンパイル済みのテンプレート
+    """
+    return get_environment().get_template(_source_loader.register(source))
+
+
+def read_template_file(template_path: str | Path) -> str:
+    """
+    テンプレートファイルを読み込む（更新日時とサイズが変わっていなければ前回読み込んだ内容を返す）
+
+    Args:
+        template_path: テンプレートファイルのパス
+
+    Returns:
+        str: テンプレートのソース文字列
+
+    Raises:
+        OSError: ファイルを読み込めない場合
+    """
+    path = os.path.abspath(template_path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _file_sources_lock:
+        cached = _file_sources.get(path)
+        if cached is not None and cached[0] == signature:
+            _file_sources.move_to_end(path)
+            return cached[1]
+
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    with _file_sources_lock:
+        _file_sources[path] = (signature, source)
+        _file_sources.move_to_end(path)
+        while len(_file_sources) > CACHE_SIZE:
+            _file_sources.popitem(last=False)
+    return source
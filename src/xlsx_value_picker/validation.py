@@ -7,12 +7,19 @@
 
 # config_loader ではなく validation_common からクラスをインポート
 # 前方参照型を使ってRuleをインポート
-from typing import TYPE_CHECKING
-
+import copy
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any
+
+from xlsx_value_picker.exceptions import ValidationError
+from xlsx_value_picker.extraction_plan import ExtractionPlan
+from xlsx_value_picker.validator.rule_compiler import compile_rule
 from xlsx_value_picker.validator.validation_common import ValidationContext, ValidationResult
 
 if TYPE_CHECKING:
     from xlsx_value_picker.config_loader import Rule
+    from xlsx_value_picker.excel_processor import WorkbookSession
 
 
 class ValidationEngine:
@@ -20,24 +27,83 @@ class ValidationEngine:
     バリデーションエンジン
 
     ルールリストに基づいてバリデーションを実行するエンジンです。
+    フィールド名から、そのフィールドを参照するルールへの索引を持ち、直前の validate の結果を保持して
+    一部のフィールドが変更された場合に影響を受けるルールだけを再評価できます（revalidate）。
+    revalidate は直前の結果を更新するため、同じエンジンに対して並行して呼び出さないでください。
     """
 
-    def __init__(self, rules: list["Rule"]):
+    def __init__(self, rules: list["Rule"], full_diagnostics: bool = False):
         """
         初期化メソッド
 
         Args:
             rules: 検証に使用するルールのリスト
+            full_diagnostics: all_of の失敗時に、最初に失敗した条件だけでなく失敗したすべての条件の
+                              フィールドをエラーに含めるかどうか
         """
         self.rules = rules
+        self.full_diagnostics = full_diagnostics
+        # ルールの式は初期化時に一度だけ関数にコンパイルし、検証のたびにモデルをたどらないようにする
+        self.compiled_rules = [compile_rule(rule, full_diagnostics) for rule in rules]
+
+        # フィールド名 -> そのフィールドを参照するルールの番号
+        field_index: dict[str, list[int]] = defaultdict(list)
+        # 参照するフィールドを特定できないルール（変更のたびに再評価する）
+        self._unindexed_rules: tuple[int, ...] = tuple(
+            index for index, compiled in enumerate(self.compiled_rules) if compiled.fields is None
+        )
+        for index, compiled in enumerate(self.compiled_rules):
+            for field in compiled.fields or ():
+                field_index[field].append(index)
+        self.field_index: dict[str, tuple[int, ...]] = {field: tuple(indices) for field, indices in field_index.items()}
+        # ルールが参照するフィールド（特定できないルールがある場合はNoneで、すべてのフィールドを取得する）
+        self.referenced_fields: frozenset[str] | None = None if self._unindexed_rules else frozenset(self.field_index)
+
+        # 直前の validate / revalidate のコンテキストとルールごとの結果（成功したルールはNone）
+        self._context: ValidationContext | None = None
+        self._rule_results: list[ValidationResult | None] = []
+
+    def spawn(self) -> "ValidationEngine":
+        """
+        コンパイル済みのルールと索引を共有し、直前の結果を持たない新しいエンジンを作成する
+
+        ルールをコンパイルし直さずに、並行する検証ごとに別のエンジンを使うためのメソッドです。
+
+        Returns:
+            ValidationEngine: 新しいエンジン
+        """
+        engine = copy.copy(self)
+        engine._context = None
+        engine._rule_results = []
+        return engine
+
+    def rules_for_fields(self, fields: Iterable[str]) -> list[int]:
+        """
+        指定したフィールドのいずれかを参照するルールの番号を取得する
+
+        Args:
+            fields: フィールド名
 
-    def validate(self, excel_file: str, field_mapping: dict[str, str]) -> list[ValidationResult]:
+        Returns:
+            list[int]: ルールの番号（昇順、参照するフィールドを特定できないルールを含む）
+        """
+        affected = set(self._unindexed_rules)
+        for field in fields:
+            affected.update(self.field_index.get(field, ()))
+        return sorted(affected)
+
+    def validate(
+        self, excel_file: "str | WorkbookSession", field_mapping: dict[str, str] | ExtractionPlan
+    ) -> list[ValidationResult]:
         """
         バリデーションを実行する
 
+        Excelからはルールが参照するフィールドの値だけを取得します。
+        エラー位置の解決には、参照されていないフィールドを含むマッピング全体を使います。
+
         Args:
-            excel_file: Excelファイルのパス
-            field_mapping: フィールド名とセル位置のマッピング
+            excel_file: Excelファイルのパス、または読み込み済みのWorkbookSession
+            field_mapping: フィールド名とセル位置のマッピング、または抽出計画
 
         Returns:
             ValidationResultのリスト（エラーがなければ空リスト）
@@ -45,21 +111,66 @@ class ValidationEngine:
         from .excel_processor import get_excel_values
 
         # Excelから値を取得
-        cell_values = get_excel_values(excel_file, field_mapping)
+        cell_values = get_excel_values(excel_file, self._referenced_targets(field_mapping))
+        if isinstance(field_mapping, ExtractionPlan):
+            field_mapping = field_mapping.field_mapping
 
-        # コンテキストを構築
-        context = ValidationContext(cell_values=cell_values, field_locations=field_mapping)
+        # コンテキストを構築（revalidate で値を更新するため、取得した値はコピーして保持する）
+        context = ValidationContext(cell_values=dict(cell_values), field_locations=field_mapping)
 
         # すべてのルールを評価
-        results = []
-        for rule in self.rules:
-            result = rule.validate(context)
-            if not result.is_valid:
-                # エラー位置情報を追加
-                if result.error_fields:
-                    result.error_locations = [
-                        field_mapping.get(field, "不明") for field in result.error_fields if field in field_mapping
-                    ]
-                results.append(result)
-
-        return results
+        rule_results = [self._evaluate(context, index) for index in range(len(self.compiled_rules))]
+        self._context, self._rule_results = context, rule_results
+        return [result for result in rule_results if result is not None]
+
+    def _referenced_targets(self, field_mapping: dict[str, str] | ExtractionPlan) -> dict[str, str] | ExtractionPlan:
+        """値を取得する対象を、ルールが参照するフィールドに絞り込む"""
+        referenced = self.referenced_fields
+        if referenced is None:
+            return field_mapping
+        if isinstance(field_mapping, ExtractionPlan):
+            return field_mapping.subset(referenced)
+        return {field: cell_ref for field, cell_ref in field_mapping.items() if field in referenced}
+
+    def revalidate(self, changed: Mapping[str, Any]) -> list[ValidationResult]:
+        """
+        一部のフィールドの値が変更された場合に、影響を受けるルールだけを再評価する
+
+        直前の validate（または revalidate）のコンテキストに変更後の値を反映し、変更されたフィールドを
+        参照するルールだけを評価し直します。それ以外のルールは直前の結果をそのまま使います。
+
+        Args:
+            changed: 変更されたフィールド名と変更後の値のマッピング
+
+        Returns:
+            ValidationResultのリスト（すべてのルールの結果。エラーがなければ空リスト）
+
+        Raises:
+            ValidationError: validate がまだ実行されていない場合
+        """
+        context = self._context
+        if context is None:
+            raise ValidationError("revalidate の前に validate を実行してください")
+
+        context.cell_values.update(changed)
+        for index in self.rules_for_fields(changed):
+            self._rule_results[index] = self._evaluate(context, index)
+        return [result for result in self._rule_results if result is not None]
+
+    def _evaluate(self, context: ValidationContext, index: int) -> ValidationResult | None:
+        """
+        コンテキストに対して1つのルールを評価する
+
+        Returns:
+            ValidationResult | None: エラーの場合は検証結果、成功した場合はNone
+        """
+        field_mapping = context.field_locations
+        result = self.compiled_rules[index].validate(context)
+        if result.is_valid:
+            return None
+        # エラー位置情報を追加
+        if result.error_fields:
+            result.error_locations = [
+                field_mapping.get(field, "不明") for field in result.error_fields if field in field_mapping
+            ]
+        return result
@@ -0,0 +1,442 @@
+"""
+バリデーションルールのコンパイル
+
+ルールの式（ExpressionType のツリー）を、設定の読み込み時に一度だけ通常のPython関数に変換します。
+正規表現のコンパイル、列挙値の frozenset 化、比較演算子の関数の解決などを事前に済ませておくことで、
+同じルールセットで大量のレコードを検証する際に、評価のたびに pydantic モデルをたどる処理を省きます。
+
+各式は、真偽値だけを返す述語と、ValidationResult を返す評価関数の2つの形にコンパイルされます。
+all_of / any_of / not の内側は述語で評価し、結果が確定した時点で残りの条件の評価を打ち切ります。
+full_diagnostics=True の場合は、各式の validate_in と同一の ValidationResult を返します
+（all_of の失敗時に、失敗したすべての条件のフィールドを集めます）。
+"""
+
+import operator
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .validation_common import ValidationContext, ValidationResult
+from .validation_expressions import (
+    UNDEFINED,
+    AllOfExpression,
+    AnyOfExpression,
+    CompareExpression,
+    EnumExpression,
+    Expression,
+    IsEmptyExpression,
+    NotExpression,
+    RegexMatchExpression,
+    RequiredExpression,
+)
+
+if TYPE_CHECKING:
+    from xlsx_value_picker.config_loader import Rule
+
+# コンパイル済みの式（コンテキストとエラーメッセージのテンプレートを受け取り、検証結果を返す）
+type CompiledExpression = Callable[[ValidationContext, str], ValidationResult]
+
+# コンパイル済みの述語（コンテキストを受け取り、検証が成功したかどうかだけを返す）
+type CompiledPredicate = Callable[[ValidationContext], bool]
+
+# 大小比較の演算子（型が一致しない場合や None の場合は無効とする）
+_ORDERING_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class _CompiledNode(NamedTuple):
+    """1つの式をコンパイルした述語と評価関数の組"""
+
+    predicate: CompiledPredicate
+    evaluate: CompiledExpression
+
+
+def _valid() -> ValidationResult:
+    """有効な検証結果を返す（呼び出し元で変更されてもよいように毎回生成する）"""
+    return ValidationResult(is_valid=True)
+
+
+def _compile_compare(expr: CompareExpression) -> _CompiledNode:
+    """比較式をコンパイルする"""
+    params = expr.compare
+    left_field = params.left_field
+    right_field = params.right_field
+    op = params.operator
+    fields = [v for v in [left_field, right_field] if not isinstance(v, UNDEFINED)]
+    field_str = ", ".join(fields)
+
+    def value_getter(literal: Any, field: str | UNDEFINED) -> Callable[[ValidationContext], Any]:
+        if not isinstance(literal, UNDEFINED):
+            return lambda context: literal
+        if not isinstance(field, UNDEFINED):
+            return lambda context: context.get_field_value(field)
+        return lambda context: None
+
+    get_left = value_getter(params.left, left_field)
+    get_right = value_getter(params.right, right_field)
+
+    if op == "==":
+        compare: Callable[[Any, Any], bool] = operator.eq
+    elif op == "!=":
+        compare = operator.ne
+    else:
+        ordering = _ORDERING_OPERATORS[op]
+
+        def compare(left: Any, right: Any) -> bool:
+            if left is not None and right is not None and isinstance(left, type(right)):
+                return ordering(left, right)
+            return False
+
+    def predicate(context: ValidationContext) -> bool:
+        try:
+            return bool(compare(get_left(context), get_right(context)))
+        except (TypeError, ValueError):
+            return False
+
+    def evaluate(context: ValidationContext, error_message_template: str) -> ValidationResult:
+        if predicate(context):
+            return _valid()
+
+        msg = error_message_template.format(
+            left_field=left_field,
+            left_value=get_left(context),
+            right_field=right_field,
+            right_value=get_right(context),
+            operator=op,
+            field=field_str,
+        )
+        return ValidationResult(
+            is_valid=False,
+            error_message=msg,
+            error_fields=list(fields),
+            error_locations=[
+                location if location is not None else "NOT_FOUND"
+                for location in {context.get_field_location(field) for field in fields}
+            ],
+        )
+
+    return _CompiledNode(predicate, evaluate)
+
+
+def _compile_field_presence(target: str | list[str], require_value: bool) -> _CompiledNode:
+    """必須項目式・空値チェック式をコンパイルする"""
+    target_fields = (target,) if isinstance(target, str) else tuple(target)
+
+    def is_invalid(value: Any) -> bool:
+        return (value is None or value == "") == require_value
+
+    def predicate(context: ValidationContext) -> bool:
+        return not any(is_invalid(context.get_field_value(field)) for field in target_fields)
+
+    def evaluate(context: ValidationContext, error_message_template: str) -> ValidationResult:
+        invalid_fields = [field for field in target_fields if is_invalid(context.get_field_value(field))]
+        if not invalid_fields:
+            return _valid()
+
+        locations = [
+            location
+            for location in [context.get_field_location(field) for field in invalid_fields]
+            if location is not None
+        ]
+        msg = error_message_template.format(field=", ".join(invalid_fields))
+        return ValidationResult(
+            is_valid=False, error_message=msg, error_fields=invalid_fields, error_locations=locations
+        )
+
+    return _CompiledNode(predicate, evaluate)
+
+
+def _compile_regex_match(expr: RegexMatchExpression) -> _CompiledNode:
+    """正規表現マッチ式をコンパイルする"""
+    target_field = expr.regex_match["field"]
+    pattern = expr.regex_match["pattern"]
+    try:
+        compiled: re.Pattern[str] | None = re.compile(pattern)
+    except re.error:
+        # 無効なパターンは常に無効とする（validate_in と同じ扱い）
+        compiled = None
+
+    def predicate(context: ValidationContext) -> bool:
+        value = context.get_field_value(target_field)
+        if value is None or compiled is None:
+            return False
+        return compiled.match(value if isinstance(value, str) else str(value)) is not None
+
+    def evaluate(context: ValidationContext, error_message_template: str) -> ValidationResult:
+        if predicate(context):
+            return _valid()
+
+        value = context.get_field_value(target_field)
+        msg = error_message_template.format(field=target_field, value=value, pattern=pattern)
+        location = context.get_field_location(target_field)
+        return ValidationResult(
+            is_valid=False,
+            error_message=msg,
+            error_fields=[target_field],
+            error_locations=[location] if location else [],
+        )
+
+    return _CompiledNode(predicate, evaluate)
+
+
+def _compile_enum(expr: EnumExpression) -> _CompiledNode:
+    """列挙型式をコンパイルする"""
+    target_field = expr.enum["field"]
+    allowed_values = expr.enum["values"]
+    allowed_str = ", ".join(str(v) for v in allowed_values)
+    try:
+        allowed_set: frozenset[Any] | None = frozenset(allowed_values)
+    except TypeError:
+        # ハッシュ化できない値が含まれる場合はリストで判定する
+        allowed_set = None
+
+    def predicate(context: ValidationContext) -> bool:
+        value = context.get_field_value(target_field)
+        if allowed_set is not None:
+            try:
+                return value in allowed_set
+            except TypeError:
+                pass
+        return value in allowed_values
+
+    def evaluate(context: ValidationContext, error_message_template: str) -> ValidationResult:
+        if predicate(context):
+            return _valid()
+
+        value = context.get_field_value(target_field)
+        msg = error_message_template.format(field=target_field, value=value, allowed_values=allowed_str)
+        location = context.get_field_location(target_field)
+        return ValidationResult(
+            is_valid=False,
+            error_message=msg,
+            error_fields=[target_field],
+            error_locations=[location] if location else [],
+        )
+
+    return _CompiledNode(predicate, evaluate)
+
+
+def _compile_all_of(expr: AllOfExpression, full_diagnostics: bool) -> _CompiledNode:
+    """全条件一致式をコンパイルする"""
+    children = tuple(_compile(child, full_diagnostics) for child in expr.all_of)
+    predicates = tuple(child.predicate for child in children)
+
+    def predicate(context: ValidationContext) -> bool:
+        return all(child(context) for child in predicates)
+
+    def evaluate(context: ValidationContext, error_message_template: str) -> ValidationResult:
+        if full_diagnostics:
+            results = [child.evaluate(context, "") for child in children]
+        else:
+            # 最初に失敗した条件だけを評価結果として使う
+            failed = next((child for child in children if not child.predicate(context)), None)
+            results = [failed.evaluate(context, "")] if failed is not None else []
+        if all(r.is_valid for r in results):
+            return _valid()
+
+        all_error_fields: list[str] = []
+        all_error_locations: list[str] = []
+        for result in results:
+            if not result.is_valid and result.error_fields:
+                all_error_fields.extend(f for f in result.error_fields if f is not None)
+                for f in result.error_fields:
+                    location = context.get_field_location(f)
+                    if location:
+                        all_error_locations.append(location)
+
+        return ValidationResult(
+            is_valid=False,
+            error_message=error_message_template,
+            error_fields=sorted(set(all_error_fields)),
+            error_locations=sorted(set(all_error_locations)),
+        )
+
+    return _CompiledNode(predicate, evaluate)
+
+
+def _compile_any_of(expr: AnyOfExpression, full_diagnostics: bool) -> _CompiledNode:
+    """いずれかの条件一致式をコンパイルする"""
+    children = tuple(_compile(child, full_diagnostics) for child in expr.any_of)
+    predicates = tuple(child.predicate for child in children)
+
+    def predicate(context: ValidationContext) -> bool:
+        return any(child(context) for child in predicates)
+
+    def evaluate(context: ValidationContext, error_message_template: str) -> ValidationResult:
+        # 成功する条件が見つかった時点で打ち切る（すべて失敗した場合だけ各条件の評価結果を作る）
+        if predicate(context):
+            return _valid()
+
+        all_error_fields: list[str] = []
+        all_error_locations: list[str] = []
+        for child in children:
+            result = child.evaluate(context, "")
+            if not result.is_valid:
+                if result.error_fields:
+                    all_error_fields.extend(result.error_fields)
+                if result.error_locations:
+                    all_error_locations.extend(result.error_locations)
+
+        return ValidationResult(
+            is_valid=False,
+            error_message=error_message_template,
+            error_fields=sorted(set(all_error_fields)),
+            error_locations=sorted(set(all_error_locations)),
+        )
+
+    return _CompiledNode(predicate, evaluate)
+
+
+def _compile_not(expr: NotExpression, full_diagnostics: bool) -> _CompiledNode:
+    """否定式をコンパイルする"""
+    child = _compile(expr.not_, full_diagnostics).predicate
+
+    def predicate(context: ValidationContext) -> bool:
+        return not child(context)
+
+    def evaluate(context: ValidationContext, error_message_template: str) -> ValidationResult:
+        if predicate(context):
+            return _valid()
+        return ValidationResult(
+            is_valid=False, error_message=error_message_template, error_fields=[], error_locations=[]
+        )
+
+    return _CompiledNode(predicate, evaluate)
+
+
+def _compile(expr: Expression, full_diagnostics: bool) -> _CompiledNode:
+    """式を述語と評価関数の組にコンパイルする"""
+    if isinstance(expr, CompareExpression):
+        return _compile_compare(expr)
+    if isinstance(expr, RequiredExpression):
+        return _compile_field_presence(expr.required, require_value=True)
+    if isinstance(expr, IsEmptyExpression):
+        return _compile_field_presence(expr.is_empty, require_value=False)
+    if isinstance(expr, RegexMatchExpression):
+        return _compile_regex_match(expr)
+    if isinstance(expr, EnumExpression):
+        return _compile_enum(expr)
+    if isinstance(expr, AllOfExpression):
+        return _compile_all_of(expr, full_diagnostics)
+    if isinstance(expr, AnyOfExpression):
+        return _compile_any_of(expr, full_diagnostics)
+    if isinstance(expr, NotExpression):
+        return _compile_not(expr, full_diagnostics)
+    return _CompiledNode(lambda context: expr.validate_in(context, "").is_valid, expr.validate_in)
+
+
+def compile_expression(expr: Expression, full_diagnostics: bool = False) -> CompiledExpression:
+    """
+    式を関数にコンパイルする
+
+    Args:
+        expr: バリデーション式
+        full_diagnostics: all_of の失敗時に、最初に失敗した条件だけでなく失敗したすべての条件の
+                          フィールドを集めるかどうか（True の場合は validate_in と同一の結果を返す）
+
+    Returns:
+        CompiledExpression: コンテキストとエラーメッセージのテンプレートを受け取り、検証結果を返す関数
+                            （未知の式型の場合は式の validate_in をそのまま使う）
+    """
+    return _compile(expr, full_diagnostics).evaluate
+
+
+def referenced_fields(expr: Expression) -> frozenset[str] | None:
+    """
+    式が参照するフィールド名を集める
+
+    Args:
+        expr: バリデーション式
+
+    Returns:
+        frozenset[str] | None: 参照するフィールド名の集合
+                               （未知の式型を含み、参照するフィールドを特定できない場合はNone）
+    """
+    if isinstance(expr, CompareExpression):
+        return frozenset(
+            field for field in (expr.compare.left_field, expr.compare.right_field) if isinstance(field, str)
+        )
+    if isinstance(expr, RequiredExpression):
+        return frozenset([expr.required] if isinstance(expr.required, str) else expr.required)
+    if isinstance(expr, IsEmptyExpression):
+        return frozenset([expr.is_empty] if isinstance(expr.is_empty, str) else expr.is_empty)
+    if isinstance(expr, RegexMatchExpression):
+        return frozenset([expr.regex_match["field"]])
+    if isinstance(expr, EnumExpression):
+        return frozenset([expr.enum["field"]])
+
+    if isinstance(expr, AllOfExpression):
+        children = list(expr.all_of)
+    elif isinstance(expr, AnyOfExpression):
+        children = list(expr.any_of)
+    elif isinstance(expr, NotExpression):
+        children = [expr.not_]
+    else:
+        return None
+    fields: set[str] = set()
+    for child in children:
+        child_fields = referenced_fields(child)
+        if child_fields is None:
+            return None
+        fields |= child_fields
+    return frozenset(fields)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """
+    コンパイル済みのバリデーションルール
+
+    Attributes:
+        name: ルール名
+        error_message: エラーメッセージのテンプレート
+        evaluate: コンパイル済みの式
+        fields: ルールが参照するフィールド名の集合（特定できない場合はNone）
+    """
+
+    name: str
+    error_message: str
+    evaluate: CompiledExpression
+    fields: frozenset[str] | None = None
+
+    def validate(self, context: ValidationContext) -> ValidationResult:
+        """
+        ルールのバリデーションを実行する（Rule.validate と同じ後処理を行う）
+
+        Args:
+            context: バリデーションコンテキスト
+
+        Returns:
+            ValidationResult: バリデーション結果
+        """
+        result = self.evaluate(context, self.error_message)
+        if not result.is_valid:
+            result.rule_name = self.name
+            if result.error_fields and not result.error_locations:
+                locations = [context.get_field_location(f) for f in result.error_fields]
+                result.error_locations = sorted({loc for loc in locations if loc})
+        return result
+
+
+def compile_rule(rule: "Rule", full_diagnostics: bool = False) -> CompiledRule:
+    """
+    ルールをコンパイルする
+
+    Args:
+        rule: バリデーションルール
+        full_diagnostics: 失敗したすべての条件のフィールドを集めるかどうか（compile_expression を参照）
+
+    Returns:
+        CompiledRule: コンパイル済みのルール
+    """
+    return CompiledRule(
+        name=rule.name,
+        error_message=rule.error_message,
+        evaluate=compile_expression(rule.expression, full_diagnostics),
+        fields=referenced_fields(rule.expression),
+    )
@@ -0,0 +1,121 @@
+"""
+YAMLの読み込み・書き出し
+
+PyYAML が libyaml 付きでビルドされている場合は C 実装のローダー・ダンパーを使い、
+そうでない場合は純粋な Python 実装を使います。
+yaml モジュールは関数の呼び出し時にインポートします（JSON形式だけを使う場合の起動を軽くするため）。
+
+libyaml のエミッタは、基本多言語面の外の文字（絵文字など）をエスケープし、
+ダブルクォートで囲んだ文字列の折り返し位置や長いキー・空文字列のキーの書き方も Python 実装と異なります。
+出力を Python 実装と同一に保つため、そうした文字列を含むデータは Python 実装で書き出します。
+"""
+
+import datetime
+import re
+from typing import Any
+
+# libyaml と Python 実装で同じ表現になる文字だけからなる文字列
+# (タブ・CR などの制御文字、NEL・行区切り・段落区切り、BOM、サロゲート、基本多言語面の外の文字を除く)
+_LIBYAML_SAFE_STRING = re.compile("[\n\x20-\x7e\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd]*")
+
+# 表現に任意の文字列を含まないスカラー型
+_PLAIN_SCALAR_TYPES = (bool, int, float, datetime.date, type(None))
+
+
+def has_libyaml() -> bool:
+    """
+    PyYAML が libyaml 付きでビルドされているかどうかを返す
+
+    Returns:
+        bool: C 実装のローダー・ダンパーを使用できる場合はTrue
+    """
+    import yaml
+
+    return bool(getattr(yaml, "__with_libyaml__", False))
+
+
+def safe_load(text: str, use_libyaml: bool | None = None) -> Any:
+    """
+    YAML文字列を安全に読み込む（yaml.safe_load と同じ結果を返す）
+
+    libyaml で読み込めない文書は Python 実装で読み直すため、Python 実装で読める文書はそのまま読み込めます。
+
+    Args:
+        text: YAML文字列
+        use_libyaml: C 実装を使うかどうか（Noneの場合は使用可能なら使う）
+
+    Returns:
+        Any: 読み込んだデータ
+
+    Raises:
+        yaml.YAMLError: YAMLとして解析できない場合
+    """
+    import yaml
+
+    if use_libyaml is None:
+        use_libyaml = has_libyaml()
+    if use_libyaml:
+        try:
+            return yaml.load(text, Loader=yaml.CSafeLoader)
+        except yaml.YAMLError:
+            pass
+    return yaml.load(text, Loader=yaml.SafeLoader)
+
+
+def dump(data: Any, use_libyaml: bool | None = None, **kwargs: Any) -> str:
+    """
+    データをYAML文字列に変換する（yaml.dump と同一の文字列を返す）
+
+    Args:
+        data: 出力するデータ
+        use_libyaml: C 実装を使うかどうか（Noneの場合は使用可能で、かつ出力が同一になるデータなら使う）
+        **kwargs: yaml.dump に渡すオプション
+
+    Returns:
+        str: YAML文字列
+    """
+    import yaml
+
+    if use_libyaml is None:
+        use_libyaml = has_libyaml() and _is_libyaml_safe(data)
+    dumper = yaml.CDumper if use_libyaml else yaml.Dumper
+    return str(yaml.dump(data, Dumper=dumper, **kwargs))
+
+
+def _is_libyaml_safe(data: Any) -> bool:
+    """データを libyaml で書き出しても Python 実装と同じ出力になるかどうかを判定する"""
+    if not isinstance(data, dict | list):
+        # 最上位のスカラーは文書終端マーカー ("...") の有無が異なる
+        return False
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            if not _is_libyaml_safe_string(value):
+                return False
+        elif isinstance(value, dict):
+            if not all(_is_libyaml_safe_key(key) for key in value):
+                return False
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, list | tuple):
+            stack.extend(value)
+        elif not isinstance(value, _PLAIN_SCALAR_TYPES):
+            return False
+    return True
+
+
+def _is_libyaml_safe_key(key: Any) -> bool:
+    """マッピングのキーがどちらの実装でも同じ表現になるかどうかを判定する"""
+    if not isinstance(key, str):
+        return True
+    # 単純キーの長さの上限を Python 実装は文字数、libyaml はバイト数で判定する
+    return bool(key) and "\n" not in key and len(key.encode("utf-8")) < 128
+
+
+def _is_libyaml_safe_string(value: str) -> bool:
+    """文字列がどちらの実装でも同じ表現になるかどうかを判定する"""
+    if not _LIBYAML_SAFE_STRING.fullmatch(value):
+        return False
+    # 改行の前後に空白がある複数行の文字列はダブルクォートで囲まれ、折り返し位置が異なる
+    return "\n" not in value or (" \n" not in value and "\n " not in value)
@@ -0,0 +1,512 @@
+"""
+MCPサーバーのリクエストハンドラー（mcp_server/handlers.py）のテスト
+"""
+
+import asyncio
+import csv
+import gc
+import io
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+
+import openpyxl
+import pytest
+import yaml
+
+from xlsx_value_picker import excel_processor
+from xlsx_value_picker.config_loader import ConfigLoader, MCPAvailableConfigModel
+from xlsx_value_picker.excel_processor import WorkbookCache, WorkbookSession, get_workbook_cache
+from xlsx_value_picker.mcp_server import handlers
+from xlsx_value_picker.mcp_server.coalescing import SingleFlight, SingleFlightStats, file_fingerprint
+from xlsx_value_picker.mcp_server.handlers import (
+    get_diagnostics_cache,
+    get_single_flight,
+    handle_get_diagnostics,
+    handle_get_file_content,
+    handle_get_model_info,
+    run_in_worker,
+    serve_get_diagnostics,
+    serve_get_file_content,
+)
+from xlsx_value_picker.mcp_server.pipeline import ModelPipeline, build_model_index
+from xlsx_value_picker.mcp_server.protocol import GetDiagnosticsRequest, GetFileContentRequest, GetModelInfoRequest
+
+PRICE_RULE = {
+    "name": "価格チェック",
+    "expression": {"compare": {"left_field": "price", "operator": ">=", "right": 100}},
+    "error_message": "{field}は100以上である必要があります",
+}
+
+
+def create_workbook(path, name, price):
+    """テスト用のExcelファイルを作成する"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws["A1"] = name
+    ws["B1"] = price
+    wb.save(path)
+    return path
+
+
+def index(*models):
+    """モデルからハンドラーに渡す索引を作成する"""
+    return build_model_index(models)
+
+
+@pytest.fixture
+def excel_file(tmp_path):
+    return create_workbook(tmp_path / "data.xlsx", "りんご", 120)
+
+
+@pytest.fixture
+def model(excel_file):
+    return MCPAvailableConfigModel(
+        fields={"name": "Sheet1!A1", "price": "Sheet1!B1"},
+        rules=[PRICE_RULE],
+        model_name="m",
+        excel_path=str(excel_file),
+    )
+
+
+class TestGetFileContent:
+    """getFileContent のテスト"""
+
+    def test_json(self, model):
+        """モデルに設定されたExcelファイルから値を取得してJSONで返す"""
+        response = handle_get_file_content(index(model), GetFileContentRequest(model_id="m", output_format="json"))
+
+        assert response.format == "json"
+        assert json.loads(response.content) == {"name": "りんご", "price": 120}
+        # リクエストごとの出力形式でモデルの設定を書き換えたままにしない
+        assert model.output.format == "json"
+
+    def test_yaml(self, model):
+        """出力形式を指定した場合はその形式で返す"""
+        response = handle_get_file_content(index(model), GetFileContentRequest(model_id="m", output_format="yaml"))
+
+        assert response.format == "yaml"
+        assert yaml.safe_load(response.content) == {"name": "りんご", "price": 120}
+        assert model.output.format == "json"
+
+    def test_request_path_overrides_model_path(self, model, tmp_path):
+        """リクエストでパスを指定した場合はモデルに設定されたパスより優先する"""
+        other = create_workbook(tmp_path / "other.xlsx", "みかん", 80)
+
+        request = GetFileContentRequest(model_id="m", excel_path=str(other))
+        response = handle_get_file_content(index(model), request)
+
+        assert json.loads(response.content) == {"name": "みかん", "price": 80}
+
+    def test_missing_path(self):
+        """リクエストとモデルのどちらにもパスがない場合はエラー"""
+        model = MCPAvailableConfigModel(fields={"name": "Sheet1!A1"}, rules=[], model_name="m")
+
+        with pytest.raises(ValueError, match="Excelファイルのパスが指定されていません"):
+            handle_get_file_content(index(model), GetFileContentRequest(model_id="m"))
+
+    def test_unknown_model(self, model):
+        """存在しないモデルIDの場合はエラー"""
+        with pytest.raises(ValueError, match="見つかりません"):
+            handle_get_file_content(index(model), GetFileContentRequest(model_id="unknown"))
+
+    def test_repeated_requests_use_workbook_cache(self, model, excel_file):
+        """同じファイルへの繰り返しの問い合わせでは共有のワークブックキャッシュを使う"""
+        cache = get_workbook_cache()
+        cache.invalidate(excel_file)
+        handle_get_file_content(index(model), GetFileContentRequest(model_id="m"))
+        before = cache.stats
+
+        handle_get_file_content(index(model), GetFileContentRequest(model_id="m"))
+
+        after = cache.stats
+        assert after.hits == before.hits + 1
+        assert after.misses == before.misses
+
+    def test_concurrent_requests_with_mixed_formats(self, model, monkeypatch):
+        """異なる出力形式の並行するリクエストは、それぞれ指定した形式で結果を受け取る"""
+        monkeypatch.setattr(handlers, "MAX_WORKERS", 8)
+        monkeypatch.setattr(handlers, "_executor", None)
+        pipelines = index(model)
+        # 値の抽出中に他のリクエストへ切り替わるようにして、競合が起きやすくする
+        extract = pipelines["m"].extract
+        monkeypatch.setattr(pipelines["m"], "extract", lambda session: time.sleep(0.001) or extract(session))
+        parsers = {
+            "json": json.loads,
+            "yaml": yaml.safe_load,
+            "csv": lambda content: {
+                key: int(value) if value.isdigit() else value
+                for key, value in next(csv.DictReader(io.StringIO(content))).items()
+            },
+        }
+        formats = [list(parsers)[i % len(parsers)] for i in range(300)]
+
+        async def main():
+            requests = [GetFileContentRequest(model_id="m", output_format=fmt) for fmt in formats]
+            return await asyncio.gather(*(run_in_worker(handle_get_file_content, pipelines, r) for r in requests))
+
+        try:
+            responses = asyncio.run(main())
+        finally:
+            handlers._get_executor().shutdown()
+
+        for fmt, response in zip(formats, responses, strict=True):
+            assert response.format == fmt
+            assert parsers[fmt](response.content) == {"name": "りんご", "price": 120}
+        # 共有するモデルの設定は書き換えない
+        assert model.output.format == "json"
+
+
+class TestGetDiagnostics:
+    """getDiagnostics のテスト"""
+
+    def test_valid(self, model):
+        """ルールを満たす場合は成功"""
+        response = handle_get_diagnostics(index(model), GetDiagnosticsRequest(model_id="m"))
+
+        assert response.is_valid
+        assert response.errors == []
+
+    def test_invalid(self, model, tmp_path):
+        """ルールを満たさない場合はエラーのフィールドとメッセージを返す"""
+        other = create_workbook(tmp_path / "other.xlsx", "みかん", 80)
+
+        response = handle_get_diagnostics(index(model), GetDiagnosticsRequest(model_id="m", excel_path=str(other)))
+
+        assert not response.is_valid
+        assert [(error.field, error.message) for error in response.errors] == [
+            ("price", "priceは100以上である必要があります")
+        ]
+
+    def test_missing_file(self, model, tmp_path):
+        """Excelファイルを読み込めない場合はシステムエラーとして返す"""
+        request = GetDiagnosticsRequest(model_id="m", excel_path=str(tmp_path / "missing.xlsx"))
+
+        response = handle_get_diagnostics(index(model), request)
+
+        assert not response.is_valid
+        assert response.errors[0].field == "system"
+
+    def test_result_is_cached_until_file_changes(self, model, excel_file):
+        """同じモデルとファイルの結果はファイルが変更されるまでキャッシュする"""
+        cache = get_diagnostics_cache()
+        first = handle_get_diagnostics(index(model), GetDiagnosticsRequest(model_id="m"))
+        before = cache.stats
+
+        assert handle_get_diagnostics(index(model), GetDiagnosticsRequest(model_id="m")) is first
+        assert cache.stats.hits == before.hits + 1
+
+        # ファイルを書き換えると計算し直す
+        stat = os.stat(excel_file)
+        create_workbook(excel_file, "りんご", 50)
+        os.utime(excel_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        response = handle_get_diagnostics(index(model), GetDiagnosticsRequest(model_id="m"))
+
+        assert not response.is_valid
+        assert cache.stats.misses == before.misses + 1
+
+    def test_reloaded_model_is_revalidated(self, model, excel_file):
+        """読み込み直したモデル（同じ名前の別のオブジェクト）には以前の結果を返さず、エントリを置き換える"""
+        cache = get_diagnostics_cache()
+        handle_get_diagnostics(index(model), GetDiagnosticsRequest(model_id="m"))
+        entries = cache.stats.entries
+        reloaded = model.model_copy(update={"rules": []})
+        before = cache.stats
+
+        handle_get_diagnostics(index(reloaded), GetDiagnosticsRequest(model_id="m"))
+
+        assert cache.stats.misses == before.misses + 1
+        assert cache.stats.entries == entries
+
+    def test_evicted_workbook_is_released(self, model, tmp_path, monkeypatch):
+        """キャッシュした結果はワークブックを保持せず、ワークブックキャッシュが破棄したワークブックは解放される"""
+        workbook_cache = WorkbookCache(max_entries=1)
+        monkeypatch.setattr(excel_processor, "_default_workbook_cache", workbook_cache)
+        sessions = []
+        for name in "abc":
+            excel_file = str(create_workbook(tmp_path / f"{name}.xlsx", name, 120))
+            response = handle_get_diagnostics(index(model), GetDiagnosticsRequest(model_id="m", excel_path=excel_file))
+            assert response.is_valid
+            sessions.append(weakref.ref(workbook_cache.get_session(excel_file)))
+
+        gc.collect()
+
+        assert len(workbook_cache) == 1
+        assert [session() is not None for session in sessions] == [False, False, True]
+
+    def test_shares_workbook_with_get_file_content(self, model, excel_file):
+        """getFileContent に続けて呼び出した場合は読み込み済みのワークブックを使う"""
+        cache = get_workbook_cache()
+        cache.invalidate(excel_file)
+        handle_get_file_content(index(model), GetFileContentRequest(model_id="m"))
+        before = cache.stats
+
+        handle_get_diagnostics(index(model), GetDiagnosticsRequest(model_id="m"))
+
+        assert cache.stats.hits == before.hits + 1
+        assert cache.stats.misses == before.misses
+
+
+class TestModelPipeline:
+    """モデルごとのパイプラインと索引のテスト"""
+
+    def test_index(self, model, caplog):
+        """名前のないモデルは索引に含めず、同じ名前のモデルは最初のものを使って警告する"""
+        unnamed = MCPAvailableConfigModel(fields={"name": "Sheet1!A1"}, rules=[])
+        duplicate = MCPAvailableConfigModel(fields={"name": "Sheet1!A1"}, rules=[], model_name="m")
+
+        with caplog.at_level(logging.WARNING, logger="xlsx_value_picker.mcp_server.pipeline"):
+            pipelines = index(unnamed, model, duplicate)
+
+        assert list(pipelines) == ["m"]
+        assert pipelines["m"].model is model
+        assert "モデル名 'm' が重複している" in caplog.text
+
+    def test_index_reuses_pipelines_of_unchanged_models(self, model):
+        """以前の索引と同じモデルオブジェクトのパイプラインは作り直さない"""
+        previous = index(model)
+        changed = model.model_copy()
+
+        assert build_model_index([model], previous=previous)["m"] is previous["m"]
+        assert build_model_index([changed], previous=previous)["m"].model is changed
+
+    def test_rules_are_compiled_once(self, model, tmp_path, monkeypatch):
+        """ツール呼び出しではルールをコンパイルし直さない"""
+        pipelines = index(model)
+        compiled = []
+        monkeypatch.setattr("xlsx_value_picker.validation.compile_rule", lambda *args: compiled.append(args))
+        other = create_workbook(tmp_path / "other.xlsx", "みかん", 80)
+
+        assert handle_get_diagnostics(pipelines, GetDiagnosticsRequest(model_id="m")).is_valid
+        request = GetDiagnosticsRequest(model_id="m", excel_path=str(other))
+        assert not handle_get_diagnostics(pipelines, request).is_valid
+        assert compiled == []
+
+    def test_concurrent_validation(self, model, tmp_path):
+        """1つのパイプラインを複数のスレッドから同時に使用できる"""
+        pipeline = ModelPipeline(model)
+        sessions = [
+            get_workbook_cache().get_session(create_workbook(tmp_path / f"{i}.xlsx", "品名", 60 + i * 10))
+            for i in range(8)
+        ]
+        results = {}
+
+        def validate(i):
+            for _ in range(20):
+                results[i] = [result.rule_name for result in pipeline.validate(sessions[i])]
+
+        threads = [threading.Thread(target=validate, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {i: ["価格チェック"] if 60 + i * 10 < 100 else [] for i in range(8)}
+
+
+class TestRunInWorker:
+    """run_in_worker のテスト"""
+
+    def test_runs_off_event_loop_thread(self, model):
+        """ハンドラーをイベントループとは別のスレッドで実行する"""
+
+        async def main():
+            loop_thread = threading.get_ident()
+            thread_ids = await asyncio.gather(*(run_in_worker(threading.get_ident) for _ in range(3)))
+            return loop_thread, thread_ids
+
+        loop_thread, thread_ids = asyncio.run(main())
+
+        assert loop_thread not in thread_ids
+
+    def test_concurrent_calls_do_not_block_each_other(self, monkeypatch):
+        """ブロッキングする処理が実行中でも、他の呼び出しは並行して完了する"""
+        monkeypatch.setattr(handlers, "MAX_WORKERS", 2)
+        monkeypatch.setattr(handlers, "_executor", None)
+        release = threading.Event()
+
+        async def main():
+            blocked = asyncio.ensure_future(run_in_worker(release.wait, 5))
+            result = await asyncio.wait_for(run_in_worker(sum, [1, 2, 3]), timeout=5)
+            assert not blocked.done()
+            release.set()
+            assert await blocked
+            return result
+
+        try:
+            assert asyncio.run(main()) == 6
+        finally:
+            handlers._get_executor().shutdown()
+
+
+class TestSingleFlight:
+    """同時に届いた同じリクエストをまとめる仕組みのテスト"""
+
+    def test_identical_calls_share_one_execution(self):
+        """同じキーの並行する呼び出しは1回だけ処理し、結果を共有する"""
+        single_flight = SingleFlight()
+        executed = []
+
+        async def compute(value):
+            executed.append(value)
+            await asyncio.sleep(0.01)
+            return [value]
+
+        async def main():
+            calls = [single_flight.run(("a",), lambda: compute("a")) for _ in range(5)]
+            calls.append(single_flight.run(("b",), lambda: compute("b")))
+            return await asyncio.gather(*calls)
+
+        results = asyncio.run(main())
+
+        assert executed == ["a", "b"]
+        assert results[:5] == [["a"]] * 5 and all(result is results[0] for result in results[:5])
+        assert single_flight.stats == SingleFlightStats(calls=6, executed=2, coalesced=4, in_flight=0)
+
+    def test_exception_is_shared_and_key_is_released(self):
+        """処理の例外は待っていたすべての呼び出し元に送出し、完了後は同じキーで再び処理する"""
+        single_flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("失敗")
+
+        async def main():
+            calls = [single_flight.run("key", fail) for _ in range(3)]
+            results = await asyncio.gather(*calls, return_exceptions=True)
+            again = await single_flight.run("key", lambda: asyncio.sleep(0, result="成功"))
+            return results, again
+
+        results, again = asyncio.run(main())
+
+        assert [str(result) for result in results] == ["失敗"] * 3
+        assert again == "成功"
+        assert single_flight.stats.executed == 2
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """呼び出し元の1つがキャンセルされても、他の呼び出し元は結果を受け取る"""
+        single_flight = SingleFlight()
+
+        async def main():
+            first = asyncio.ensure_future(single_flight.run("key", lambda: asyncio.sleep(0.05, result=1)))
+            second = asyncio.ensure_future(single_flight.run("key", lambda: asyncio.sleep(0.05, result=2)))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(main()) == 1
+
+    def test_file_fingerprint(self, excel_file, tmp_path):
+        """ファイルの更新時刻とサイズが変わると別の値になる"""
+        before = file_fingerprint(str(excel_file))
+        stat = os.stat(excel_file)
+        os.utime(excel_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert file_fingerprint(str(excel_file)) != before
+        assert file_fingerprint(str(tmp_path / "missing.xlsx"))[1:] == (-1, -1)
+
+    def test_tool_calls_are_coalesced(self, model, monkeypatch):
+        """同じモデル・ファイル・出力形式の並行するツール呼び出しは1回だけ処理する"""
+        pipelines = index(model)
+        extracted = []
+        extract = pipelines["m"].extract
+
+        def slow_extract(session):
+            extracted.append(session)
+            time.sleep(0.05)
+            return extract(session)
+
+        monkeypatch.setattr(pipelines["m"], "extract", slow_extract)
+        before = get_single_flight().stats
+
+        async def main():
+            json_requests = [GetFileContentRequest(model_id="m") for _ in range(5)]
+            calls = [serve_get_file_content(pipelines, request) for request in json_requests]
+            calls.append(serve_get_file_content(pipelines, GetFileContentRequest(model_id="m", output_format="yaml")))
+            calls += [serve_get_diagnostics(pipelines, GetDiagnosticsRequest(model_id="m")) for _ in range(3)]
+            return await asyncio.gather(*calls)
+
+        responses = asyncio.run(main())
+
+        # 出力形式が異なるリクエストは別に処理する
+        assert len(extracted) == 2
+        assert [response.format for response in responses[:6]] == ["json"] * 5 + ["yaml"]
+        assert all(response.is_valid for response in responses[6:])
+        after = get_single_flight().stats
+        assert after.calls - before.calls == 9
+        assert after.coalesced - before.coalesced == 6
+        assert after.in_flight == 0
+
+    def test_different_tools_share_one_parse(self, model, excel_file, monkeypatch):
+        """getDiagnosticsとgetFileContentを同時に呼び出しても、同じファイルのパースは1回だけ行う"""
+        monkeypatch.setattr(handlers, "MAX_WORKERS", 2)
+        monkeypatch.setattr(handlers, "_executor", None)
+        get_workbook_cache().invalidate(excel_file)
+        pipelines = index(model)
+        loads = []
+        original_open = WorkbookSession.open
+
+        def slow_open(session):
+            if not session.is_open:
+                loads.append(session)
+                time.sleep(0.05)
+            return original_open(session)
+
+        monkeypatch.setattr(WorkbookSession, "open", slow_open)
+
+        async def main():
+            return await asyncio.gather(
+                serve_get_diagnostics(pipelines, GetDiagnosticsRequest(model_id="m")),
+                serve_get_file_content(pipelines, GetFileContentRequest(model_id="m")),
+            )
+
+        try:
+            diagnostics, content = asyncio.run(main())
+        finally:
+            handlers._get_executor().shutdown()
+
+        assert len(loads) == 1
+        assert diagnostics.is_valid
+        assert json.loads(content.content)["name"] == "りんご"
+
+
+class TestExcelPathConfig:
+    """MCP設定ファイルでのExcelファイルのパスの指定のテスト"""
+
+    def test_relative_paths(self, tmp_path, excel_file):
+        """相対パスはそれを記述した設定ファイルのフォルダからのパスとして解釈する"""
+        model_dir = tmp_path / "models"
+        model_dir.mkdir()
+        (model_dir / "model.yaml").write_text(
+            yaml.safe_dump({"fields": {"name": "Sheet1!A1"}, "rules": [], "excel_path": "../data.xlsx"}),
+            encoding="utf-8",
+        )
+        mcp_config_path = tmp_path / "mcp.yaml"
+        mcp_config_path.write_text(
+            yaml.safe_dump(
+                {
+                    "models": [
+                        {"model_name": "from_model", "config": "models/model.yaml"},
+                        {"model_name": "from_reference", "config": "models/model.yaml", "excel_path": "data.xlsx"},
+                    ],
+                    "config": {"tool_descriptions": {}},
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        mcp_config = ConfigLoader().load_mcp_config(str(mcp_config_path))
+        mcp_config.cache_models()
+        models = mcp_config.model_index
+
+        assert list(models) == ["from_model", "from_reference"]
+        for model_id in models:
+            info = handle_get_model_info(models, GetModelInfoRequest(model_id=model_id))
+            assert info.excel_path is not None
+            assert excel_file.samefile(info.excel_path)
+            response = handle_get_file_content(models, GetFileContentRequest(model_id=model_id))
+            assert json.loads(response.content) == {"name": "りんご"}
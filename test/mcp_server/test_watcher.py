@@ -0,0 +1,142 @@
+"""
+モデル設定の再読み込み（mcp_server/watcher.py）のテスト
+"""
+
+import logging
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from xlsx_value_picker.cli import cli
+from xlsx_value_picker.config_loader import ConfigLoader, get_model_file_cache
+from xlsx_value_picker.mcp_server.watcher import ModelConfigWatcher
+
+
+def write_model_config(path, **extra):
+    """モデル設定ファイルを作成し、更新時刻を進める（同じ時刻のうちに書き換えても変更を検出できるようにする）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    existed = path.exists()
+    mtime_ns = os.stat(path).st_mtime_ns if existed else 0
+    path.write_text(yaml.safe_dump({"fields": {"key1": "Sheet1!A1"}, "rules": [], **extra}), encoding="utf-8")
+    if existed:
+        os.utime(path, ns=(mtime_ns + 1_000_000_000, mtime_ns + 1_000_000_000))
+    return path
+
+
+@pytest.fixture
+def mcp_config(tmp_path):
+    """glob パターンでモデル設定ファイルを参照するMCP設定"""
+    write_model_config(tmp_path / "models" / "a.yaml")
+    write_model_config(tmp_path / "models" / "b.yaml")
+    mcp_config_path = tmp_path / "mcp.yaml"
+    mcp_config_path.write_text(
+        yaml.safe_dump({"models": [{"config_path_pattern": "models/*.yaml"}], "config": {"tool_descriptions": {}}}),
+        encoding="utf-8",
+    )
+    mcp_config = ConfigLoader().load_mcp_config(str(mcp_config_path))
+    mcp_config.cache_models()
+    return mcp_config
+
+
+class TestModelConfigWatcher:
+    """ModelConfigWatcher のテスト"""
+
+    def test_no_change(self, mcp_config):
+        """変更がなければ読み込み直さない"""
+        index = mcp_config.model_index
+
+        assert not ModelConfigWatcher(mcp_config).check()
+        assert mcp_config.model_index is index
+
+    def test_reload_changed_file(self, mcp_config, tmp_path, caplog):
+        """変更されたファイルだけを読み込み直し、索引を置き換える"""
+        watcher = ModelConfigWatcher(mcp_config)
+        before = mcp_config.model_index
+        write_model_config(tmp_path / "models" / "a.yaml", model_description="変更後")
+
+        with caplog.at_level(logging.INFO, logger="xlsx_value_picker.mcp_server.watcher"):
+            assert watcher.check()
+
+        after = mcp_config.model_index
+        assert after is not before
+        assert after["a"].model.model_description == "変更後"
+        assert after["b"] is before["b"]
+        assert "再検証したファイル: 1件" in caplog.text
+        assert "モデル数: 2" in caplog.text
+        assert not watcher.check()
+
+    def test_models_and_index_are_replaced_together(self, mcp_config, tmp_path):
+        """モデル一覧と索引は読み込み直しの途中の状態を参照できないよう、まとめて置き換える"""
+        before = mcp_config.model_index
+        write_model_config(tmp_path / "models" / "c.yaml")
+
+        mcp_config.cache_models()
+
+        assert list(before) == ["a", "b"]
+        assert list(mcp_config.model_index) == [model.model_name for model in mcp_config.loaded_models]
+        with pytest.raises(TypeError):
+            mcp_config.model_index["d"] = mcp_config.model_index["a"]  # type: ignore[index]
+
+    def test_added_and_removed_files(self, mcp_config, tmp_path):
+        """パターンに一致するファイルの追加・削除を反映する"""
+        watcher = ModelConfigWatcher(mcp_config)
+
+        write_model_config(tmp_path / "models" / "c.yaml")
+        assert watcher.check()
+        assert list(mcp_config.model_index) == ["a", "b", "c"]
+
+        (tmp_path / "models" / "a.yaml").unlink()
+        assert watcher.check()
+        assert list(mcp_config.model_index) == ["b", "c"]
+        assert [model.model_name for model in mcp_config.loaded_models] == ["b", "c"]
+        # 削除されたファイルのエントリはモデル設定ファイルのキャッシュにも残さない
+        assert len(get_model_file_cache()) == 2
+
+    def test_invalid_file_keeps_previous_models(self, mcp_config, tmp_path, caplog):
+        """読み込みに失敗した場合は以前のモデルを使い続け、ファイルが直った時点で読み込む"""
+        watcher = ModelConfigWatcher(mcp_config)
+        before = mcp_config.model_index
+        path = tmp_path / "models" / "a.yaml"
+        path.write_text("fields: [", encoding="utf-8")
+
+        with caplog.at_level(logging.ERROR, logger="xlsx_value_picker.mcp_server.watcher"):
+            assert watcher.check()
+
+        assert mcp_config.model_index is before
+        assert "以前の設定を使い続けます" in caplog.text
+
+        write_model_config(path, model_description="修正後")
+        assert watcher.check()
+        assert mcp_config.model_index["a"].model.model_description == "修正後"
+
+    def test_invalid_file_writes_nothing_to_stdout(self, mcp_config, tmp_path, capsys):
+        """読み込みに失敗しても標準出力（MCPサーバーの通信）には何も出力しない"""
+        watcher = ModelConfigWatcher(mcp_config)
+        (tmp_path / "models" / "a.yaml").write_text("fields: [", encoding="utf-8")
+        (tmp_path / "models" / "b.yaml").write_bytes(b"\xff\xfe")
+
+        assert watcher.check()
+
+        assert capsys.readouterr().out == ""
+
+    def test_background_thread(self, mcp_config, tmp_path):
+        """バックグラウンドのスレッドで変更を検出して反映する"""
+        with ModelConfigWatcher(mcp_config, interval=0.01):
+            write_model_config(tmp_path / "models" / "b.yaml", model_description="変更後")
+            deadline = time.monotonic() + 5
+            while mcp_config.model_index["b"].model.model_description != "変更後":
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+
+def test_cli_reload_interval():
+    """server コマンドの --reload-interval をサーバーに渡す"""
+    with patch("xlsx_value_picker.mcp_server.server.main") as server_main:
+        result = CliRunner().invoke(cli, ["server", "-c", "mcp.yaml", "--reload-interval", "0.5"])
+
+    assert result.exit_code == 0, result.output
+    assert server_main.call_args.kwargs["reload_interval"] == 0.5
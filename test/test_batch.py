@@ -0,0 +1,180 @@
+"""
+バッチ処理（batch.py / batchサブコマンド）のテスト
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import openpyxl
+import pytest
+import yaml
+
+from xlsx_value_picker.batch import BatchOptions, collect_batch_files, run_batch
+from xlsx_value_picker.config_loader import ConfigModel
+
+
+def create_test_excel(path, age):
+    """テスト用のExcelファイルを作成する"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws["A1"] = path.stem
+    ws["B1"] = age
+    wb.save(path)
+
+
+CONFIG_DATA = {
+    "fields": {"name": "Sheet1!A1", "age": "Sheet1!B1"},
+    "rules": [
+        {
+            "name": "年齢チェック",
+            "expression": {"compare": {"left_field": "age", "operator": ">=", "right": 18}},
+            "error_message": "{field}は18歳以上である必要があります",
+        }
+    ],
+    "output": {"format": "json"},
+}
+
+
+@pytest.fixture
+def batch_files(tmp_path):
+    """有効なファイル3件と検証エラーになるファイル1件を作成する"""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for name, age in [("a", 20), ("b", 30), ("c", 40), ("minor", 10)]:
+        create_test_excel(data_dir / f"{name}.xlsx", age)
+    (data_dir / "note.txt").write_text("対象外", encoding="utf-8")
+    return data_dir
+
+
+@pytest.fixture
+def config_model():
+    return ConfigModel(**CONFIG_DATA)
+
+
+class TestCollectBatchFiles:
+    """処理対象ファイルの収集のテスト"""
+
+    def test_directory(self, batch_files):
+        """ディレクトリ指定ではパターンに一致するファイルだけを収集する"""
+        files = collect_batch_files([str(batch_files)])
+        assert [Path(f).name for f in files] == ["a.xlsx", "b.xlsx", "c.xlsx", "minor.xlsx"]
+
+    def test_glob_and_file_without_duplicates(self, batch_files):
+        """globパターンとファイルパスの指定を組み合わせても重複しない"""
+        files = collect_batch_files([str(batch_files / "a.xlsx"), str(batch_files / "*.xlsx")])
+        assert [Path(f).name for f in files] == ["a.xlsx", "b.xlsx", "c.xlsx", "minor.xlsx"]
+
+    def test_no_match(self, tmp_path):
+        """一致するファイルがない場合は空のリストを返す"""
+        assert collect_batch_files([str(tmp_path / "*.xlsx")]) == []
+
+
+class TestRunBatch:
+    """run_batch のテスト"""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_results(self, batch_files, config_model, workers):
+        """各ファイルの結果を返し、検証エラーのファイルは値を含まない"""
+        files = collect_batch_files([str(batch_files)])
+        results = {Path(r.file).stem: r for r in run_batch(files, config_model, workers=workers)}
+
+        assert set(results) == {"a", "b", "c", "minor"}
+        assert results["a"].status == "ok"
+        assert results["a"].data == {"name": "a", "age": 20}
+        assert results["minor"].status == "invalid"
+        assert results["minor"].data is None
+        assert results["minor"].validation_results[0].error_locations == ["Sheet1!B1"]
+
+    def test_ignore_errors(self, batch_files, config_model):
+        """ignore_errors の場合は検証エラーがあっても値を取得する"""
+        options = BatchOptions(ignore_errors=True)
+        results = {Path(r.file).stem: r for r in run_batch([str(batch_files / "minor.xlsx")], config_model, options, 1)}
+
+        record = results["minor"].to_record()
+        assert record["status"] == "ok"
+        assert record["data"] == {"name": "minor", "age": 10}
+        assert record["validation_results"][0]["rule_name"] == "年齢チェック"
+
+    def test_broken_file_is_reported_per_file(self, batch_files, config_model, tmp_path):
+        """読み込めないファイルはそのファイルだけエラーとして扱う"""
+        broken = tmp_path / "broken.xlsx"
+        broken.write_bytes(b"not a zip")
+        results = list(run_batch([str(broken), str(batch_files / "a.xlsx")], config_model, workers=2))
+
+        statuses = {Path(r.file).stem: r.status for r in results}
+        assert statuses == {"broken": "error", "a": "ok"}
+
+
+class TestBatchCommand:
+    """batchサブコマンドのテスト"""
+
+    def run_cli_command(self, args, input_text=None):
+        env = os.environ.copy()
+        env["PYTHONPATH"] = str(Path(__file__).parent.parent)
+        return subprocess.run(
+            [sys.executable, "-m", "xlsx_value_picker.cli", "batch"] + args,
+            input=input_text,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            env=env,
+        )
+
+    @pytest.fixture
+    def config_path(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.dump(CONFIG_DATA, f, allow_unicode=True)
+        return path
+
+    def test_json_lines_output(self, batch_files, config_path):
+        """1ファイル1行のJSON Linesを出力し、検証エラーがあれば終了コード1になる"""
+        result = self.run_cli_command([str(batch_files), "-c", str(config_path), "-j", "2"])
+
+        assert result.returncode == 1
+        records = {Path(r["file"]).stem: r for r in map(json.loads, result.stdout.splitlines())}
+        assert set(records) == {"a", "b", "c", "minor"}
+        assert records["b"]["data"] == {"name": "b", "age": 30}
+        assert records["minor"]["status"] == "invalid"
+        assert "4 件のファイルを処理しました" in result.stderr
+
+    def test_files_from_stdin(self, batch_files, config_path, tmp_path):
+        """--files-from - で標準入力からファイル一覧を受け取り、出力ファイルに書き込む"""
+        output_path = tmp_path / "out.jsonl"
+        file_list = f"{batch_files / 'a.xlsx'}\n{batch_files / 'c.xlsx'}\n"
+        result = self.run_cli_command(
+            ["--files-from", "-", "-c", str(config_path), "-j", "1", "-o", str(output_path)], input_text=file_list
+        )
+
+        assert result.returncode == 0
+        lines = output_path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["data"]["name"] for line in lines] == ["a", "c"]
+
+    def test_csv_output(self, batch_files, tmp_path):
+        """設定ファイルの出力形式が csv の場合はファイル・状態・各フィールドの列を持つCSVを出力する"""
+        config_path = tmp_path / "config_csv.yaml"
+        config_data = {**CONFIG_DATA, "output": {"format": "csv", "csv": {"encoding": "utf-8-sig"}}}
+        config_path.write_text(yaml.dump(config_data, allow_unicode=True, sort_keys=False), encoding="utf-8")
+        output_path = tmp_path / "out.csv"
+
+        result = self.run_cli_command([str(batch_files), "-c", str(config_path), "-j", "1", "-o", str(output_path)])
+
+        assert result.returncode == 1
+        with open(output_path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert list(rows[0]) == ["file", "status", "name", "age"]
+        records = {Path(row["file"]).stem: row for row in rows}
+        assert records["a"] == {"file": records["a"]["file"], "status": "ok", "name": "a", "age": "20"}
+        assert records["minor"]["status"] == "invalid"
+        assert records["minor"]["age"] == ""
+
+    def test_no_files(self, tmp_path, config_path):
+        """処理対象のファイルがない場合はエラー終了する"""
+        result = self.run_cli_command([str(tmp_path / "*.xlsx"), "-c", str(config_path)])
+        assert result.returncode == 1
+        assert "処理対象のファイルが見つかりません" in result.stderr
@@ -340,3 +340,17 @@ class TestCLIOptions:
             json.loads(result2.stdout)
         except json.JSONDecodeError:
             pytest.fail("エラー無視時に最低限の出力がされませんでした")
+
+    def test_read_mode_streaming(self, setup_files):
+        """streaming読み込みモードでも通常モードと同じ出力になることをテスト"""
+        excel_path = setup_files["excel_path"]
+        validation_config_path = setup_files["validation_config_path"]
+
+        result_full = self.run_cli_command([str(excel_path), "--config", str(validation_config_path)])
+        result_streaming = self.run_cli_command(
+            [str(excel_path), "--config", str(validation_config_path), "--read-mode", "streaming"]
+        )
+
+        assert result_full.returncode == 0
+        assert result_streaming.returncode == 0
+        assert json.loads(result_streaming.stdout) == json.loads(result_full.stdout)
@@ -412,3 +412,39 @@ class TestCLIValidation:
             json.loads(result2.stdout)
         except json.JSONDecodeError:
             pytest.fail("標準出力がJSON形式ではありません")
+
+    def test_full_diagnostics(self, setup_files, tmp_path):
+        """--full-diagnostics で all_of の失敗したすべての条件のフィールドがログに含まれることのテスト"""
+        excel_path = setup_files["excel_path"]
+        log_path = setup_files["log_path"]
+        config_path = tmp_path / "all_of_config.yaml"
+        config_data = {
+            "fields": {"email": "Sheet1!E2", "age": "Sheet1!F2"},
+            "rules": [
+                {
+                    "name": "複合チェック",
+                    "expression": {
+                        "all_of": [
+                            {"regex_match": {"field": "email", "pattern": r"^[\w.-]+@[\w.-]+\.\w+$"}},
+                            {"compare": {"left_field": "age", "operator": ">=", "right": 18}},
+                        ]
+                    },
+                    "error_message": "入力内容が不正です",
+                }
+            ],
+            "output": {"format": "json"},
+        }
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.dump(config_data, f, allow_unicode=True)
+
+        def logged_error_fields(extra_args):
+            result = self.run_cli_command(
+                [str(excel_path), "--config", str(config_path), "--validate-only", "--log", str(log_path)] + extra_args
+            )
+            assert result.returncode == 1
+            with open(log_path, encoding="utf-8") as f:
+                return json.load(f)["validation_results"][0]["error_fields"]
+
+        # デフォルトでは最初に失敗した条件で評価を打ち切る
+        assert logged_error_fields([]) == ["email"]
+        assert logged_error_fields(["--full-diagnostics"]) == ["age", "email"]
@@ -3,11 +3,14 @@
 """
 
 import json
+import os
 
 import pytest
 import yaml
 from pydantic import ValidationError as PydanticValidationError
 
+from xlsx_value_picker import config_cache
+from xlsx_value_picker.config_cache import CONFIG_CACHE_DIR_ENV
 from xlsx_value_picker.config_loader import (
     ConfigLoader,
     ConfigLoadError,
@@ -15,6 +18,7 @@ from xlsx_value_picker.config_loader import (
     ConfigParser,
     ConfigValidationError,
     MCPConfig,
+    ModelFileCache,
     OutputFormat,
     Rule,
 )
@@ -191,6 +195,21 @@ class TestPydanticModels:
             OutputFormat(format="xml")
         assert "サポートされていない出力形式です" in str(excinfo3.value)
 
+    def test_csv_options_validation(self):
+        """CSV出力の設定のバリデーションテスト"""
+        output = OutputFormat.model_validate(
+            {"format": "csv", "csv": {"dialect": "excel-tab", "encoding": "utf-8-sig", "null_value": "NULL"}}
+        )
+        assert output.csv.dialect == "excel-tab"
+        assert output.csv.encoding == "utf-8-sig"
+        assert output.csv.null_value == "NULL"
+        assert OutputFormat(format="csv").csv.dialect == "excel"
+
+        with pytest.raises(ValueError, match="不明な文字コードです"):
+            OutputFormat.model_validate({"format": "csv", "csv": {"encoding": "no-such-encoding"}})
+        with pytest.raises(PydanticValidationError):
+            OutputFormat.model_validate({"format": "csv", "csv": {"dialect": "semicolon"}})
+
     def test_config_model_validation(self):
         """ConfigModelモデルのバリデーションテスト"""
         # 正常系
@@ -269,6 +288,102 @@ class TestConfigLoader:
         assert "Value error, 少なくとも1つのフィールド定義が必要です" in str(excinfo.value)
 
 
+class TestConfigCache:
+    """検証済み設定モデルのキャッシュのテスト"""
+
+    @pytest.fixture
+    def config_file(self, tmp_path):
+        config_path = tmp_path / "config.yaml"
+        data = {
+            "fields": {"key1": "Sheet1!A1", "key2": "Sheet1!B2"},
+            "rules": [{"name": "必須", "expression": {"required": "key1"}, "error_message": "{field}は必須です"}],
+            "output": {"format": "json"},
+        }
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.dump(data, f, allow_unicode=True)
+        return str(config_path)
+
+    @pytest.fixture
+    def no_validation(self, monkeypatch):
+        """モデル検証が呼ばれた場合に失敗させる"""
+
+        def fail(*args, **kwargs):
+            raise AssertionError("モデル検証が実行されました")
+
+        monkeypatch.setattr(ConfigModel, "model_validate", fail)
+
+    def test_cached_model_is_loaded_without_validation(self, config_file, tmp_path, request):
+        """2回目以降はキャッシュから検証済みのモデルを読み込むことをテスト"""
+        cache_dir = tmp_path / "cache"
+        model = ConfigLoader(cache_dir=cache_dir).load_config(config_file)
+        assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+        request.getfixturevalue("no_validation")
+        cached = ConfigLoader(cache_dir=cache_dir).load_config(config_file)
+
+        assert cached == model
+        assert cached.extraction_plan == model.extraction_plan
+
+    def test_changed_content_is_revalidated(self, config_file, tmp_path):
+        """設定ファイルの内容が変わった場合は読み込み直すことをテスト"""
+        cache_dir = tmp_path / "cache"
+        ConfigLoader(cache_dir=cache_dir).load_config(config_file)
+
+        with open(config_file, "a", encoding="utf-8") as f:
+            f.write("\n# コメント\n")
+        model = ConfigLoader(cache_dir=cache_dir).load_config(config_file)
+
+        assert model.fields["key1"] == "Sheet1!A1"
+        assert len(list(cache_dir.glob("*.pickle"))) == 2
+
+    def test_changed_model_source_is_revalidated(self, config_file, tmp_path, monkeypatch):
+        """設定モデルを定義するモジュールが変わった場合は読み込み直すことをテスト（編集可能インストール）"""
+        cache_dir = tmp_path / "cache"
+        ConfigLoader(cache_dir=cache_dir).load_config(config_file)
+
+        monkeypatch.setattr(config_cache, "_model_source_digest", lambda: "changed")
+        model = ConfigLoader(cache_dir=cache_dir).load_config(config_file)
+
+        assert model.fields["key1"] == "Sheet1!A1"
+        assert len(list(cache_dir.glob("*.pickle"))) == 2
+
+    def test_broken_cache_file_is_ignored(self, config_file, tmp_path):
+        """読み込めないキャッシュファイルは無視して設定ファイルを読み込むことをテスト"""
+        cache_dir = tmp_path / "cache"
+        ConfigLoader(cache_dir=cache_dir).load_config(config_file)
+        for cache_file in cache_dir.glob("*.pickle"):
+            cache_file.write_bytes(b"broken")
+
+        model = ConfigLoader(cache_dir=cache_dir).load_config(config_file)
+        assert model.fields["key2"] == "Sheet1!B2"
+
+    def test_validation_error_is_not_cached(self, tmp_path):
+        """検証に失敗した設定はキャッシュしないことをテスト"""
+        cache_dir = tmp_path / "cache"
+        config_path = tmp_path / "model_error.yaml"
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.dump({"fields": {}, "output": {"format": "json"}}, f)
+
+        for _ in range(2):
+            with pytest.raises(ConfigValidationError):
+                ConfigLoader(cache_dir=cache_dir).load_config(str(config_path))
+        assert not list(cache_dir.glob("*.pickle"))
+
+    def test_cache_dir_from_environment(self, config_file, tmp_path, monkeypatch):
+        """環境変数でキャッシュディレクトリを指定できることをテスト"""
+        cache_dir = tmp_path / "env_cache"
+        monkeypatch.setenv(CONFIG_CACHE_DIR_ENV, str(cache_dir))
+
+        ConfigLoader().load_config(config_file)
+
+        assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+    def test_cache_disabled_by_default(self, monkeypatch):
+        """キャッシュディレクトリを指定しない場合はキャッシュしないことをテスト"""
+        monkeypatch.delenv(CONFIG_CACHE_DIR_ENV, raising=False)
+        assert ConfigLoader().cache is None
+
+
 def test_load_mcp_config_valid():
     """有効なMCP設定ファイルを正しく読み込むことをテスト"""
     loader = ConfigLoader()
@@ -293,3 +408,126 @@ def test_load_mcp_config_missing_file():
     config_path = "test/data/non_existent_config.yaml"
     with pytest.raises(ConfigLoadError):
         loader.load_mcp_config(config_path)
+
+
+def write_model_config(path, **extra):
+    """モデル設定ファイルを作成する"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"fields": {"key1": "Sheet1!A1"}, "rules": [], **extra}
+    path.write_text(json.dumps(data) if path.suffix == ".json" else yaml.safe_dump(data), encoding="utf-8")
+    return path
+
+
+def touch(path):
+    """ファイルの更新時刻を進める"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def load_mcp_models(tmp_path, models):
+    """MCP設定ファイルを作成して読み込み、モデル設定を取得する"""
+    mcp_config_path = tmp_path / "mcp.yaml"
+    mcp_config_path.write_text(
+        yaml.safe_dump({"models": models, "config": {"tool_descriptions": {}}}), encoding="utf-8"
+    )
+    mcp_config = ConfigLoader().load_mcp_config(str(mcp_config_path))
+    mcp_config.cache_models()
+    return mcp_config.loaded_models
+
+
+class TestGlobModelConfigReference:
+    """glob パターンによるモデル設定ファイルの参照のテスト"""
+
+    def test_glob_relative_to_mcp_config(self, tmp_path):
+        """パターンはMCP設定ファイルのフォルダから展開し、モデル名がなければファイル名を使う"""
+        write_model_config(tmp_path / "models" / "b.yaml")
+        write_model_config(tmp_path / "models" / "a.yaml", model_name="名前あり")
+        write_model_config(tmp_path / "models" / "sub" / "c.json")
+        (tmp_path / "models" / "readme.txt").write_text("対象外", encoding="utf-8")
+
+        models = load_mcp_models(tmp_path, [{"config_path_pattern": "models/**/*.*[nl]"}])
+
+        assert [model.model_name for model in models] == ["名前あり", "b", "c"]
+
+    def test_same_file_names_in_different_folders(self, tmp_path):
+        """別のフォルダに同じ名前のファイルがある場合は、パターンの起点からの相対パスをモデル名とする"""
+        write_model_config(tmp_path / "models" / "sales" / "model.yaml")
+        write_model_config(tmp_path / "models" / "stock" / "model.yaml")
+        write_model_config(tmp_path / "models" / "other.yaml")
+
+        models = load_mcp_models(tmp_path, [{"config_path_pattern": "models/**/*.yaml"}])
+
+        assert [model.model_name for model in models] == ["other", "sales/model", "stock/model"]
+
+    def test_no_match(self, tmp_path):
+        """一致するファイルがない場合はモデルなし"""
+        assert load_mcp_models(tmp_path, [{"config_path_pattern": "models/*.yaml"}]) == []
+
+    def test_reload_returns_same_models(self, tmp_path):
+        """変更されていないファイルは読み込み直しても同じモデルオブジェクトを返す"""
+        write_model_config(tmp_path / "models" / "a.yaml")
+        references = [
+            {"config_path_pattern": "models/*.yaml"},
+            {"config": "models/a.yaml", "model_name": "上書き", "model_description": "説明"},
+        ]
+
+        first = load_mcp_models(tmp_path, references)
+        second = load_mcp_models(tmp_path, references)
+
+        assert [model.model_name for model in first] == ["a", "上書き"]
+        assert first[1].model_description == "説明"
+        assert all(a is b for a, b in zip(first, second, strict=True))
+
+
+class TestModelFileCache:
+    """モデル設定ファイルのキャッシュのテスト"""
+
+    def test_parallel_load(self, tmp_path):
+        """ファイルが多い場合は並列に読み込み、パスと同じ順に返す"""
+        paths = [write_model_config(tmp_path / f"{i:02}.yaml", model_name=f"m{i}") for i in range(20)]
+        cache = ModelFileCache(workers=2)
+
+        models = cache.load_models(paths)
+
+        assert [model.model_name for model in models] == [f"m{i}" for i in range(20)]
+        assert models[0].extraction_plan.field_mapping == {"key1": "Sheet1!A1"}
+        assert cache.loads == 20
+
+    def test_rescan_reloads_only_changed_files(self, tmp_path):
+        """読み込み直す場合は変更されたファイルだけを検証し直す"""
+        paths = [write_model_config(tmp_path / f"{i:02}.yaml") for i in range(20)]
+        cache = ModelFileCache(workers=2)
+        first = cache.load_models(paths)
+
+        write_model_config(paths[3], model_name="変更後")
+        touch(paths[3])
+        second = cache.load_models(paths)
+
+        assert cache.loads == 21
+        assert second[3].model_name == "変更後"
+        assert all(a is b for i, (a, b) in enumerate(zip(first, second, strict=True)) if i != 3)
+
+    def test_invalid_file(self, tmp_path):
+        """並列に読み込む場合も、検証に失敗したファイルのパスをエラーに含める"""
+        paths = [write_model_config(tmp_path / f"{i:02}.yaml") for i in range(20)]
+        paths[5].write_text(yaml.safe_dump({"fields": {}}), encoding="utf-8")
+
+        with pytest.raises(ConfigValidationError, match="05.yaml"):
+            ModelFileCache(workers=2).load_models(paths)
+
+    def test_retain(self, tmp_path):
+        """指定したファイル以外のエントリを削除する"""
+        paths = [write_model_config(tmp_path / f"{i}.yaml") for i in range(3)]
+        cache = ModelFileCache()
+        cache.load_models(paths)
+
+        cache.retain(paths[1:])
+
+        assert len(cache) == 2
+        cache.load_models(paths[1:])
+        assert cache.loads == 3
+
+    def test_missing_file(self, tmp_path):
+        """存在しないファイルはエラー"""
+        with pytest.raises(ConfigLoadError, match="見つかりません"):
+            ModelFileCache().load_models([tmp_path / "missing.yaml"])
@@ -2,13 +2,25 @@
 Excelファイル処理機能のテスト
 """
 
+import datetime
+import os
+import threading
+import time
+import zipfile
 from pathlib import Path
 
 import openpyxl
 import pytest
 
 from xlsx_value_picker.config_loader import ConfigModel, OutputFormat
-from xlsx_value_picker.excel_processor import ExcelValueExtractor
+from xlsx_value_picker.excel_processor import (
+    ExcelValueExtractor,
+    WorkbookCache,
+    WorkbookCacheStats,
+    WorkbookSession,
+    XlsxCellReader,
+    get_workbook_cache,
+)
 from xlsx_value_picker.exceptions import ExcelProcessingError
 
 
@@ -171,3 +183,461 @@ class TestExcelValueExtractor:
                 temp_excel.unlink()  # テスト後にファイルを削除
         assert "Excel値の取得中にエラーが発生しました" in str(excinfo.value)
         assert "シートが見つかりません" in str(excinfo.value.__cause__)
+
+
+class TestWorkbookSession:
+    """WorkbookSessionクラスのテスト"""
+
+    @pytest.fixture
+    def excel_file(self, tmp_path):
+        """テスト用のExcelファイルを作成してパスを返す"""
+        file_path = tmp_path / "test.xlsx"
+        create_test_excel(file_path)
+        return str(file_path)
+
+    def test_lazy_open(self, excel_file):
+        """セッションは最初の値取得時までワークブックを読み込まないことをテスト"""
+        with WorkbookSession(excel_file) as session:
+            assert not session.is_open
+            assert session.get_cell_value("Sheet1!A1") == 100
+            assert session.is_open
+        assert not session.is_open
+
+    def test_shared_session_parses_once(self, excel_file, monkeypatch):
+        """バリデーションと抽出で同じセッションを使うとファイルが1回だけ読み込まれることをテスト"""
+        import xlsx_value_picker.excel_processor as excel_processor
+        from xlsx_value_picker.config_loader import Rule
+        from xlsx_value_picker.validation import ValidationEngine
+
+        load_calls = []
+        original_load = excel_processor.openpyxl.load_workbook
+
+        def counting_load(*args, **kwargs):
+            load_calls.append(args)
+            return original_load(*args, **kwargs)
+
+        monkeypatch.setattr(excel_processor.openpyxl, "load_workbook", counting_load)
+
+        config = ConfigModel(
+            fields={"value1": "Sheet1!A1", "sheet2_value": "Sheet2!A1"},
+            rules=[Rule(name="必須", expression={"required": "value1"}, error_message="{field}は必須です")],
+            output=OutputFormat(format="json"),
+        )
+        with WorkbookSession(excel_file) as session:
+            results = ValidationEngine(config.rules).validate(session, config.fields)
+            with ExcelValueExtractor(session) as extractor:
+                data = extractor.extract_values(config)
+            # 共有セッションは抽出器の終了時に閉じられない
+            assert session.is_open
+
+        assert results == []
+        assert data == {"value1": 100, "sheet2_value": "Sheet2値1"}
+        assert len(load_calls) == 1
+        assert not session.is_open
+
+    def test_get_excel_values_with_session(self, excel_file):
+        """get_excel_values がセッションを受け取れることをテスト"""
+        from xlsx_value_picker.excel_processor import get_excel_values
+
+        with WorkbookSession(excel_file) as session:
+            assert get_excel_values(session, {"val1": "Sheet1!A1"}) == {"val1": 100}
+            assert session.is_open
+
+
+class TestWorkbookCache:
+    """WorkbookCacheクラスのテスト"""
+
+    def _write_excel(self, path, value):
+        """A1に指定した値を持つExcelファイルを作成する"""
+        wb = openpyxl.Workbook()
+        wb.active.title = "Sheet1"
+        wb.active["A1"] = value
+        wb.save(path)
+        return str(path)
+
+    def test_hit_returns_same_session(self, tmp_path):
+        """変更されていないファイルはキャッシュ済みのセッションを返すことをテスト"""
+        excel_file = self._write_excel(tmp_path / "a.xlsx", 1)
+        cache = WorkbookCache()
+
+        first = cache.get_session(excel_file)
+        second = cache.get_session(excel_file)
+
+        assert first is second
+        assert first.get_cell_value("Sheet1!A1") == 1
+        assert cache.stats == WorkbookCacheStats(
+            hits=1, misses=1, evictions=0, entries=1, total_bytes=os.path.getsize(excel_file)
+        )
+
+    def test_read_mode_is_part_of_key(self, tmp_path):
+        """読み込みモードごとに別のエントリになることをテスト"""
+        excel_file = self._write_excel(tmp_path / "a.xlsx", 1)
+        cache = WorkbookCache()
+
+        full = cache.get_session(excel_file)
+        xml = cache.get_session(excel_file, read_mode="xml")
+
+        assert full is not xml
+        assert xml.read_mode == "xml"
+        assert len(cache) == 2
+
+    def test_modified_file_is_reloaded(self, tmp_path):
+        """ファイルが更新された場合は読み込み直してエントリを置き換えることをテスト"""
+        excel_file = self._write_excel(tmp_path / "a.xlsx", 1)
+        cache = WorkbookCache()
+        cache.get_session(excel_file)
+
+        self._write_excel(tmp_path / "a.xlsx", 2)
+        stat = os.stat(excel_file)
+        os.utime(excel_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert cache.get_session(excel_file).get_cell_value("Sheet1!A1") == 2
+        assert cache.stats.misses == 2
+        assert len(cache) == 1
+
+    def test_verify_content(self, tmp_path):
+        """verify_content の場合は更新時刻とサイズが同じでも内容の変更を検出することをテスト"""
+        excel_file = self._write_excel(tmp_path / "a.xlsx", 1)
+        stat = os.stat(excel_file)
+        cache = WorkbookCache(verify_content=True)
+        cache.get_session(excel_file)
+
+        # 同じサイズで内容だけが異なるファイルに置き換え、更新時刻を元に戻す
+        self._write_excel(tmp_path / "a.xlsx", 2)
+        assert os.path.getsize(excel_file) == stat.st_size
+        os.utime(excel_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert cache.get_session(excel_file).get_cell_value("Sheet1!A1") == 2
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """エントリ数の上限を超えると最も長く使われていないエントリを破棄することをテスト"""
+        files = [self._write_excel(tmp_path / f"{name}.xlsx", name) for name in "abc"]
+        cache = WorkbookCache(max_entries=2)
+
+        first = cache.get_session(files[0])
+        cache.get_session(files[1])
+        cache.get_session(files[0])
+        cache.get_session(files[2])
+
+        assert cache.stats.evictions == 1
+        assert cache.get_session(files[0]) is first
+        assert cache.stats.misses == 3
+
+    def test_byte_budget(self, tmp_path):
+        """ファイルサイズの合計の上限を超えないことをテスト"""
+        files = [self._write_excel(tmp_path / f"{name}.xlsx", name) for name in "abc"]
+        cache = WorkbookCache(max_bytes=max(os.path.getsize(f) for f in files) * 2)
+
+        for excel_file in files:
+            cache.get_session(excel_file)
+
+        assert len(cache) == 2
+        assert cache.stats.total_bytes <= cache.max_bytes
+
+    def test_file_over_budget_is_not_cached(self, tmp_path):
+        """上限より大きいファイルは読み込むがキャッシュしないことをテスト"""
+        excel_file = self._write_excel(tmp_path / "a.xlsx", 1)
+        cache = WorkbookCache(max_bytes=1)
+
+        assert cache.get_session(excel_file).get_cell_value("Sheet1!A1") == 1
+        assert len(cache) == 0
+
+    def test_invalidate_and_clear(self, tmp_path):
+        """invalidate と clear でエントリを削除できることをテスト（使用中のセッションは閉じない）"""
+        excel_file = self._write_excel(tmp_path / "a.xlsx", 1)
+        cache = WorkbookCache()
+        session = cache.get_session(excel_file)
+
+        cache.invalidate(excel_file)
+        assert len(cache) == 0
+        assert session.is_open
+        assert session.get_cell_value("Sheet1!A1") == 1
+        assert cache.get_session(excel_file) is not session
+
+        cache.clear()
+        assert session.is_open
+        cache.get_session(excel_file)
+        cache.clear()
+        assert cache.stats == WorkbookCacheStats(hits=0, misses=0, evictions=0, entries=0, total_bytes=0)
+
+    def test_missing_file(self, tmp_path):
+        """存在しないファイルの場合はExcelProcessingErrorを送出することをテスト"""
+        with pytest.raises(ExcelProcessingError, match="Excelファイルが見つかりません"):
+            WorkbookCache().get_session(tmp_path / "missing.xlsx")
+
+    def test_concurrent_misses_load_once(self, tmp_path, monkeypatch):
+        """同じファイルを複数のスレッドから同時に要求しても1回だけ読み込むことをテスト"""
+        excel_file = self._write_excel(tmp_path / "a.xlsx", 1)
+        cache = WorkbookCache()
+        loads = []
+        original_open = WorkbookSession.open
+
+        def slow_open(session):
+            loads.append(session)
+            time.sleep(0.1)
+            return original_open(session)
+
+        monkeypatch.setattr(WorkbookSession, "open", slow_open)
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(cache.get_session(excel_file))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loads) == 1
+        assert sessions[0] is sessions[1]
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+        assert sessions[0].get_cell_value("Sheet1!A1") == 1
+
+    def test_concurrent_load_error(self, tmp_path, monkeypatch):
+        """読み込みに失敗した場合は完了を待っていた呼び出し元にも例外を送出することをテスト"""
+        excel_file = tmp_path / "broken.xlsx"
+        excel_file.write_bytes(b"not a zip file")
+        cache = WorkbookCache()
+        original_open = WorkbookSession.open
+
+        def slow_open(session):
+            time.sleep(0.1)
+            return original_open(session)
+
+        monkeypatch.setattr(WorkbookSession, "open", slow_open)
+        errors = []
+
+        def get_session():
+            try:
+                cache.get_session(excel_file)
+            except ExcelProcessingError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=get_session) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 2
+        assert cache.stats.misses == 1
+        assert len(cache) == 0
+
+    def test_default_cache(self):
+        """デフォルトのキャッシュはプロセス内で共有されることをテスト"""
+        assert get_workbook_cache() is get_workbook_cache()
+
+
+class TestStreamingReadMode:
+    """streaming読み込みモードのテスト"""
+
+    @pytest.fixture
+    def excel_file(self, tmp_path):
+        """テスト用のExcelファイルを作成してパスを返す"""
+        file_path = tmp_path / "test.xlsx"
+        create_test_excel(file_path)
+        return str(file_path)
+
+    def test_extract_values_matches_full_mode(self, excel_file):
+        """streamingモードの抽出結果が通常モードと一致することをテスト"""
+        config = ConfigModel(
+            fields={
+                "text": "Sheet1!C3",
+                "value1": "Sheet1!A1",
+                "sheet2_value": "Sheet2!A1",
+                "empty_cell": "Sheet1!D4",
+                "value2": "Sheet1!B2",
+                "outside": "Sheet1!Z100",
+            },
+            rules=[],
+            output=OutputFormat(format="json"),
+        )
+
+        with ExcelValueExtractor(excel_file) as extractor:
+            expected = extractor.extract_values(config, include_empty_cells=True)
+        with ExcelValueExtractor(excel_file, read_mode="streaming") as extractor:
+            result = extractor.extract_values(config, include_empty_cells=True)
+
+        assert result == expected
+        assert list(result) == list(expected)
+
+    def test_stops_after_last_referenced_row(self, tmp_path):
+        """参照されている最大の行を超えたらシートの読み込みを打ち切ることをテスト"""
+        file_path = tmp_path / "large.xlsx"
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Sheet1"
+        for row in range(1, 501):
+            ws.cell(row=row, column=1, value=row)
+        wb.save(file_path)
+
+        with WorkbookSession(file_path, read_mode="streaming") as session:
+            sheet = session.open().workbook["Sheet1"]
+            rows_read = []
+            original_iter_rows = sheet.iter_rows
+
+            def recording_iter_rows(*args, **kwargs):
+                for row in original_iter_rows(*args, **kwargs):
+                    rows_read.append(row)
+                    yield row
+
+            sheet.iter_rows = recording_iter_rows
+            assert session.read_cells({"first": "Sheet1!A2", "second": "Sheet1!A5"}) == {"first": 2, "second": 5}
+
+        assert len(rows_read) == 4
+
+    def test_errors_match_full_mode(self, excel_file):
+        """streamingモードでも不正な参照で同じエラーになることをテスト"""
+        with WorkbookSession(excel_file, read_mode="streaming") as session:
+            with pytest.raises(ExcelProcessingError, match="シートが見つかりません"):
+                session.read_cells({"val": "NonExistentSheet!A1"})
+            with pytest.raises(ExcelProcessingError, match="無効なセル参照形式です"):
+                session.read_cells({"val": "InvalidFormat"})
+            with pytest.raises(ExcelProcessingError, match="無効なセル参照です"):
+                session.read_cells({"val": "Sheet1!InvalidCell"})
+
+
+def create_typed_test_excel(path):
+    """さまざまな型・書式のセルを含むテスト用のExcelファイルを作成する"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Types"
+    ws["A1"] = 100
+    ws["A2"] = 3.14
+    ws["A3"] = -1.5e-10
+    ws["A4"] = "テキスト"
+    ws["A5"] = True
+    ws["A6"] = False
+    ws["A7"] = datetime.datetime(2024, 4, 1, 12, 30, 15)
+    ws["A8"] = datetime.date(2024, 4, 1)
+    ws["A9"] = datetime.time(8, 15)
+    ws["A10"] = datetime.timedelta(hours=30, minutes=5)
+    ws["A11"] = 1234.5
+    ws["A11"].number_format = "#,##0.00"
+    ws["A12"] = 45000
+    ws["A12"].number_format = "yyyy/mm/dd"
+    ws["A13"] = "=A1*2"  # キャッシュ値のない数式
+    ws["A14"] = "テキスト"  # 共有文字列の再利用
+    ws["B1000"] = "遠いセル"
+    ws2 = wb.create_sheet("シート 2")
+    ws2["C3"] = "別シート"
+    wb.save(path)
+
+
+def create_handcrafted_test_excel(path):
+    """インライン文字列・リッチテキスト・エラー値などを含むExcelファイルをXMLから直接作成する"""
+    main_ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    rel_ns = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    parts = {
+        "[Content_Types].xml": (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/data.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/strings.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{rel_ns}/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>"
+        ),
+        "xl/workbook.xml": (
+            f'<workbook xmlns="{main_ns}" xmlns:r="{rel_ns}"><workbookPr date1904="1"/>'
+            '<sheets><sheet name="Data" sheetId="1" r:id="rId7"/></sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId7" Type="{rel_ns}/worksheet" Target="/xl/worksheets/data.xml"/>'
+            f'<Relationship Id="rId8" Type="{rel_ns}/sharedStrings" Target="strings.xml"/>'
+            f'<Relationship Id="rId9" Type="{rel_ns}/styles" Target="styles.xml"/>'
+            "</Relationships>"
+        ),
+        "xl/strings.xml": (
+            f'<sst xmlns="{main_ns}"><si><t>最初</t></si>'
+            "<si><r><t>リッチ</t></r><r><rPr><b/></rPr><t>テキスト</t></r><rPh sb='0' eb='1'><t>ふりがな</t></rPh></si>"
+            "<si><t>_x005F_x000D_エスケープ</t></si></sst>"
+        ),
+        "xl/styles.xml": (
+            f'<styleSheet xmlns="{main_ns}"><numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+            '</numFmts><cellXfs count="2"><xf numFmtId="0"/><xf numFmtId="164"/></cellXfs></styleSheet>'
+        ),
+        "xl/worksheets/data.xml": (
+            f'<worksheet xmlns="{main_ns}"><sheetData>'
+            '<row r="1"><c r="A1" t="s"><v>1</v></c><c r="B1" t="inlineStr"><is><t>インライン</t></is></c>'
+            '<c r="C1" t="e"><v>#DIV/0!</v></c><c r="D1" t="str"><f>"a"&amp;"b"</f><v>ab</v></c></row>'
+            '<row r="2"><c t="b"><v>1</v></c><c s="1"><v>100</v></c><c t="d"><v>2024-01-02T03:04:05</v></c>'
+            '<c t="s"><v>2</v></c><c><v></v></c></row>'
+            "</sheetData></worksheet>"
+        ),
+    }
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in parts.items():
+            archive.writestr(name, content)
+
+
+class TestXlsxCellReader:
+    """XlsxCellReader（xml読み込みモード）のテスト"""
+
+    def assert_conforms(self, excel_file, references):
+        """xmlモードの結果が openpyxl の _get_cell_value と完全に一致することを確認する"""
+        field_mapping = {ref: ref for ref in references}
+        with ExcelValueExtractor(excel_file) as extractor:
+            expected = {ref: extractor._get_cell_value(ref) for ref in references}
+
+        reader = XlsxCellReader(excel_file)
+        try:
+            result = reader.read_cells(field_mapping)
+        finally:
+            reader.close()
+
+        assert result == expected
+        for ref in references:
+            assert type(result[ref]) is type(expected[ref]), ref
+
+    def test_conforms_to_openpyxl(self, tmp_path):
+        """openpyxlで作成したファイルの各種セル値が openpyxl 経由と一致することをテスト"""
+        file_path = tmp_path / "types.xlsx"
+        create_typed_test_excel(file_path)
+        references = [f"Types!A{row}" for row in range(1, 15)]
+        references += ["Types!B1000", "Types!Z5", "Types!A2000", "シート 2!C3", "シート 2!A1"]
+        self.assert_conforms(str(file_path), references)
+
+    @pytest.mark.filterwarnings("ignore:Workbook contains no default style")
+    def test_conforms_to_openpyxl_handcrafted(self, tmp_path):
+        """インライン文字列・リッチテキスト・エラー値・1904年基準の日付が openpyxl 経由と一致することをテスト"""
+        file_path = tmp_path / "handcrafted.xlsx"
+        create_handcrafted_test_excel(file_path)
+        references = [f"Data!{col}{row}" for row in (1, 2) for col in "ABCDE"]
+        self.assert_conforms(str(file_path), references)
+
+    def test_read_mode_xml(self, tmp_path):
+        """xml読み込みモードでの抽出とエラーが他のモードと一致することをテスト"""
+        file_path = tmp_path / "test.xlsx"
+        create_test_excel(file_path)
+        config = ConfigModel(
+            fields={"value1": "Sheet1!A1", "text": "Sheet1!C3", "empty": "Sheet1!D4", "sheet2_value": "Sheet2!A1"},
+            rules=[],
+            output=OutputFormat(format="json"),
+        )
+
+        with ExcelValueExtractor(file_path, read_mode="xml") as extractor:
+            assert extractor.extract_values(config) == {"value1": 100, "text": "テスト", "sheet2_value": "Sheet2値1"}
+            assert extractor._get_cell_value("Sheet1!B2") == 200
+            with pytest.raises(ExcelProcessingError, match="シートが見つかりません"):
+                extractor._get_cell_value("NonExistentSheet!A1")
+            with pytest.raises(ExcelProcessingError, match="無効なセル参照です"):
+                extractor._get_cell_value("Sheet1!InvalidCell")
+        assert not extractor.session.is_open
+
+    def test_invalid_file(self, tmp_path):
+        """zip形式でないファイルで ExcelProcessingError が発生することをテスト"""
+        file_path = tmp_path / "broken.xlsx"
+        file_path.write_text("not a zip", encoding="utf-8")
+        with pytest.raises(ExcelProcessingError, match="Excelファイル形式が無効です"):
+            with ExcelValueExtractor(file_path, read_mode="xml"):
+                pass
@@ -0,0 +1,93 @@
+"""
+抽出計画（ExtractionPlan）のテスト
+"""
+
+import dataclasses
+
+import openpyxl
+import pytest
+
+from xlsx_value_picker.config_loader import ConfigModel, OutputFormat
+from xlsx_value_picker.excel_processor import ExcelValueExtractor
+from xlsx_value_picker.exceptions import ExcelProcessingError
+from xlsx_value_picker.extraction_plan import CellReference, ExtractionPlan
+
+
+class TestExtractionPlan:
+    """ExtractionPlanクラスのテスト"""
+
+    def test_from_fields(self):
+        """セル参照が解析され、シートごとに行・列順でまとめられることをテスト"""
+        plan = ExtractionPlan.from_fields({"b": "Sheet1!B10", "a": "Sheet2!A1", "c": "Sheet1!C2", "d": "Sheet1!A2"})
+
+        assert [cell.field_name for cell in plan.cells] == ["b", "a", "c", "d"]
+        assert plan.cells[0] == CellReference("b", "Sheet1!B10", "Sheet1", 10, 2)
+        assert plan.sheet_names == ("Sheet1", "Sheet2")
+        sheet1_cells = dict(plan.sheets)["Sheet1"]
+        assert [cell.field_name for cell in sheet1_cells] == ["d", "c", "b"]
+        assert plan.field_mapping == {"b": "Sheet1!B10", "a": "Sheet2!A1", "c": "Sheet1!C2", "d": "Sheet1!A2"}
+
+    def test_subset(self):
+        """指定したフィールドだけを定義順に含む計画を作成できることをテスト"""
+        plan = ExtractionPlan.from_fields({"b": "Sheet1!B10", "a": "Sheet2!A1", "c": "Sheet1!C2"})
+
+        subset = plan.subset({"c", "b", "unknown"})
+
+        assert subset.field_mapping == {"b": "Sheet1!B10", "c": "Sheet1!C2"}
+        assert subset.sheet_names == ("Sheet1",)
+        assert [cell.field_name for cell in dict(subset.sheets)["Sheet1"]] == ["c", "b"]
+
+    def test_immutable(self):
+        """抽出計画が変更できないことをテスト"""
+        plan = ExtractionPlan.from_fields({"a": "Sheet1!A1"})
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            plan.cells = ()  # type: ignore[misc]
+
+    @pytest.mark.parametrize(
+        ("reference", "message"),
+        [
+            ("InvalidFormat", "無効なセル参照形式です"),
+            ("Sheet1!A0", "無効なセル参照です"),
+            ("Sheet1!1A", "無効なセル参照です"),
+        ],
+    )
+    def test_invalid_reference(self, reference, message):
+        """不正なセル参照で ExcelProcessingError が発生することをテスト"""
+        with pytest.raises(ExcelProcessingError, match=message):
+            ExtractionPlan.from_fields({"a": reference})
+
+    def test_validate_sheets(self):
+        """存在しないシートが参照されている場合にエラーになることをテスト"""
+        plan = ExtractionPlan.from_fields({"a": "Sheet1!A1", "b": "Missing!A1"})
+        plan.validate_sheets(["Sheet1", "Missing"])
+        with pytest.raises(ExcelProcessingError, match="シートが見つかりません: Missing"):
+            plan.validate_sheets(["Sheet1"])
+
+
+class TestConfigModelExtractionPlan:
+    """ConfigModelが作成する抽出計画のテスト"""
+
+    def test_plan_built_at_load_time(self):
+        """設定モデルの作成時に抽出計画が作成されることをテスト"""
+        config = ConfigModel(fields={"a": "Sheet1!A1", "b": "Sheet1!B2"}, rules=[], output=OutputFormat())
+        assert isinstance(config.extraction_plan, ExtractionPlan)
+        assert config.extraction_plan.field_mapping == config.fields
+
+    def test_row_zero_rejected(self):
+        """行番号0のセル参照が設定の検証時に拒否されることをテスト"""
+        with pytest.raises(ValueError, match="無効なセル参照です"):
+            ConfigModel(fields={"a": "Sheet1!A0"}, rules=[], output=OutputFormat())
+
+    def test_plan_reused_across_workbooks(self, tmp_path):
+        """1つの抽出計画を複数のワークブックに使い回せることをテスト"""
+        config = ConfigModel(fields={"value": "Sheet1!A1"}, rules=[], output=OutputFormat())
+        results = []
+        for i in range(3):
+            path = tmp_path / f"book{i}.xlsx"
+            wb = openpyxl.Workbook()
+            wb.active.title = "Sheet1"
+            wb.active["A1"] = i
+            wb.save(path)
+            with ExcelValueExtractor(path) as extractor:
+                results.append(extractor.extract_values(config, include_empty_cells=True))
+        assert results == [{"value": 0}, {"value": 1}, {"value": 2}]
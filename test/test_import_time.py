@@ -0,0 +1,80 @@
+"""
+起動時のインポートのテスト
+
+run サブコマンドが、使わない機能（MCPサーバー、Jinja2、バッチ処理のプロセスプール）の
+モジュールを読み込まないことを `python -X importtime` の出力で確認する。
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+# run サブコマンド（JSON形式の設定と出力）で読み込まれてはいけないモジュール
+FORBIDDEN_MODULES = {"fastmcp", "mcp", "jinja2", "yaml", "xlsx_value_picker.batch", "concurrent.futures.process"}
+
+# xlsx_value_picker.cli のインポートにかかる時間の上限（マイクロ秒）
+# fastmcp を読み込むと上限を大きく超えるが、遅い環境でも誤検知しない程度の余裕を持たせている
+CLI_IMPORT_BUDGET_US = 1_500_000
+
+
+def run_with_importtime(args, cwd=None):
+    """-X importtime 付きでPythonを実行し、読み込まれたモジュールと累積時間の辞書を返す"""
+    env = os.environ.copy()
+    env["PYTHONPATH"] = str(Path(__file__).parent.parent)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args, cwd=cwd, capture_output=True, encoding="utf-8", env=env
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return result, modules
+
+
+class TestImportTime:
+    """起動時のインポートのテスト"""
+
+    def test_cli_import_is_lazy(self):
+        """CLIモジュールのインポートで重いモジュールを読み込まないことをテスト"""
+        _, modules = run_with_importtime(["-c", "import xlsx_value_picker.cli"])
+
+        assert "xlsx_value_picker.cli" in modules
+        assert not FORBIDDEN_MODULES & set(modules)
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="importtime の計測値が不安定なため")
+    def test_cli_import_budget(self):
+        """CLIモジュールのインポート時間が上限以内であることをテスト"""
+        # 初回はバイトコードの生成などで遅くなるため、2回目を計測する
+        run_with_importtime(["-c", "import xlsx_value_picker.cli"])
+        _, modules = run_with_importtime(["-c", "import xlsx_value_picker.cli"])
+
+        assert modules["xlsx_value_picker.cli"] < CLI_IMPORT_BUDGET_US
+
+    def test_run_with_json_config_and_output(self, tmp_path):
+        """JSON形式の設定と出力で run を実行した場合に重いモジュールを読み込まないことをテスト"""
+        excel_path = tmp_path / "test.xlsx"
+        wb = openpyxl.Workbook()
+        wb.active.title = "Sheet1"
+        wb.active["A1"] = 100
+        wb.save(excel_path)
+        config_path = tmp_path / "config.json"
+        config_path.write_text(
+            json.dumps({"fields": {"value": "Sheet1!A1"}, "rules": [], "output": {"format": "json"}}),
+            encoding="utf-8",
+        )
+
+        result, modules = run_with_importtime(
+            ["-m", "xlsx_value_picker.cli", "run", str(excel_path), "--config", str(config_path)]
+        )
+
+        assert result.returncode == 0, result.stderr[-2000:]
+        assert json.loads(result.stdout) == {"value": 100}
+        assert not FORBIDDEN_MODULES & set(modules)
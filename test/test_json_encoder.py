@@ -0,0 +1,84 @@
+"""
+JSONへの変換（json_encoder.py）のテスト
+"""
+
+import datetime
+import json
+from decimal import Decimal
+
+import pytest
+
+from xlsx_value_picker import json_encoder
+
+BACKENDS = [
+    pytest.param(False, id="stdlib"),
+    pytest.param(
+        True,
+        id="orjson",
+        marks=pytest.mark.skipif(not json_encoder.has_orjson(), reason="orjson がインストールされていない"),
+    ),
+]
+
+DATA = {
+    "text": "テスト文字列",
+    "number": 100,
+    "float": 1.5,
+    "none": None,
+    "flag": True,
+    "nested": {"list": [1, "二", {"key": []}], "empty": {}},
+}
+
+
+@pytest.mark.parametrize("use_orjson", BACKENDS)
+class TestJsonEncoder:
+    """json_encoder のテスト（標準ライブラリと orjson の両方）"""
+
+    def test_same_as_json_dumps(self, use_orjson):
+        """JSONの型だけのデータは json.dumps(ensure_ascii=False, indent=2) と同じ文字列になる"""
+        expected = json.dumps(DATA, ensure_ascii=False, indent=2)
+        assert json_encoder.dumps(DATA, use_orjson=use_orjson) == expected
+
+    def test_compact(self, use_orjson):
+        """compact の場合は改行・空白を含まない"""
+        result = json_encoder.dumps(DATA, compact=True, use_orjson=use_orjson)
+
+        assert result == json.dumps(DATA, ensure_ascii=False, separators=(",", ":"))
+        assert "\n" not in result
+
+    def test_dates_and_decimal(self, use_orjson):
+        """日付・時刻は ISO 8601 形式、Decimal は文字列に変換する"""
+        data = {
+            "datetime": datetime.datetime(2024, 1, 2, 3, 4, 5, 6),
+            "date": datetime.date(2024, 1, 2),
+            "time": datetime.time(12, 30),
+            "aware": datetime.datetime(2024, 1, 2, tzinfo=datetime.UTC),
+            "decimal": Decimal("1.10"),
+            "duration": datetime.timedelta(hours=30, minutes=5),
+        }
+
+        assert json.loads(json_encoder.dumps(data, compact=True, use_orjson=use_orjson)) == {
+            "datetime": "2024-01-02T03:04:05.000006",
+            "date": "2024-01-02",
+            "time": "12:30:00",
+            "aware": "2024-01-02T00:00:00+00:00",
+            "decimal": "1.10",
+            "duration": "1 day, 6:05:00",
+        }
+
+    def test_non_string_keys_and_big_int(self, use_orjson):
+        """文字列以外のキーは文字列に変換し、64ビットに収まらない整数もそのまま変換する"""
+        data = {1: "一", "big": 2**70}
+
+        assert json.loads(json_encoder.dumps(data, use_orjson=use_orjson)) == {"1": "一", "big": 2**70}
+
+    def test_unknown_type_raises(self, use_orjson):
+        """未知の型は json.dumps と同じく TypeError を送出する"""
+        with pytest.raises(TypeError, match="complex is not JSON serializable"):
+            json_encoder.dumps({"value": complex(1, 2)}, use_orjson=use_orjson)
+
+    def test_str_fallback(self, use_orjson):
+        """str_fallback=True の場合は未知の型を str() の結果に変換する"""
+        data = {"value": complex(1, 2), "date": datetime.date(2024, 1, 2)}
+        result = json_encoder.dumps(data, compact=True, use_orjson=use_orjson, str_fallback=True)
+
+        assert json.loads(result) == {"value": "(1+2j)", "date": "2024-01-02"}
@@ -2,13 +2,19 @@
 出力フォーマット機能のテスト
 """
 
+import csv
+import datetime
+import io
 import json
 
+import jinja2
+import openpyxl
 import pytest
 import yaml
 
-from xlsx_value_picker.config_loader import ConfigModel, OutputFormat
-from xlsx_value_picker.output_formatter import OutputFormatter
+from xlsx_value_picker.config_loader import ConfigModel, CsvOptions, OutputFormat
+from xlsx_value_picker.excel_processor import ExcelValueExtractor
+from xlsx_value_picker.output_formatter import CsvWriter, JsonLinesWriter, OutputFormatter
 
 
 class TestOutputFormatter:
@@ -69,6 +75,31 @@ class TestOutputFormatter:
         assert parsed["nested"]["key1"] == "value1"
         assert parsed["list"] == [1, 2, 3]
 
+    def test_format_json_dates(self, json_config):
+        """JSON形式では日付セルの値を ISO 8601 形式の文字列として出力することをテスト"""
+        result = OutputFormatter(json_config).format_output({"date": datetime.datetime(2024, 1, 2, 9, 30)})
+
+        assert json.loads(result) == {"date": "2024-01-02T09:30:00"}
+
+    def test_format_json_duration_cell(self, json_config, tmp_path):
+        """JSON形式では時間間隔の書式のセルの値を JSON Lines 形式と同じ文字列として出力することをテスト"""
+        excel_path = tmp_path / "duration.xlsx"
+        wb = openpyxl.Workbook()
+        wb.active.title = "Sheet1"
+        wb.active["A1"] = datetime.timedelta(hours=30, minutes=5)
+        wb.active["A1"].number_format = "[h]:mm"
+        wb.save(excel_path)
+        with ExcelValueExtractor(str(excel_path)) as extractor:
+            data = extractor.extract_values(json_config)
+        assert isinstance(data["field1"], datetime.timedelta)
+
+        result = OutputFormatter(json_config).format_output(data)
+        stream = io.StringIO()
+        JsonLinesWriter(stream).write_record(data)
+
+        assert json.loads(result) == {"field1": "1 day, 6:05:00"}
+        assert json.loads(stream.getvalue()) == json.loads(result)
+
     def test_format_yaml(self, yaml_config, test_data):
         """YAML形式の出力が正しく行われることをテスト"""
         formatter = OutputFormatter(yaml_config)
@@ -81,6 +112,17 @@ class TestOutputFormatter:
         assert parsed["nested"]["key1"] == "value1"
         assert parsed["list"] == [1, 2, 3]
 
+    def test_format_output_format_override(self, json_config, test_data):
+        """呼び出しごとに指定した形式で出力し、設定は書き換えない"""
+        formatter = OutputFormatter(json_config)
+
+        result = formatter.format_output(test_data, output_format="yaml")
+
+        assert yaml.safe_load(result) == test_data
+        assert not result.lstrip().startswith("{")
+        assert json_config.output.format == "json"
+        assert json.loads(formatter.format_output(test_data)) == test_data
+
     def test_format_jinja2_string(self, jinja2_string_config, test_data):
         """Jinja2文字列テンプレートの出力が正しく行われることをテスト"""
         formatter = OutputFormatter(jinja2_string_config)
@@ -99,6 +141,42 @@ class TestOutputFormatter:
         assert "値1: 100" in result
         assert "値2: テスト文字列" in result
 
+    def test_format_csv(self):
+        """CSV形式ではフィールド定義の順のヘッダー行と値の行を出力することをテスト"""
+        config = ConfigModel(
+            fields={"name": "Sheet1!A1", "age": "Sheet1!A2", "note": "Sheet1!A3"},
+            rules=[],
+            output=OutputFormat(format="csv"),
+        )
+        result = OutputFormatter(config).format_output({"age": 20, "name": "山田, 太郎", "note": None})
+
+        assert result == 'name,age,note\r\n"山田, 太郎",20,\r\n'
+
+    def test_format_csv_options(self):
+        """CSV形式の方言と None の表現を指定できることをテスト"""
+        config = ConfigModel(
+            fields={"name": "Sheet1!A1", "age": "Sheet1!A2"},
+            rules=[],
+            output=OutputFormat(format="csv", csv=CsvOptions(dialect="excel-tab", null_value="NULL")),
+        )
+        result = OutputFormatter(config).format_output({"name": "山田"})
+
+        assert result == "name\tage\r\n山田\tNULL\r\n"
+
+    def test_write_output_csv_with_bom(self, tmp_path):
+        """CSV形式のファイル出力では指定した文字コードで書き込み、改行コードを変換しないことをテスト"""
+        config = ConfigModel(
+            fields={"name": "Sheet1!A1"},
+            rules=[],
+            output=OutputFormat(format="csv", csv=CsvOptions(encoding="utf-8-sig")),
+        )
+        output_path = tmp_path / "output.csv"
+        formatter = OutputFormatter(config)
+        formatter.write_output({"name": "テスト"}, output_path)
+
+        assert not formatter.format_output({"name": "テスト"}).startswith("\ufeff")
+        assert output_path.read_bytes() == "\ufeffname\r\nテスト\r\n".encode()
+
     def test_format_invalid_format(self, test_data):
         """サポートされていない出力形式でValueErrorが発生することをテスト"""
         # 無効な出力形式の設定
@@ -166,6 +244,36 @@ class TestOutputFormatter:
             assert parsed["field1"] == 100
             assert parsed["field2"] == "テスト文字列"
 
+    def test_write_output_jinja2_streams_to_file(self, jinja2_string_config, test_data, tmp_path, monkeypatch):
+        """Jinja2形式のファイル出力では全体の文字列を作らずにテンプレートの出力を書き込むことをテスト"""
+        formatter = OutputFormatter(jinja2_string_config)
+        expected = formatter.format_output(test_data)
+        output_path = tmp_path / "output.txt"
+
+        def fail_render(*args, **kwargs):
+            raise AssertionError("render は呼ばれない")
+
+        monkeypatch.setattr(jinja2.Template, "render", fail_render)
+        result = formatter.write_output(test_data, output_path)
+
+        assert result is None
+        assert output_path.read_text(encoding="utf-8") == expected
+
+    def test_write_output_jinja2_missing_template_keeps_file(self, test_data, tmp_path):
+        """テンプレートファイルが存在しない場合は出力先のファイルを変更しないことをテスト"""
+        config = ConfigModel(
+            fields={"field1": "Sheet1!A1"},
+            rules=[],
+            output=OutputFormat(format="jinja2", template_file=str(tmp_path / "nonexistent.j2")),
+        )
+        output_path = tmp_path / "output.txt"
+        output_path.write_text("既存の内容", encoding="utf-8")
+
+        with pytest.raises(FileNotFoundError):
+            OutputFormatter(config).write_output(test_data, output_path)
+
+        assert output_path.read_text(encoding="utf-8") == "既存の内容"
+
     def test_write_output_return_value(self, json_config, test_data):
         """write_outputが出力内容を返すことをテスト"""
         formatter = OutputFormatter(json_config)
@@ -177,3 +285,73 @@ class TestOutputFormatter:
         parsed = json.loads(result)
         assert parsed["field1"] == 100
         assert parsed["field2"] == "テスト文字列"
+
+
+class TestRecordWriter:
+    """レコードを1件ずつ書き込むライターのテスト"""
+
+    @pytest.fixture
+    def json_config(self):
+        return ConfigModel(fields={"field1": "Sheet1!A1"}, rules=[], output=OutputFormat(format="json"))
+
+    def test_json_lines(self):
+        """1レコードを1行のJSONとして書き込む"""
+        stream = io.StringIO()
+        with JsonLinesWriter(stream) as writer:
+            count = writer.write_records({"id": i, "名前": f"名前{i}"} for i in range(3))
+
+        assert count == 3
+        assert writer.count == 3
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == [{"id": i, "名前": f"名前{i}"} for i in range(3)]
+        assert "名前0" in lines[0]
+        # 呼び出し元のストリームは閉じない
+        assert not stream.closed
+
+    def test_non_json_values(self):
+        """日付などJSONにない型は文字列として書き込む"""
+        stream = io.StringIO()
+        JsonLinesWriter(stream).write_record({"date": datetime.date(2024, 1, 2), "time": datetime.timedelta(hours=1)})
+
+        assert json.loads(stream.getvalue()) == {"date": "2024-01-02", "time": "1:00:00"}
+
+    def test_flushes_each_record(self, json_config, tmp_path):
+        """ファイルへの書き込みはレコードごとにフラッシュされ、閉じる前から読める"""
+        output_path = tmp_path / "output.jsonl"
+        with OutputFormatter(json_config).open_record_writer(output_path) as writer:
+            writer.write_record({"id": 1})
+            assert output_path.read_text(encoding="utf-8") == '{"id":1}\n'
+            writer.write_record({"id": 2})
+
+        assert writer.stream.closed
+        assert output_path.read_text(encoding="utf-8").splitlines() == ['{"id":1}', '{"id":2}']
+
+    def test_stdout(self, json_config, capsys):
+        """出力先を指定しない場合は標準出力に書き込む"""
+        with OutputFormatter(json_config).open_record_writer() as writer:
+            writer.write_record({"id": 1})
+
+        assert capsys.readouterr().out == '{"id":1}\n'
+
+    def test_csv_rows(self):
+        """CSV形式ではヘッダー行の後に1レコード1行で書き込む"""
+        stream = io.StringIO(newline="")
+        with CsvWriter(stream, ["file", "name", "age"], CsvOptions(null_value="-")) as writer:
+            writer.write_record({"file": "a.xlsx", "name": "a", "age": 20})
+            writer.write_record({"file": "b.xlsx", "age": None, "extra": "無視される"})
+
+        assert writer.tabular
+        assert list(csv.reader(io.StringIO(stream.getvalue()))) == [
+            ["file", "name", "age"],
+            ["a.xlsx", "a", "20"],
+            ["b.xlsx", "-", "-"],
+        ]
+
+    def test_csv_header_without_records(self, tmp_path):
+        """レコードがない場合もヘッダー行を書き込む"""
+        config = ConfigModel(fields={"name": "Sheet1!A1"}, rules=[], output=OutputFormat(format="csv"))
+        output_path = tmp_path / "output.csv"
+        with OutputFormatter(config).open_record_writer(output_path, extra_fields=["file"]):
+            pass
+
+        assert output_path.read_bytes() == b"file,name\r\n"
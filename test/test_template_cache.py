@@ -0,0 +1,101 @@
+"""
+コンパイル済みJinja2テンプレートのキャッシュ（template_cache.py）のテスト
+"""
+
+import os
+import uuid
+
+import pytest
+
+from xlsx_value_picker import template_cache
+from xlsx_value_picker.config_loader import ConfigModel, OutputFormat
+from xlsx_value_picker.output_formatter import OutputFormatter
+
+
+@pytest.fixture
+def compile_count(monkeypatch):
+    """共有の Environment でテンプレートをコンパイルした回数を数える"""
+    environment = template_cache.get_environment()
+    original = environment.compile
+    calls = []
+
+    def counting_compile(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(environment, "compile", counting_compile)
+    return calls
+
+
+def unique_source():
+    """他のテストとキャッシュを共有しないテンプレートを作成する"""
+    return f"{{{{ value }}}} {uuid.uuid4()}"
+
+
+class TestTemplateCache:
+    """template_cache のテスト"""
+
+    def test_same_source_is_compiled_once(self, compile_count):
+        """同じソースのテンプレートは1回だけコンパイルし、同じオブジェクトを返す"""
+        source = unique_source()
+
+        first = template_cache.get_template(source)
+        second = template_cache.get_template(source)
+
+        assert first is second
+        assert len(compile_count) == 1
+        assert template_cache.get_template(unique_source()) is not first
+
+    def test_string_template_is_autoescaped(self):
+        """ソース文字列のテンプレートは from_string と同じく自動エスケープする"""
+        template = template_cache.get_template("{{ value }}")
+        assert template.render(value="<b>") == "&lt;b&gt;"
+
+    def test_include_from_current_directory(self, tmp_path, monkeypatch):
+        """include するテンプレートはカレントディレクトリから読み込む"""
+        (tmp_path / "header.txt").write_text("ヘッダー: {{ value }}", encoding="utf-8")
+        monkeypatch.chdir(tmp_path)
+
+        template = template_cache.get_template('{% include "header.txt" %}')
+
+        assert template.render(value="値") == "ヘッダー: 値"
+
+    def test_template_file_is_reread_when_changed(self, tmp_path):
+        """テンプレートファイルは更新された場合だけ読み直す"""
+        path = tmp_path / "template.j2"
+        path.write_text("1: {{ value }}", encoding="utf-8")
+        assert template_cache.read_template_file(path) == "1: {{ value }}"
+
+        # 内容を同じサイズで書き換え、更新日時を戻すと前回の内容を返す
+        stat = os.stat(path)
+        path.write_text("2: {{ value }}", encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert template_cache.read_template_file(path) == "1: {{ value }}"
+
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert template_cache.read_template_file(path) == "2: {{ value }}"
+
+    def test_bytecode_cache(self, tmp_path):
+        """バイトコードキャッシュのディレクトリを指定するとコンパイル結果を保存する"""
+        cache_dir = tmp_path / "jinja2_cache"
+        template_cache.set_bytecode_cache_dir(cache_dir)
+        try:
+            template = template_cache.get_template(unique_source())
+        finally:
+            template_cache.set_bytecode_cache_dir(None)
+
+        assert template.render(value=1).startswith("1 ")
+        assert list(cache_dir.iterdir())
+
+    def test_formatter_reuses_compiled_template(self, tmp_path, compile_count):
+        """OutputFormatter はテンプレートファイルを呼び出しごとにコンパイルしない"""
+        path = tmp_path / "template.j2"
+        path.write_text(unique_source(), encoding="utf-8")
+        config = ConfigModel(
+            fields={"value": "Sheet1!A1"}, rules=[], output=OutputFormat(format="jinja2", template_file=str(path))
+        )
+
+        results = [OutputFormatter(config).format_output({"value": i}) for i in range(3)]
+
+        assert [result.split()[0] for result in results] == ["0", "1", "2"]
+        assert len(compile_count) == 1
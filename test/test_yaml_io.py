@@ -0,0 +1,72 @@
+"""
+YAMLの読み込み・書き出し（yaml_io.py）のテスト
+
+libyaml を使った場合も Python 実装と同一の結果になることを確認する。
+"""
+
+import datetime
+
+import pytest
+import yaml
+
+from xlsx_value_picker import yaml_io
+from xlsx_value_picker.config_loader import ConfigModel, OutputFormat
+from xlsx_value_picker.output_formatter import OutputFormatter
+
+requires_libyaml = pytest.mark.skipif(not yaml_io.has_libyaml(), reason="PyYAML が libyaml なしでビルドされている")
+
+DATA = [
+    {"field1": 100, "field2": "テスト文字列", "nested": {"key1": "value1", "key2": 200}, "list": [1, 2, 3]},
+    {"date": datetime.datetime(2024, 1, 2, 3, 4, 5), "day": datetime.date(2024, 1, 2), "none": None, "flag": True},
+    {"multiline": "1行目\n2行目\n", "quoted": "a: b", "number_like": "123", "bool_like": "yes", "empty": ""},
+    {"long": "長い文字列 " * 40, "long_quoted": "'引用' " * 40, "indent": "  先頭の空白"},
+    {"table": [{"商品ID": i, "商品名": f"商品{i}", "点数": i * 1.5} for i in range(20)]},
+    # 以下は libyaml と Python 実装で出力が異なるため Python 実装で書き出されるデータ
+    {"emoji": "絵文字😀"},
+    {"control": "タブ\tと改行\r\n"},
+    {"spaces": "行末の空白 \n 行頭の空白"},
+    {"": "空のキー", "キー" * 50: "長いキー"},
+    ["トップレベルのリスト", {"nested": "\x85"}],
+]
+
+
+class TestYamlIo:
+    """yaml_io のテスト"""
+
+    @pytest.mark.parametrize("data", DATA)
+    def test_dump_is_identical_to_yaml_dump(self, data):
+        """dump は yaml.dump と同一の文字列を返す"""
+        expected = yaml.dump(data, sort_keys=False, allow_unicode=True)
+        assert yaml_io.dump(data, sort_keys=False, allow_unicode=True) == expected
+
+    @requires_libyaml
+    @pytest.mark.parametrize("data", DATA[:5])
+    def test_dump_uses_libyaml(self, data):
+        """libyaml と同じ出力になるデータは C 実装で書き出す"""
+        assert yaml_io._is_libyaml_safe(data)
+        expected = yaml.dump(data, sort_keys=False, allow_unicode=True)
+        assert yaml_io.dump(data, use_libyaml=True, sort_keys=False, allow_unicode=True) == expected
+
+    @pytest.mark.parametrize("data", DATA[5:])
+    def test_dump_falls_back_to_python(self, data):
+        """libyaml と出力が異なるデータは Python 実装で書き出す"""
+        assert not yaml_io._is_libyaml_safe(data)
+
+    @pytest.mark.parametrize("use_libyaml", [pytest.param(True, marks=requires_libyaml), False])
+    @pytest.mark.parametrize("data", DATA)
+    def test_safe_load_round_trip(self, data, use_libyaml):
+        """safe_load は yaml.safe_load と同じデータを返す"""
+        text = yaml.dump(data, sort_keys=False, allow_unicode=True)
+        assert yaml_io.safe_load(text, use_libyaml=use_libyaml) == yaml.safe_load(text)
+
+    def test_safe_load_rejects_python_tags(self):
+        """safe_load は Python オブジェクトのタグを読み込まない"""
+        with pytest.raises(yaml.YAMLError):
+            yaml_io.safe_load("!!python/object/apply:os.getcwd []")
+
+    def test_formatter_output(self):
+        """OutputFormatter の YAML 出力は yaml.dump と同一"""
+        config = ConfigModel(fields={"field1": "Sheet1!A1"}, rules=[], output=OutputFormat(format="yaml"))
+        for data in DATA[:-1]:
+            expected = yaml.dump(data, sort_keys=False, allow_unicode=True)
+            assert OutputFormatter(config).format_output(data) == expected
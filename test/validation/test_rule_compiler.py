@@ -0,0 +1,264 @@
+"""
+ルールコンパイラのpytestテスト
+
+コンパイル済みのルールが Rule.validate と同一の ValidationResult を返すことを確認する。
+"""
+
+import datetime
+
+import pytest
+
+from xlsx_value_picker.config_loader import Rule
+from xlsx_value_picker.validation import ValidationEngine
+from xlsx_value_picker.validator.rule_compiler import compile_expression, compile_rule, referenced_fields
+from xlsx_value_picker.validator.validation_common import ValidationContext, ValidationResult
+from xlsx_value_picker.validator.validation_expressions import AllOfExpression, AnyOfExpression, Expression
+
+EXPRESSIONS = [
+    {"compare": {"left_field": "age", "operator": ">=", "right": 18}},
+    {"compare": {"left_field": "age", "operator": "<", "right_field": "limit"}},
+    {"compare": {"left_field": "price", "operator": ">", "right": 10.5}},
+    {"compare": {"left_field": "name", "operator": "==", "right": "テスト"}},
+    {"compare": {"left_field": "name", "operator": "!=", "right_field": "other"}},
+    {"compare": {"left": 5, "operator": "<=", "right_field": "age"}},
+    {"compare": {"left_field": "date", "operator": ">", "right_field": "other_date"}},
+    {"compare": {"left_field": "missing", "operator": "==", "right": None}},
+    {"required": "name"},
+    {"required": ["name", "empty", "none", "missing"]},
+    {"is_empty": ["empty", "none"]},
+    {"is_empty": ["name", "age", "missing"]},
+    {"regex_match": {"field": "email", "pattern": r"^[\w.-]+@[\w.-]+\.\w+$"}},
+    {"regex_match": {"field": "age", "pattern": r"^\d{2}$"}},
+    {"regex_match": {"field": "none", "pattern": ".*"}},
+    {"regex_match": {"field": "name", "pattern": "[unclosed"}},
+    {"enum": {"field": "color", "values": ["赤", "青", "緑"]}},
+    {"enum": {"field": "age", "values": [1, 25.0, True]}},
+    {"enum": {"field": "flag", "values": [1, [1, 2]]}},
+    {"enum": {"field": "none", "values": [None, ""]}},
+    {
+        "all_of": [
+            {"required": ["name", "empty"]},
+            {"compare": {"left_field": "age", "operator": ">", "right": 30}},
+            {"regex_match": {"field": "email", "pattern": r"^\d+$"}},
+        ]
+    },
+    {"all_of": [{"required": "name"}, {"enum": {"field": "color", "values": ["赤"]}}]},
+    {
+        "any_of": [
+            {"compare": {"left_field": "selection", "operator": "!=", "right": "その他"}},
+            {"required": "comment"},
+            {"is_empty": "name"},
+        ]
+    },
+    {"any_of": [{"required": "none"}, {"required": "name"}]},
+    {"not": {"required": "name"}},
+    {"not": {"all_of": [{"required": "empty"}, {"not": {"is_empty": "none"}}]}},
+]
+
+CONTEXTS = [
+    {
+        "name": "テスト",
+        "age": 25,
+        "limit": 30,
+        "price": 12.0,
+        "other": "テスト",
+        "email": "test@example.com",
+        "empty": "",
+        "none": None,
+        "color": "赤",
+        "flag": True,
+        "selection": "その他",
+        "comment": None,
+        "date": datetime.datetime(2024, 1, 2),
+        "other_date": datetime.datetime(2024, 1, 1),
+    },
+    {
+        "name": "",
+        "age": "25",
+        "limit": 20,
+        "price": 3,
+        "other": "別",
+        "email": "invalid-email",
+        "empty": "値",
+        "none": 0,
+        "color": "黄",
+        "flag": [1, 2],
+        "selection": "A",
+        "comment": "コメント",
+        "date": "2024-01-02",
+        "other_date": datetime.datetime(2024, 1, 1),
+    },
+    {},
+]
+
+FIELD_LOCATIONS = {
+    "name": "Sheet1!A1",
+    "age": "Sheet1!A2",
+    "limit": "Sheet1!A3",
+    "price": "Sheet1!A4",
+    "email": "Sheet1!A5",
+    "empty": "Sheet1!A6",
+    "none": "Sheet1!A7",
+    "color": "Sheet1!A8",
+    "selection": "Sheet1!A9",
+    "comment": "Sheet1!A10",
+}
+
+ERROR_MESSAGE = "{field} の検証に失敗しました"
+
+
+class TestRuleCompilerParity:
+    """full_diagnostics のコンパイル済みルールと Rule.validate の結果が一致することのテスト"""
+
+    @pytest.mark.parametrize("expression", EXPRESSIONS, ids=lambda e: next(iter(e)))
+    @pytest.mark.parametrize("cell_values", CONTEXTS, ids=["context1", "context2", "empty"])
+    def test_same_result(self, expression, cell_values):
+        rule = Rule(name="テストルール", expression=expression, error_message=ERROR_MESSAGE)
+
+        expected = rule.validate(ValidationContext(cell_values=cell_values, field_locations=FIELD_LOCATIONS))
+        actual = compile_rule(rule, full_diagnostics=True).validate(
+            ValidationContext(cell_values=cell_values, field_locations=FIELD_LOCATIONS)
+        )
+
+        assert actual == expected
+
+    @pytest.mark.parametrize("expression", EXPRESSIONS, ids=lambda e: next(iter(e)))
+    def test_same_message_placeholders(self, expression):
+        """式ごとのプレースホルダを含むエラーメッセージも一致する"""
+        template = "{field}" if "compare" not in expression else "{left_field} {operator} {right_value} ({left_value})"
+        if "regex_match" in expression:
+            template = "{field}={value} /{pattern}/"
+        elif "enum" in expression:
+            template = "{field}={value} [{allowed_values}]"
+        rule = Rule(name="テストルール", expression=expression, error_message=template)
+        context = ValidationContext(cell_values=CONTEXTS[1], field_locations=FIELD_LOCATIONS)
+
+        assert compile_rule(rule, full_diagnostics=True).validate(context) == rule.validate(context)
+
+
+class TestCompileExpression:
+    """compile_expression のテスト"""
+
+    def test_unknown_expression_falls_back_to_validate_in(self):
+        """未知の式型は validate_in をそのまま使う"""
+
+        class CustomExpression(Expression):
+            def validate_in(self, context, error_message_template):
+                return ValidationResult(is_valid=False, error_message=error_message_template)
+
+        compiled = compile_expression(CustomExpression())
+        result = compiled(ValidationContext(cell_values={}, field_locations={}), "カスタム")
+
+        assert result.error_message == "カスタム"
+
+    def test_engine_uses_compiled_rules(self):
+        """ValidationEngine は初期化時にルールをコンパイルする"""
+        rules = [Rule(name=f"ルール{i}", expression=e, error_message=ERROR_MESSAGE) for i, e in enumerate(EXPRESSIONS)]
+        engine = ValidationEngine(rules)
+
+        assert [compiled.name for compiled in engine.compiled_rules] == [rule.name for rule in rules]
+
+
+# CountingExpression が評価された記録
+EVALUATED: list[bool] = []
+
+
+class CountingExpression(Expression):
+    """評価された回数を記録するテスト用の式"""
+
+    result: bool
+
+    def validate_in(self, context, error_message_template):
+        EVALUATED.append(self.result)
+        return ValidationResult(is_valid=self.result, error_fields=None if self.result else ["counted"])
+
+
+class TestShortCircuit:
+    """短絡評価（デフォルト）のテスト"""
+
+    @pytest.mark.parametrize("expression", EXPRESSIONS, ids=lambda e: next(iter(e)))
+    @pytest.mark.parametrize("cell_values", CONTEXTS, ids=["context1", "context2", "empty"])
+    def test_same_validity(self, expression, cell_values):
+        """短絡評価でも検証の成否は Rule.validate と一致する"""
+        rule = Rule(name="テストルール", expression=expression, error_message=ERROR_MESSAGE)
+        context = ValidationContext(cell_values=cell_values, field_locations=FIELD_LOCATIONS)
+
+        expected = rule.validate(context)
+        actual = compile_rule(rule).validate(context)
+
+        assert actual.is_valid == expected.is_valid
+        if "all_of" not in expression:
+            assert actual == expected
+        elif not actual.is_valid:
+            assert set(actual.error_fields) <= set(expected.error_fields)
+
+    def test_all_of_reports_first_failure(self):
+        """all_of は最初に失敗した条件のフィールドだけを報告する"""
+        expression = {"all_of": [{"required": "name"}, {"required": "empty"}, {"required": "none"}]}
+        rule = Rule(name="全条件", expression=expression, error_message=ERROR_MESSAGE)
+        context = ValidationContext(cell_values=CONTEXTS[0], field_locations=FIELD_LOCATIONS)
+
+        assert compile_rule(rule).validate(context).error_fields == ["empty"]
+        assert compile_rule(rule, full_diagnostics=True).validate(context).error_fields == ["empty", "none"]
+
+    def test_any_of_stops_at_first_success(self):
+        """any_of は成功する条件が見つかった時点で残りの条件を評価しない"""
+        EVALUATED.clear()
+        children = [CountingExpression(result=value) for value in (False, True, True)]
+        compiled = compile_expression(AnyOfExpression.model_construct(any_of=children))
+
+        assert compiled(ValidationContext(cell_values={}, field_locations={}), "").is_valid
+        assert EVALUATED == [False, True]
+
+    def test_all_of_stops_at_first_failure(self):
+        """all_of は失敗する条件が見つかった時点で残りの条件を評価しない"""
+        EVALUATED.clear()
+        children = [CountingExpression(result=value) for value in (True, False, False)]
+        compiled = compile_expression(AllOfExpression.model_construct(all_of=children))
+
+        result = compiled(ValidationContext(cell_values={}, field_locations={}), "エラー")
+        assert not result.is_valid
+        assert result.error_fields == ["counted"]
+        # 述語で2件、失敗した条件の評価結果の作成で1件
+        assert EVALUATED == [True, False, False]
+
+    def test_engine_full_diagnostics(self):
+        """ValidationEngine の full_diagnostics がコンパイル済みルールに反映される"""
+        expression = {"all_of": [{"required": "empty"}, {"required": "none"}]}
+        rules = [Rule(name="全条件", expression=expression, error_message=ERROR_MESSAGE)]
+        context = ValidationContext(cell_values=CONTEXTS[0], field_locations=FIELD_LOCATIONS)
+
+        assert ValidationEngine(rules).compiled_rules[0].validate(context).error_fields == ["empty"]
+        full = ValidationEngine(rules, full_diagnostics=True).compiled_rules[0].validate(context)
+        assert full.error_fields == ["empty", "none"]
+
+
+class TestReferencedFields:
+    """referenced_fields のテスト"""
+
+    @pytest.mark.parametrize(
+        ("expression", "expected"),
+        [
+            ({"compare": {"left_field": "a", "operator": "==", "right": 1}}, {"a"}),
+            ({"compare": {"left": 1, "operator": "==", "right_field": "b"}}, {"b"}),
+            ({"required": ["a", "b"]}, {"a", "b"}),
+            ({"is_empty": "a"}, {"a"}),
+            ({"regex_match": {"field": "a", "pattern": ".*"}}, {"a"}),
+            ({"enum": {"field": "a", "values": [1]}}, {"a"}),
+            (
+                {"all_of": [{"required": "a"}, {"any_of": [{"required": "b"}, {"not": {"is_empty": "c"}}]}]},
+                {"a", "b", "c"},
+            ),
+        ],
+        ids=lambda v: next(iter(v)) if isinstance(v, dict) else "",
+    )
+    def test_fields(self, expression, expected):
+        rule = Rule(name="ルール", expression=expression, error_message="")
+        assert referenced_fields(rule.expression) == expected
+        assert compile_rule(rule).fields == expected
+
+    def test_unknown_expression(self):
+        """未知の式型を含む場合は参照フィールドを特定できない"""
+        assert referenced_fields(CountingExpression(result=True)) is None
+        composite = AllOfExpression.model_construct(all_of=[CountingExpression(result=True)])
+        assert referenced_fields(composite) is None
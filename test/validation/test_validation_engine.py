@@ -4,11 +4,16 @@ ValidationEngineのpytestテスト
 
 from unittest.mock import patch
 
+import pytest
+
 from xlsx_value_picker.config_loader import Rule  # Rule は config_loader に残る
+from xlsx_value_picker.exceptions import ValidationError
+from xlsx_value_picker.extraction_plan import ExtractionPlan
 from xlsx_value_picker.validation import ValidationEngine
 
 # Expression関連は validation_expressions からインポート
-from xlsx_value_picker.validator.validation_expressions import CompareExpression, RegexMatchExpression
+from xlsx_value_picker.validator.validation_common import ValidationResult
+from xlsx_value_picker.validator.validation_expressions import CompareExpression, Expression, RegexMatchExpression
 
 
 @patch("xlsx_value_picker.excel_processor.get_excel_values")
@@ -31,3 +36,126 @@ def test_validate(mock_get_excel_values):
     assert results[0].error_fields == ["email"]
     assert "emailの形式が不正です" in results[0].error_message
     assert results[0].error_locations == ["Sheet1!B1"]
+
+
+def _engine_rules():
+    return [
+        Rule(
+            name="年齢チェック",
+            expression={"compare": {"left_field": "age", "operator": ">=", "right_field": "min_age"}},
+            error_message="{field}が不正です",
+        ),
+        Rule(
+            name="メールアドレス形式チェック",
+            expression=RegexMatchExpression(regex_match={"field": "email", "pattern": r"^[\w.-]+@[\w.-]+\.\w+$"}),
+            error_message="{field}の形式が不正です: {value}",
+        ),
+        Rule(
+            name="複合チェック",
+            expression={"any_of": [{"required": "comment"}, {"not": {"enum": {"field": "age", "values": [1, 2]}}}]},
+            error_message="複合チェックエラー",
+        ),
+    ]
+
+
+def test_field_index():
+    engine = ValidationEngine(_engine_rules())
+
+    assert engine.field_index == {"age": (0, 2), "min_age": (0,), "email": (1,), "comment": (2,)}
+    assert engine.rules_for_fields(["age"]) == [0, 2]
+    assert engine.rules_for_fields(["email", "unknown"]) == [1]
+
+
+@patch("xlsx_value_picker.excel_processor.get_excel_values")
+def test_revalidate(mock_get_excel_values):
+    mock_get_excel_values.return_value = {"age": 25, "min_age": 20, "email": "invalid-email", "comment": None}
+    engine = ValidationEngine(_engine_rules())
+    field_mapping = {"age": "Sheet1!A1", "min_age": "Sheet1!A2", "email": "Sheet1!B1", "comment": "Sheet1!C1"}
+
+    results = engine.validate("dummy.xlsx", field_mapping)
+    assert [r.rule_name for r in results] == ["メールアドレス形式チェック"]
+
+    evaluated = []
+    for compiled in engine.compiled_rules:
+        original = compiled.evaluate
+        object.__setattr__(
+            compiled,
+            "evaluate",
+            lambda context, template, name=compiled.name, original=original: evaluated.append(name)
+            or original(context, template),
+        )
+
+    # age の変更では age を参照するルールだけが再評価される
+    results = engine.revalidate({"age": 10})
+    assert evaluated == ["年齢チェック", "複合チェック"]
+    assert [r.rule_name for r in results] == ["年齢チェック", "メールアドレス形式チェック"]
+    assert results[0].error_locations == ["Sheet1!A1", "Sheet1!A2"]
+
+    evaluated.clear()
+    results = engine.revalidate({"email": "test@example.com", "age": 2})
+    assert evaluated == ["年齢チェック", "メールアドレス形式チェック", "複合チェック"]
+    assert [r.rule_name for r in results] == ["年齢チェック", "複合チェック"]
+
+    # 再評価の結果は、同じ値で最初から検証した結果と一致する
+    mock_get_excel_values.return_value = {"age": 2, "min_age": 20, "email": "test@example.com", "comment": None}
+    assert ValidationEngine(_engine_rules()).validate("dummy.xlsx", field_mapping) == results
+
+
+@patch("xlsx_value_picker.excel_processor.get_excel_values")
+def test_spawn(mock_get_excel_values):
+    mock_get_excel_values.return_value = {"age": 25, "min_age": 20, "email": "invalid-email", "comment": None}
+    engine = ValidationEngine(_engine_rules())
+    field_mapping = {"age": "Sheet1!A1", "min_age": "Sheet1!A2", "email": "Sheet1!B1", "comment": "Sheet1!C1"}
+    engine.validate("dummy.xlsx", field_mapping)
+
+    spawned = engine.spawn()
+
+    # コンパイル済みのルールは共有し、直前の結果は引き継がない
+    assert spawned.compiled_rules is engine.compiled_rules
+    with pytest.raises(ValidationError, match="validate を実行してください"):
+        spawned.revalidate({"age": 1})
+    assert spawned.validate("dummy.xlsx", field_mapping) == engine.revalidate({})
+
+
+def test_revalidate_without_validate():
+    engine = ValidationEngine(_engine_rules())
+
+    with pytest.raises(ValidationError, match="validate を実行してください"):
+        engine.revalidate({"age": 1})
+
+
+@patch("xlsx_value_picker.excel_processor.get_excel_values")
+def test_fetches_only_referenced_fields(mock_get_excel_values):
+    mock_get_excel_values.return_value = {"age": 25, "email": "invalid-email"}
+    engine = ValidationEngine(_engine_rules()[:2])
+    field_mapping = {"age": "Sheet1!A1", "email": "Sheet1!B1", "unused": "Sheet2!Z99", "min_age": "Sheet1!A2"}
+
+    results = engine.validate("dummy.xlsx", field_mapping)
+
+    assert engine.referenced_fields == {"age", "min_age", "email"}
+    mock_get_excel_values.assert_called_once_with(
+        "dummy.xlsx", {"age": "Sheet1!A1", "email": "Sheet1!B1", "min_age": "Sheet1!A2"}
+    )
+    # エラー位置はマッピング全体から解決される
+    assert [r.error_locations for r in results] == [["Sheet1!A1", "Sheet1!A2"], ["Sheet1!B1"]]
+
+    plan = ExtractionPlan.from_fields(field_mapping)
+    engine.validate("dummy.xlsx", plan)
+    assert mock_get_excel_values.call_args.args[1] == plan.subset({"age", "email", "min_age"})
+
+
+@patch("xlsx_value_picker.excel_processor.get_excel_values")
+def test_fetches_all_fields_for_unknown_expression(mock_get_excel_values):
+    mock_get_excel_values.return_value = {}
+
+    class CustomExpression(Expression):
+        def validate_in(self, context, error_message_template):
+            return ValidationResult(is_valid=True)
+
+    rule = Rule.model_construct(name="カスタム", expression=CustomExpression(), error_message="")
+    engine = ValidationEngine([rule])
+    field_mapping = {"age": "Sheet1!A1", "unused": "Sheet2!Z99"}
+    engine.validate("dummy.xlsx", field_mapping)
+
+    assert engine.referenced_fields is None
+    mock_get_excel_values.assert_called_once_with("dummy.xlsx", field_mapping)